@@ -0,0 +1,504 @@
+"""
+Checkpointed backfill of Intercom conversations into Teams.
+Walks conversations updated in a time range with the search API, oldest
+first, and syncs them to Teams with bounded concurrency. Progress is saved
+to a checkpoint file so an interrupted run resumes where it stopped.
+
+Usage:
+    python backfill.py --since 2024-05-01 --until 2024-05-02 [--team-id ID]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from contextlib import aclosing
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Union
+
+from cache import SharedJsonFile
+from config import config
+from resilience import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Most failed conversation IDs kept in the checkpoint
+MAX_FAILED_IDS = 1000
+
+SyncFunction = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+def parse_timestamp(value: Union[int, float, str]) -> int:
+    """
+    Parse a Unix timestamp or an ISO 8601 date/time into a Unix timestamp.
+
+    Times without a timezone are taken as UTC.
+
+    Args:
+        value: Unix timestamp, or e.g. ``2024-05-01`` or ``2024-05-01T12:00:00``
+
+    Returns:
+        int: Unix timestamp in seconds
+
+    Raises:
+        ValueError: If the value is neither
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+def parse_concurrency(value: Union[int, str]) -> int:
+    """
+    Parse the number of conversations a backfill syncs at the same time.
+
+    Args:
+        value: Whole number from 1 to ``BACKFILL_MAX_CONCURRENCY``
+
+    Returns:
+        int: Concurrency
+
+    Raises:
+        ValueError: If the value is not a whole number in range
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"Concurrency must be a whole number, got {value!r}")
+    concurrency = int(value)
+    if not 1 <= concurrency <= config.backfill_max_concurrency:
+        raise ValueError(
+            f"Concurrency must be from 1 to {config.backfill_max_concurrency}"
+        )
+    return concurrency
+
+
+def updated_between(since: int, until: int) -> Dict[str, Any]:
+    """Get a search query for conversations updated in [since, until]."""
+    # The search API has no inclusive operators
+    return {
+        "operator": "AND",
+        "value": [
+            {"field": "updated_at", "operator": ">", "value": since - 1},
+            {"field": "updated_at", "operator": "<", "value": until + 1},
+        ],
+    }
+
+
+async def sync_conversation(
+    graph_client,
+    intercom_client,
+    conversation_id: str,
+    team_id: str,
+    updated_at: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Post a summary of an Intercom conversation to the team's support channel.
+
+    Args:
+        graph_client: Graph client used to post the message
+        intercom_client: Intercom client used to fetch the conversation
+        conversation_id (str): The conversation ID
+        team_id (str): Target Teams team ID
+        updated_at (Optional[int]): Latest known update time, lets a cached
+            conversation skip the fetch
+
+    Returns:
+        Dict: The sent Teams message
+    """
+    conversation = await intercom_client.get_conversation_model(
+        conversation_id, updated_at
+    )
+
+    # Format message for Teams
+    user = conversation.source.author if conversation.source else None
+    user_name = (user and user.name) or "Unknown User"
+    user_email = (user and user.email) or "No email"
+
+    parts = conversation.parts()
+    latest_message = "No message content"
+    if parts:
+        latest_message = parts[-1].body or "No message content"
+
+    teams_message = f"""
+🔄 **Manual Sync - Conversation {conversation_id}**
+
+**Customer:** {user_name} ({user_email})
+**Latest Message:**
+{latest_message}
+
+[View in Intercom](https://app.intercom.com/a/apps/{conversation_id})
+"""
+
+    channel = await graph_client.find_or_create_channel(
+        team_id,
+        config.default_channel_name,
+        "Customer support inquiries from Intercom",
+    )
+
+    return await graph_client.send_message(
+        team_id, channel["id"], teams_message, "html"
+    )
+
+
+@dataclass
+class BackfillCheckpoint:
+    """Persisted progress of a backfill over one time range."""
+
+    since: int
+    until: int
+    # Every conversation updated before the watermark has been handled, and
+    # so have boundary_ids among those updated exactly at it
+    watermark: Optional[int] = None
+    boundary_ids: List[str] = field(default_factory=list)
+    processed: int = 0
+    failed: int = 0
+    failed_ids: List[str] = field(default_factory=list)
+    status: str = PENDING
+    error: Optional[str] = None
+
+
+@dataclass(slots=True)
+class _InFlight:
+    conversation_id: str
+    updated_at: int
+    done: bool = False
+
+
+class BackfillJob:
+    """Syncs a time range of conversations to Teams, resumably."""
+
+    def __init__(
+        self,
+        intercom_client,
+        sync: SyncFunction,
+        since: int,
+        until: int,
+        checkpoint_path: Optional[str] = None,
+        concurrency: int = 4,
+        per_page: int = 50,
+        checkpoint_interval: float = 5.0,
+    ):
+        """
+        Initialize the job.
+
+        Args:
+            intercom_client: Intercom client used to search conversations
+            sync (Callable): Coroutine function syncing one search result
+            since (int): Start of the range, as a Unix timestamp
+            until (int): End of the range, inclusive, as a Unix timestamp
+            checkpoint_path (Optional[str]): JSON file to save progress to,
+                None keeps progress in memory only
+            concurrency (int): Conversations synced at the same time
+            per_page (int): Search results per page
+            checkpoint_interval (float): Seconds between checkpoint saves
+        """
+        self.intercom_client = intercom_client
+        self.sync = sync
+        self.checkpoint_path = checkpoint_path
+        self.concurrency = concurrency
+        self.per_page = per_page
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint = BackfillCheckpoint(since=since, until=until)
+        self._in_flight: Deque[_InFlight] = deque()
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self._run_processed = 0
+        self._saved_at = 0.0
+        # A save cancelled mid-write finishes before the next one starts,
+        # since every write holds the file's lock
+        self._file = SharedJsonFile(checkpoint_path) if checkpoint_path else None
+
+    async def load(self, restart: bool = False):
+        """
+        Resume from the checkpoint file if it is for the same range.
+
+        Args:
+            restart (bool): Ignore any saved progress
+        """
+        if restart or not self.checkpoint_path:
+            return
+        if not os.path.exists(self.checkpoint_path):
+            return
+
+        try:
+            saved = await asyncio.to_thread(self._file.read)
+            checkpoint = BackfillCheckpoint(**saved)
+        except Exception as e:
+            logger.warning(
+                f"Ignoring unreadable backfill checkpoint {self.checkpoint_path}: "
+                f"{str(e)}"
+            )
+            return
+
+        if (checkpoint.since, checkpoint.until) != (
+            self.checkpoint.since,
+            self.checkpoint.until,
+        ):
+            logger.info("Backfill checkpoint is for another range, starting over")
+            return
+
+        self.checkpoint = checkpoint
+        logger.info(
+            f"Resuming backfill at updated_at {checkpoint.watermark} "
+            f"after {checkpoint.processed} conversations"
+        )
+
+    async def run(self) -> BackfillCheckpoint:
+        """
+        Sync every conversation in the range not handled by a previous run.
+
+        A conversation that fails to sync is recorded and skipped. The run
+        stops if an endpoint's circuit opens, leaving the checkpoint before
+        the first unfinished conversation.
+
+        Returns:
+            BackfillCheckpoint: Final progress
+        """
+        checkpoint = self.checkpoint
+        if checkpoint.status == COMPLETED:
+            logger.info("Backfill range already completed")
+            return checkpoint
+
+        checkpoint.status = RUNNING
+        checkpoint.error = None
+        self._started_at = time.monotonic()
+        self._finished_at = None
+        self._run_processed = 0
+        self._saved_at = self._started_at
+
+        start = checkpoint.since
+        if checkpoint.watermark is not None:
+            start = checkpoint.watermark
+        skip = set(checkpoint.boundary_ids)
+
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks = set()
+        stop = asyncio.Event()
+
+        async def sync_one(entry: _InFlight, conversation: Dict[str, Any]):
+            try:
+                await self.sync(conversation)
+                checkpoint.processed += 1
+                self._run_processed += 1
+            except CircuitOpenError as e:
+                checkpoint.error = str(e)
+                stop.set()
+                return
+            except Exception as e:
+                logger.error(
+                    f"Backfill failed to sync conversation {entry.conversation_id}: "
+                    f"{str(e)}"
+                )
+                checkpoint.failed += 1
+                if len(checkpoint.failed_ids) < MAX_FAILED_IDS:
+                    checkpoint.failed_ids.append(entry.conversation_id)
+            finally:
+                slots.release()
+            entry.done = True
+            self._advance()
+            await self._maybe_save()
+
+        results = self.intercom_client.iter_search(
+            updated_between(start, checkpoint.until),
+            per_page=self.per_page,
+            sort={"field": "updated_at", "order": "ascending"},
+        )
+        try:
+            async with aclosing(results):
+                async for conversation in results:
+                    conversation_id = str(conversation.get("id"))
+                    updated_at = int(conversation.get("updated_at") or start)
+                    if updated_at == start and conversation_id in skip:
+                        continue
+
+                    await slots.acquire()
+                    if stop.is_set():
+                        slots.release()
+                        break
+
+                    entry = _InFlight(conversation_id, updated_at)
+                    self._in_flight.append(entry)
+                    task = asyncio.create_task(sync_one(entry, conversation))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+
+            if tasks:
+                await asyncio.gather(*tasks)
+
+            if stop.is_set():
+                checkpoint.status = FAILED
+                logger.warning(f"Backfill stopped: {checkpoint.error}")
+            else:
+                checkpoint.status = COMPLETED
+                logger.info(
+                    f"Backfill completed: {checkpoint.processed} synced, "
+                    f"{checkpoint.failed} failed"
+                )
+
+        except asyncio.CancelledError:
+            checkpoint.status = CANCELLED
+            raise
+
+        except Exception as e:
+            checkpoint.status = FAILED
+            checkpoint.error = str(e)
+            logger.error(f"Backfill failed: {str(e)}")
+            raise
+
+        finally:
+            for task in list(tasks):
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            self._in_flight.clear()
+            self._finished_at = time.monotonic()
+            await self.save()
+
+        return checkpoint
+
+    def _advance(self):
+        """Move the watermark past the oldest conversations that are done."""
+        checkpoint = self.checkpoint
+        while self._in_flight and self._in_flight[0].done:
+            entry = self._in_flight.popleft()
+            if entry.updated_at != checkpoint.watermark:
+                checkpoint.watermark = entry.updated_at
+                checkpoint.boundary_ids = []
+            checkpoint.boundary_ids.append(entry.conversation_id)
+
+    async def _maybe_save(self):
+        if time.monotonic() - self._saved_at >= self.checkpoint_interval:
+            self._saved_at = time.monotonic()
+            await self.save()
+
+    async def save(self):
+        """Write the checkpoint file."""
+        if not self._file:
+            return
+        try:
+            await asyncio.to_thread(self._file.write, asdict(self.checkpoint))
+        except Exception as e:
+            logger.error(
+                f"Failed to save backfill checkpoint {self.checkpoint_path}: {str(e)}"
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the job's progress and throughput."""
+        checkpoint = self.checkpoint
+        elapsed = 0.0
+        if self._started_at is not None:
+            elapsed = (self._finished_at or time.monotonic()) - self._started_at
+
+        covered = 0.0
+        span = checkpoint.until - checkpoint.since
+        if checkpoint.status == COMPLETED:
+            covered = 1.0
+        elif checkpoint.watermark is not None and span > 0:
+            covered = (checkpoint.watermark - checkpoint.since) / span
+
+        return {
+            "status": checkpoint.status,
+            "since": checkpoint.since,
+            "until": checkpoint.until,
+            "watermark": checkpoint.watermark,
+            "processed": checkpoint.processed,
+            "failed": checkpoint.failed,
+            "in_flight": sum(1 for entry in self._in_flight if not entry.done),
+            "elapsed_seconds": round(elapsed, 1),
+            "conversations_per_second": (
+                round(self._run_processed / elapsed, 2) if elapsed else 0.0
+            ),
+            "range_covered": round(min(max(covered, 0.0), 1.0), 3),
+            "error": checkpoint.error,
+        }
+
+
+async def main(args: argparse.Namespace) -> int:
+    """Run a backfill from the command line."""
+    from graph_client import GraphClient
+    from intercom_client import IntercomClient
+    from resilience import Resilience
+    from token_cache import create_token_store
+
+    team_id = args.team_id or config.default_team_id
+    if not team_id:
+        logger.error("Team ID is required (--team-id or DEFAULT_TEAM_ID)")
+        return 2
+
+    resilience = Resilience(
+        max_attempts=config.retry_max_attempts,
+        backoff_base=config.retry_backoff_base_ms / 1000,
+        backoff_max=config.retry_backoff_max_ms / 1000,
+        failure_threshold=config.circuit_failure_threshold,
+        reset_timeout=config.circuit_reset_seconds,
+    )
+    token_store = create_token_store(path=config.graph_token_cache_path)
+    graph_client = GraphClient(resilience, token_store)
+    if not await graph_client.authenticate():
+        logger.error("Failed to authenticate with Microsoft Graph")
+        return 1
+
+    intercom_client = await IntercomClient(resilience).open()
+    try:
+
+        async def sync(conversation: Dict[str, Any]):
+            return await sync_conversation(
+                graph_client,
+                intercom_client,
+                str(conversation["id"]),
+                team_id,
+                conversation.get("updated_at"),
+            )
+
+        job = BackfillJob(
+            intercom_client,
+            sync,
+            parse_timestamp(args.since),
+            parse_timestamp(args.until),
+            checkpoint_path=args.checkpoint or None,
+            concurrency=args.concurrency,
+            per_page=config.backfill_page_size,
+            checkpoint_interval=config.backfill_checkpoint_interval_seconds,
+        )
+        await job.load(restart=args.restart)
+        checkpoint = await job.run()
+        print(json.dumps(job.stats()))
+        return 0 if checkpoint.status == COMPLETED else 1
+    finally:
+        await intercom_client.close()
+        await graph_client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Backfill Intercom conversations into Teams"
+    )
+    parser.add_argument(
+        "--since", required=True, help="Start, Unix time or ISO 8601 (UTC)"
+    )
+    parser.add_argument(
+        "--until", required=True, help="End (inclusive), Unix time or ISO 8601 (UTC)"
+    )
+    parser.add_argument("--team-id", help="Target team, defaults to DEFAULT_TEAM_ID")
+    parser.add_argument(
+        "--concurrency", type=parse_concurrency, default=config.backfill_concurrency
+    )
+    parser.add_argument("--checkpoint", default=config.backfill_checkpoint_path)
+    parser.add_argument("--restart", action="store_true", help="Ignore saved progress")
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,98 @@
+"""
+Benchmark conversation decoding for large conversations.
+
+Compares the previous path (the full response decoded into nested dicts,
+cached, and walked with chained .get calls) with the typed path (the raw
+response cached as bytes and decoded into a Conversation whose parts are only
+decoded when accessed). Both build the summary the sync endpoint posts: the
+customer and the latest message.
+
+Usage:
+    python benchmarks/bench_conversation_models.py
+"""
+
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from payloads import conversation  # noqa: E402
+
+from intercom_models import decode_conversation  # noqa: E402
+
+ITERATIONS = 200
+RETAINED = 200
+
+
+def summarize_dict(body: dict):
+    user = body.get("source", {}).get("author", {})
+    parts = body.get("conversation_parts", {}).get("conversation_parts", [])
+    latest = parts[-1].get("body", "") if parts else ""
+    return user.get("name"), user.get("email"), latest
+
+
+def summarize_typed(payload: bytes):
+    model = decode_conversation(payload)
+    user = model.source.author if model.source else None
+    parts = model.parts()
+    latest = parts[-1].body if parts else ""
+    return user and user.name, user and user.email, latest
+
+
+def dict_path(payload: bytes):
+    body = json.loads(payload)
+    return body, summarize_dict(body)
+
+
+def typed_path(payload: bytes):
+    return payload, summarize_typed(payload)
+
+
+def time_per_call(path, payload: bytes) -> float:
+    for _ in range(10):
+        path(payload)
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        path(payload)
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+def retained_per_conversation(path, payloads) -> float:
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    # What stays cached once the Teams message is built; each body is copied
+    # first, as a fresh network read would be
+    kept = [path(bytes(bytearray(payload)))[0] for payload in payloads]
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del kept
+    return retained / len(payloads)
+
+
+def main():
+    print(
+        f"{'parts':>5} {'bytes':>8} {'path':<6} {'decode+summary us':>18} "
+        f"{'retained KiB':>13}"
+    )
+    for parts in (10, 100, 500):
+        payloads = [
+            json.dumps(conversation(str(100000 + i), parts)).encode("utf-8")
+            for i in range(RETAINED)
+        ]
+        for name, path in (("dict", dict_path), ("typed", typed_path)):
+            micros = time_per_call(path, payloads[0])
+            retained = retained_per_conversation(path, payloads) / 1024
+            print(
+                f"{parts:>5} {len(payloads[0]):>8} {name:<6} "
+                f"{micros:>18.1f} {retained:>13.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
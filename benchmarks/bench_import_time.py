@@ -0,0 +1,96 @@
+"""
+Profile the import time of the application.
+
+Imports main in fresh interpreters with ``-X importtime`` and reports the
+wall time of the import and the slowest top-level dependencies. The Graph
+SDK, azure.identity, redis and httpx are imported on demand, so they should
+not appear.
+
+Usage:
+    python benchmarks/bench_import_time.py [runs]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+LAZY = ("msgraph", "azure.identity", "redis", "httpx")
+TOP = 12
+
+PROBE = f"""
+import sys, time
+start = time.perf_counter()
+import main
+print((time.perf_counter() - start) * 1000)
+print(",".join(name for name in {LAZY!r} if name in sys.modules))
+"""
+
+
+def environment():
+    env = dict(os.environ)
+    for name in (
+        "AZURE_CLIENT_ID",
+        "AZURE_CLIENT_SECRET",
+        "AZURE_TENANT_ID",
+        "INTERCOM_ACCESS_TOKEN",
+        "INTERCOM_WEBHOOK_SECRET",
+    ):
+        env.setdefault(name, "bench")
+    return env
+
+
+def import_once(env):
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    lines = result.stdout.splitlines()
+    return float(lines[0]), lines[1] if len(lines) > 1 else ""
+
+
+def slowest_imports(env):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Lines look like "import time:  self | cumulative |   name", indented by
+    # nesting depth; main's direct dependencies are indented by two spaces
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if name.startswith("   ") and not name.startswith("    "):
+            imports.append((int(cumulative) / 1000, name.strip()))
+    return sorted(imports, reverse=True)[:TOP]
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    env = environment()
+    samples = []
+    loaded = ""
+    for _ in range(runs):
+        millis, loaded = import_once(env)
+        samples.append(millis)
+
+    print(f"import main: {statistics.median(samples):.0f} ms (median of {runs})")
+    print(f"lazy modules loaded at import: {loaded or 'none'}")
+    print(f"\n{'module':<28} {'cumulative ms':>14}")
+    for millis, name in slowest_imports(env):
+        print(f"{name:<28} {millis:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Benchmark per-webhook Intercom request latency.
+
+Compares the previous path (a fresh ClientSession per webhook, so every
+request pays TCP and TLS setup) with one long-lived pooled client. A local
+HTTPS server with a self-signed certificate stands in for api.intercom.io;
+over a real network each avoided handshake also saves two to three round
+trips, so the gap only grows.
+
+Usage:
+    python benchmarks/bench_intercom_session.py
+"""
+
+import asyncio
+import datetime
+import ipaddress
+import logging
+import os
+import ssl
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from payloads import conversation  # noqa: E402
+
+REQUESTS = 300
+PORT = 8743
+
+
+def write_certificate(directory: str):
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(
+            x509.SubjectAlternativeName(
+                [
+                    x509.DNSName("localhost"),
+                    x509.IPAddress(ipaddress.ip_address("127.0.0.1")),
+                ]
+            ),
+            critical=False,
+        )
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+    return cert_path, key_path
+
+
+async def start_server(cert_path: str, key_path: str):
+    from aiohttp import web
+
+    body = conversation("123", 5)
+
+    async def get_conversation(request):
+        return web.json_response(body)
+
+    app = web.Application()
+    app.router.add_get("/conversations/{id}", get_conversation)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert_path, key_path)
+    await web.TCPSite(runner, "127.0.0.1", PORT, ssl_context=context).start()
+    return runner
+
+
+async def per_webhook_session(IntercomClient) -> float:
+    start = time.perf_counter()
+    async with IntercomClient() as client:
+        await client.get_conversation("123")
+    return time.perf_counter() - start
+
+
+async def shared_session(client) -> float:
+    start = time.perf_counter()
+    await client.get_conversation("123")
+    return time.perf_counter() - start
+
+
+def report(name: str, samples):
+    samples = sorted(samples)
+    p50 = statistics.median(samples) * 1000
+    p95 = samples[int(len(samples) * 0.95)] * 1000
+    print(f"{name:<20} {p50:>8.2f} {p95:>8.2f}")
+
+
+async def run(IntercomClient):
+    old = [await per_webhook_session(IntercomClient) for _ in range(REQUESTS)]
+
+    client = await IntercomClient().open()
+    await client.get_conversation("123")
+    new = [await shared_session(client) for _ in range(REQUESTS)]
+    await client.close()
+
+    print(f"{'path':<20} {'p50 ms':>8} {'p95 ms':>8}")
+    report("session per webhook", old)
+    report("pooled client", new)
+    saved = (statistics.median(old) - statistics.median(new)) * 1000
+    print(f"saved per webhook request: {saved:.2f} ms (p50, loopback)")
+
+
+async def main():
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as directory:
+        cert_path, key_path = write_certificate(directory)
+
+        # Trust the local certificate and point the client at the local server
+        os.environ["SSL_CERT_FILE"] = cert_path
+        os.environ["INTERCOM_BASE_URL"] = f"https://localhost:{PORT}"
+        os.environ.setdefault("AZURE_CLIENT_ID", "bench")
+        os.environ.setdefault("AZURE_CLIENT_SECRET", "bench")
+        os.environ.setdefault("AZURE_TENANT_ID", "bench")
+        os.environ.setdefault("INTERCOM_ACCESS_TOKEN", "bench")
+        os.environ.setdefault("INTERCOM_WEBHOOK_SECRET", "bench")
+
+        from intercom_client import IntercomClient
+
+        runner = await start_server(cert_path, key_path)
+        try:
+            await run(IntercomClient)
+        finally:
+            await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
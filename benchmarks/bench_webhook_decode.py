@@ -0,0 +1,74 @@
+"""
+Benchmark webhook payload decoding.
+
+Compares the previous path (json.loads on the decoded string, keeping the full
+dict for queued work) with typed msgspec decoding straight from bytes.
+
+Usage:
+    python benchmarks/bench_webhook_decode.py
+"""
+
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from payloads import webhook  # noqa: E402
+
+from intercom_models import decode_envelope, decode_event  # noqa: E402
+
+TOPIC = "conversation.user.replied"
+ITERATIONS = 5000
+RETAINED = 1000
+
+
+def decode_dict(payload: bytes):
+    data = json.loads(payload.decode("utf-8"))
+    return data.get("topic"), data
+
+
+def decode_typed(payload: bytes):
+    envelope = decode_envelope(payload)
+    return envelope.topic, decode_event(envelope.topic, payload)
+
+
+def time_per_event(decode, payload: bytes) -> float:
+    for _ in range(100):
+        decode(payload)
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        decode(payload)
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+def retained_per_event(decode, payloads) -> float:
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    kept = [decode(payload)[1] for payload in payloads]
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del kept
+    return retained / len(payloads)
+
+
+def main():
+    print(f"{'parts':>5} {'bytes':>7} {'path':<6} {'decode us':>10} {'retained B':>11}")
+    for parts in (1, 5, 20):
+        payloads = [webhook(TOPIC, str(100000 + i), parts) for i in range(RETAINED)]
+        for name, decode in (("dict", decode_dict), ("typed", decode_typed)):
+            micros = time_per_event(decode, payloads[0])
+            retained = retained_per_event(decode, payloads)
+            print(
+                f"{parts:>5} {len(payloads[0]):>7} {name:<6} "
+                f"{micros:>10.1f} {retained:>11.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
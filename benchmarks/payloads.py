@@ -0,0 +1,156 @@
+"""
+Realistic Intercom payload builders for benchmarks.
+Shapes follow the Intercom REST API v2.x conversation and webhook objects.
+"""
+
+import json
+import time
+
+
+def _author(index: int, kind: str = "user") -> dict:
+    return {
+        "type": kind,
+        "id": f"{kind}-{index:024x}",
+        "name": f"Customer {index}" if kind == "user" else f"Agent {index}",
+        "email": f"person{index}@example.com",
+    }
+
+
+def conversation_part(index: int) -> dict:
+    """Build one conversation part with a typical message body."""
+    now = int(time.time())
+    return {
+        "type": "conversation_part",
+        "id": str(1000000 + index),
+        "part_type": "comment",
+        "body": (
+            f"<p>Message {index}: Hi, I still cannot log in to my account after "
+            "resetting the password. The error says the session has expired. "
+            "Can you help?</p>"
+        ),
+        "created_at": now - 60 * index,
+        "updated_at": now - 60 * index,
+        "notified_at": now - 60 * index,
+        "assigned_to": None,
+        "author": _author(index % 3, "user" if index % 2 else "admin"),
+        "attachments": [],
+        "external_id": None,
+        "redacted": False,
+    }
+
+
+def conversation(conversation_id: str = "123456789", parts: int = 5) -> dict:
+    """Build a conversation object as returned by GET /conversations/{id}."""
+    now = int(time.time())
+    return {
+        "type": "conversation",
+        "id": conversation_id,
+        "title": None,
+        "created_at": now - 3600,
+        "updated_at": now,
+        "waiting_since": now - 120,
+        "snoozed_until": None,
+        "open": True,
+        "state": "open",
+        "read": False,
+        "priority": "not_priority",
+        "admin_assignee_id": 4242,
+        "team_assignee_id": "5017691",
+        "assignee": {"type": "admin", "id": "4242", "name": "Agent 42"},
+        "tags": {
+            "type": "tag.list",
+            "tags": [{"type": "tag", "id": "7", "name": "vip"}],
+        },
+        "conversation_rating": None,
+        "source": {
+            "type": "conversation",
+            "id": "403918320",
+            "delivered_as": "customer_initiated",
+            "subject": "",
+            "body": "<p>Hello, I need help with my login.</p>",
+            "author": _author(1),
+            "attachments": [],
+            "url": "https://example.com/account/login",
+            "redacted": False,
+        },
+        "contacts": {
+            "type": "contact.list",
+            "contacts": [{"type": "contact", "id": "5f9f0a7e8f1b2c3d4e5f6a7b"}],
+        },
+        "teammates": {
+            "type": "admin.list",
+            "teammates": [{"type": "admin", "id": "4242"}],
+        },
+        "custom_attributes": {
+            "Plan": "Enterprise",
+            "Region": "EMEA",
+            "Account ID": "acct_000123",
+        },
+        "first_contact_reply": {
+            "created_at": now - 3600,
+            "type": "conversation",
+            "url": "https://example.com/account/login",
+        },
+        "sla_applied": None,
+        "statistics": {
+            "type": "conversation_statistics",
+            "time_to_assignment": 0,
+            "time_to_admin_reply": 95,
+            "time_to_first_close": None,
+            "time_to_last_close": None,
+            "median_time_to_reply": 95,
+            "first_contact_reply_at": now - 3600,
+            "first_assignment_at": now - 3590,
+            "first_admin_reply_at": now - 3500,
+            "first_close_at": None,
+            "last_assignment_at": now - 3590,
+            "last_assignment_admin_reply_at": now - 3500,
+            "last_contact_reply_at": now - 120,
+            "last_admin_reply_at": now - 3500,
+            "last_close_at": None,
+            "last_closed_by_id": None,
+            "count_reopens": 0,
+            "count_assignments": 1,
+            "count_conversation_parts": parts,
+        },
+        "conversation_parts": {
+            "type": "conversation_part.list",
+            "conversation_parts": [conversation_part(i) for i in range(parts)],
+            "total_count": parts,
+        },
+        "linked_objects": {
+            "type": "list",
+            "data": [],
+            "total_count": 0,
+            "has_more": False,
+        },
+        "ai_agent_participated": False,
+    }
+
+
+def webhook(
+    topic: str = "conversation.user.replied",
+    conversation_id: str = "123456789",
+    parts: int = 5,
+) -> bytes:
+    """Build a raw webhook notification body."""
+    now = int(time.time())
+    return json.dumps(
+        {
+            "type": "notification_event",
+            "app_id": "abc12345",
+            "data": {
+                "type": "notification_event_data",
+                "item": conversation(conversation_id, parts),
+            },
+            "links": {},
+            "id": f"notif_{conversation_id}_{now}",
+            "topic": topic,
+            "delivery_status": "pending",
+            "delivery_attempts": 1,
+            "delivered_at": 0,
+            "first_sent_at": now,
+            "created_at": now,
+            "self": None,
+        }
+    ).encode("utf-8")
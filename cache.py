@@ -0,0 +1,290 @@
+"""
+Shared caching primitives.
+Provides a bounded in-memory TTL+LRU cache, single-flight call sharing, a
+JSON file shared by worker processes and an optional Redis client factory.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Bounded mapping whose entries expire after a TTL and evict in LRU order."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Maximum number of entries kept
+            ttl (float): Default time to live in seconds
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a live entry and mark it as recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return default
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store an entry, evicting the least recently used ones if full."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def add(
+        self, key: Hashable, value: Any = True, ttl: Optional[float] = None
+    ) -> bool:
+        """
+        Store an entry only if the key is not already live.
+
+        Returns:
+            bool: True if the entry was added
+        """
+        if self.get(key, _MISSING) is not _MISSING:
+            return False
+        self.set(key, value, ttl)
+        return True
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry and return its value."""
+        value = self.get(key, default)
+        self._entries.pop(key, None)
+        return value
+
+    def keys(self) -> List[Hashable]:
+        """Get a snapshot of the stored keys, including expired ones."""
+        return list(self._entries)
+
+    def clear(self):
+        """Remove all entries."""
+        self._entries.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SingleFlight:
+    """Shares one in-flight call between concurrent callers with the same key."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run the call unless one is already in flight for the key, then wait.
+
+        Cancelling one caller does not cancel the shared call.
+
+        Args:
+            key (Hashable): Call key
+            call (Callable): Coroutine function started for the first caller
+
+        Returns:
+            Any: Result of the shared call
+        """
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(call())
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(future)
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Check whether a call is running for the key."""
+        return key in self._calls
+
+    def _forget(self, key: Hashable, future: asyncio.Future):
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        # Nobody may be waiting any more; mark the error as retrieved
+        if not future.cancelled():
+            future.exception()
+
+
+@contextmanager
+def file_lock(path: str, blocking: bool = True) -> Iterator[bool]:
+    """
+    Hold an exclusive flock on a lock file shared by the worker processes.
+
+    Without flock support, e.g. on Windows, the lock is always taken.
+
+    Args:
+        path (str): Lock file path, created if missing
+        blocking (bool): False gives up at once if another holder has it
+
+    Yields:
+        bool: True if the lock was taken, False if another holder has it
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(path, "a") as lock_file:
+        if fcntl is None:
+            yield True
+            return
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class SharedJsonFile:
+    """
+    JSON object in a file on a volume shared by the worker processes.
+
+    Writes hold an exclusive flock on ``<path>.lock`` and go through a temp
+    file of their own that replaces the file atomically, so readers never
+    see a truncated file and concurrent writers never lose each other's
+    updates. Files are readable by the service user only.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the file.
+
+        Args:
+            path (str): JSON file path
+        """
+        self.path = path
+        self.lock_path = f"{path}.lock"
+
+    def read(self) -> Dict[str, Any]:
+        """
+        Read the stored object.
+
+        Returns:
+            Dict: Stored object, empty if the file does not exist
+
+        Raises:
+            ValueError: If the file is not valid JSON
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def write(self, data: Dict[str, Any]):
+        """Replace the stored object."""
+        with file_lock(self.lock_path):
+            self._replace(data)
+
+    def update(
+        self, change: Callable[[Dict[str, Any]], Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Re-read the stored object and write back a changed copy under the lock.
+
+        Args:
+            change (Callable): Gets the stored object, empty if the file is
+                missing or unreadable, and returns the object to store
+
+        Returns:
+            Dict: The object stored
+        """
+        with file_lock(self.lock_path):
+            try:
+                current = self.read()
+            except ValueError:
+                logger.warning(f"Replacing unreadable file {self.path}")
+                current = {}
+            data = change(current)
+            self._replace(data)
+            return data
+
+    def _replace(self, data: Dict[str, Any]):
+        descriptor, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(self.path) or None,
+            prefix=f"{os.path.basename(self.path)}.",
+            suffix=".tmp",
+        )
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+
+def create_redis_client(
+    host: Optional[str],
+    port: Optional[int] = None,
+    db: int = 0,
+    password: Optional[str] = None,
+):
+    """
+    Create an asyncio Redis client if Redis is configured and installed.
+
+    Args:
+        host (Optional[str]): Redis host, None disables Redis
+        port (Optional[int]): Redis port
+        db (int): Redis database number
+        password (Optional[str]): Redis password
+
+    Returns:
+        Optional[redis.asyncio.Redis]: Client, or None when unavailable
+    """
+    if not host:
+        return None
+
+    try:
+        # Imported on demand, it adds noticeably to startup
+        import redis.asyncio as redis_asyncio
+    except Exception:  # pragma: no cover - optional dependency
+        logger.warning("REDIS_HOST is set but the redis package is not installed")
+        return None
+
+    return redis_asyncio.Redis(
+        host=host, port=port or 6379, db=db, password=password or None
+    )
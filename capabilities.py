@@ -0,0 +1,109 @@
+"""
+Availability tracking for optional API features.
+Features are probed lazily by their first real call. A feature found
+unavailable is short-circuited locally and probed again after an interval
+that doubles each time the probe fails.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class _Capability:
+    available: Optional[bool] = None
+    interval: float = 0.0
+    next_probe_at: float = 0.0
+    probing: bool = False
+
+
+class CapabilityCache:
+    """Remembers which optional features work and when to re-check them."""
+
+    def __init__(self, reprobe_interval: float = 300.0, max_interval: float = 21600.0):
+        """
+        Initialize the cache.
+
+        Args:
+            reprobe_interval (float): Seconds before the first re-probe of an
+                unavailable feature
+            max_interval (float): Upper bound for the doubling interval
+        """
+        self.reprobe_interval = reprobe_interval
+        self.max_interval = max_interval
+        self._features: Dict[str, _Capability] = {}
+
+    def should_try(self, name: str) -> bool:
+        """
+        Check whether a call to a feature should be made.
+
+        Unknown and available features are always tried. An unavailable
+        feature is tried once when its re-probe is due.
+
+        Args:
+            name (str): Feature name
+
+        Returns:
+            bool: True if the call should go ahead
+        """
+        feature = self._features.setdefault(name, _Capability())
+        if feature.available is not False:
+            return True
+        if feature.probing or time.monotonic() < feature.next_probe_at:
+            return False
+        feature.probing = True
+        return True
+
+    def record(self, name: str, available: bool):
+        """
+        Record the outcome of a call that showed whether a feature works.
+
+        Args:
+            name (str): Feature name
+            available (bool): Whether the feature responded successfully
+        """
+        feature = self._features.setdefault(name, _Capability())
+        feature.probing = False
+
+        if available:
+            if feature.available is False:
+                logger.info(f"Optional feature {name} is available again")
+            feature.available = True
+            feature.interval = 0.0
+            return
+
+        if feature.available is False:
+            feature.interval = min(feature.interval * 2, self.max_interval)
+        else:
+            feature.interval = self.reprobe_interval
+        feature.available = False
+        feature.next_probe_at = time.monotonic() + feature.interval
+        logger.warning(
+            f"Optional feature {name} is unavailable, "
+            f"re-probing in {feature.interval:.0f}s"
+        )
+
+    def release(self, name: str):
+        """End a probe that failed for an unrelated reason, e.g. a timeout."""
+        feature = self._features.get(name)
+        if feature:
+            feature.probing = False
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get the availability of every feature seen so far."""
+        now = time.monotonic()
+        return {
+            name: {
+                "available": feature.available,
+                "next_probe_in": (
+                    round(max(feature.next_probe_at - now, 0.0), 1)
+                    if feature.available is False
+                    else None
+                ),
+            }
+            for name, feature in self._features.items()
+        }
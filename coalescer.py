@@ -0,0 +1,142 @@
+"""
+Per-key coalescing window for bursty events.
+Items added for the same key are collected until the key has been quiet for
+a while, or the oldest item reaches a maximum delay, and are then flushed as
+one batch. Batches of one key are flushed one after another, in order.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FlushCallback = Callable[[Hashable, List[Any]], Awaitable[Any]]
+
+
+@dataclass(slots=True)
+class _Batch:
+    first_at: float
+    items: List[Any] = field(default_factory=list)
+    futures: List[asyncio.Future] = field(default_factory=list)
+    timer: Optional[asyncio.TimerHandle] = None
+
+
+class Coalescer:
+    """Collects items per key and flushes each key's batch once."""
+
+    def __init__(self, flush: FlushCallback, quiet_period: float, max_delay: float):
+        """
+        Initialize the coalescer.
+
+        Args:
+            flush (Callable): Coroutine function called with (key, items)
+            quiet_period (float): Seconds without new items before flushing
+            max_delay (float): Maximum seconds the oldest item may wait
+        """
+        self.flush = flush
+        self.quiet_period = quiet_period
+        self.max_delay = max_delay
+        self._batches: Dict[Hashable, _Batch] = {}
+        # Latest flush started for each key; each flush waits for the one before
+        self._flushing: Dict[Hashable, asyncio.Task] = {}
+
+    def add(self, key: Hashable, item: Any) -> asyncio.Future:
+        """
+        Add an item to the key's pending batch.
+
+        Args:
+            key (Hashable): Coalescing key, e.g. a conversation ID
+            item (Any): Item to include in the batch
+
+        Returns:
+            asyncio.Future: Resolved with the flush result for the batch
+        """
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = _Batch(first_at=now)
+        elif batch.timer:
+            batch.timer.cancel()
+
+        future = loop.create_future()
+        batch.items.append(item)
+        batch.futures.append(future)
+
+        delay = min(self.quiet_period, batch.first_at + self.max_delay - now)
+        batch.timer = loop.call_later(max(delay, 0), self._start_flush, key)
+        return future
+
+    def pending(self, key: Hashable) -> bool:
+        """Check whether the key has items waiting for or being flushed."""
+        return key in self._batches or key in self._flushing
+
+    async def flush_now(self, key: Hashable):
+        """
+        Flush the key's pending batch immediately and wait for it, and for
+        any earlier flush of the key still in flight.
+
+        Args:
+            key (Hashable): Coalescing key
+
+        Raises:
+            Exception: The error of the key's last flush, so that later work
+                for the key can be retried after it
+        """
+        self._start_flush(key)
+        task = self._flushing.get(key)
+        if task is None:
+            return
+        error = await asyncio.shield(task)
+        if error is not None:
+            raise error
+
+    async def close(self):
+        """Flush every pending batch and wait for in-flight flushes."""
+        for key in list(self._batches):
+            self._start_flush(key)
+        if self._flushing:
+            await asyncio.gather(*self._flushing.values(), return_exceptions=True)
+
+    def _start_flush(self, key: Hashable):
+        batch = self._batches.pop(key, None)
+        if batch is None:
+            return
+        if batch.timer:
+            batch.timer.cancel()
+        task = asyncio.ensure_future(self._flush(key, batch, self._flushing.get(key)))
+        self._flushing[key] = task
+        task.add_done_callback(lambda done: self._forget(key, done))
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._flushing.get(key) is task:
+            del self._flushing[key]
+
+    async def _flush(
+        self, key: Hashable, batch: _Batch, previous: Optional[asyncio.Task]
+    ) -> Optional[Exception]:
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+
+        started = time.monotonic()
+        try:
+            result = await self.flush(key, batch.items)
+        except Exception as e:
+            logger.error(f"Coalesced flush for {key} failed: {str(e)}")
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(e)
+            return e
+
+        logger.info(
+            f"Flushed {len(batch.items)} coalesced items for {key} in "
+            f"{time.monotonic() - started:.3f}s"
+        )
+        for future in batch.futures:
+            if not future.done():
+                future.set_result(result)
+        return None
@@ -118,10 +118,161 @@ class AppConfig(BaseSettings):
         default="Customer Support", env="DEFAULT_CHANNEL_NAME"
     )
 
+    # Intercom HTTP connection pool
+    intercom_connection_limit: int = Field(default=100, env="INTERCOM_CONNECTION_LIMIT")
+    intercom_keepalive_seconds: float = Field(
+        default=30.0, env="INTERCOM_KEEPALIVE_SECONDS"
+    )
+    intercom_dns_cache_seconds: int = Field(
+        default=300, env="INTERCOM_DNS_CACHE_SECONDS"
+    )
+    intercom_request_timeout_seconds: float = Field(
+        default=15.0, env="INTERCOM_REQUEST_TIMEOUT_SECONDS"
+    )
+    intercom_connect_timeout_seconds: float = Field(
+        default=5.0, env="INTERCOM_CONNECT_TIMEOUT_SECONDS"
+    )
+
+    # Intercom rate limiting
+    intercom_rate_limit_per_minute: int = Field(
+        default=10000, env="INTERCOM_RATE_LIMIT_PER_MINUTE"
+    )
+    intercom_rate_limit_bulk_reserve: float = Field(
+        default=0.2, env="INTERCOM_RATE_LIMIT_BULK_RESERVE"
+    )
+    intercom_rate_limit_max_retries: int = Field(
+        default=3, env="INTERCOM_RATE_LIMIT_MAX_RETRIES"
+    )
+
+    # Re-probing of optional Intercom features such as FIN AI
+    capability_reprobe_seconds: int = Field(
+        default=300, env="CAPABILITY_REPROBE_SECONDS"
+    )
+    capability_reprobe_max_seconds: int = Field(
+        default=21600, env="CAPABILITY_REPROBE_MAX_SECONDS"
+    )
+
+    # Intercom conversation cache
+    intercom_conversation_cache_size: int = Field(
+        default=1000, env="INTERCOM_CONVERSATION_CACHE_SIZE"
+    )
+    intercom_conversation_cache_ttl_seconds: int = Field(
+        default=300, env="INTERCOM_CONVERSATION_CACHE_TTL_SECONDS"
+    )
+
+    # Email to Intercom contact cache for messages forwarded from Teams
+    contact_cache_ttl_seconds: int = Field(
+        default=86400, env="CONTACT_CACHE_TTL_SECONDS"
+    )
+    contact_cache_negative_ttl_seconds: int = Field(
+        default=3600, env="CONTACT_CACHE_NEGATIVE_TTL_SECONDS"
+    )
+    contact_cache_max_entries: int = Field(
+        default=10000, env="CONTACT_CACHE_MAX_ENTRIES"
+    )
+    contact_cache_path: Optional[str] = Field(
+        default="./data/contact_cache.json", env="CONTACT_CACHE_PATH"
+    )
+    contact_cache_save_interval_seconds: int = Field(
+        default=60, env="CONTACT_CACHE_SAVE_INTERVAL_SECONDS"
+    )
+
+    # Backfill of Intercom conversations into Teams
+    backfill_concurrency: int = Field(default=4, env="BACKFILL_CONCURRENCY")
+    backfill_max_concurrency: int = Field(default=32, env="BACKFILL_MAX_CONCURRENCY")
+    backfill_page_size: int = Field(default=50, env="BACKFILL_PAGE_SIZE")
+    backfill_checkpoint_path: Optional[str] = Field(
+        default="./data/backfill_checkpoint.json", env="BACKFILL_CHECKPOINT_PATH"
+    )
+    backfill_checkpoint_interval_seconds: float = Field(
+        default=5.0, env="BACKFILL_CHECKPOINT_INTERVAL_SECONDS"
+    )
+
+    # Retries and circuit breakers for Graph and Intercom calls
+    retry_max_attempts: int = Field(default=3, env="RETRY_MAX_ATTEMPTS")
+    retry_backoff_base_ms: int = Field(default=200, env="RETRY_BACKOFF_BASE_MS")
+    retry_backoff_max_ms: int = Field(default=5000, env="RETRY_BACKOFF_MAX_MS")
+    circuit_failure_threshold: int = Field(default=5, env="CIRCUIT_FAILURE_THRESHOLD")
+    circuit_reset_seconds: float = Field(default=30.0, env="CIRCUIT_RESET_SECONDS")
+
+    # Authenticate with Graph in the background so webhooks are accepted
+    # and journaled immediately at startup
+    fast_start: bool = Field(default=False, env="FAST_START")
+
+    # Graph token cache shared by workers (Redis when REDIS_HOST is set)
+    graph_token_cache_path: Optional[str] = Field(
+        default="./data/graph_token_cache.json", env="GRAPH_TOKEN_CACHE_PATH"
+    )
+    graph_token_refresh_margin_seconds: int = Field(
+        default=300, env="GRAPH_TOKEN_REFRESH_MARGIN_SECONDS"
+    )
+
+    # Delta links for incremental channel message reads (empty keeps them
+    # in memory only)
+    graph_delta_link_path: Optional[str] = Field(
+        default="./data/graph_delta_links.json", env="GRAPH_DELTA_LINK_PATH"
+    )
+
+    # Microsoft Graph JSON batching
+    graph_batch_enabled: bool = Field(default=True, env="GRAPH_BATCH_ENABLED")
+    graph_batch_window_ms: int = Field(default=10, env="GRAPH_BATCH_WINDOW_MS")
+    graph_batch_max_size: int = Field(default=20, env="GRAPH_BATCH_MAX_SIZE")
+
+    # Teams post throttling, per channel and across all channels
+    teams_channel_send_rate: float = Field(default=1.0, env="TEAMS_CHANNEL_SEND_RATE")
+    teams_channel_send_burst: float = Field(default=5.0, env="TEAMS_CHANNEL_SEND_BURST")
+    teams_global_send_rate: float = Field(default=20.0, env="TEAMS_GLOBAL_SEND_RATE")
+    teams_global_send_burst: float = Field(default=40.0, env="TEAMS_GLOBAL_SEND_BURST")
+    # Posts expected to wait longer are refused and retried from the journal
+    teams_send_max_queue_seconds: float = Field(
+        default=5.0, env="TEAMS_SEND_MAX_QUEUE_SECONDS"
+    )
+
+    # Channel resolution cache
+    channel_cache_ttl_seconds: int = Field(default=900, env="CHANNEL_CACHE_TTL_SECONDS")
+
+    # Team directory, refreshed in the background once this old
+    team_directory_ttl_seconds: int = Field(
+        default=900, env="TEAM_DIRECTORY_TTL_SECONDS"
+    )
+
     # Webhook settings
     webhook_path: str = Field(default="/webhooks/intercom", env="WEBHOOK_PATH")
     cors_origins_raw: Optional[str] = Field(default=None, env="CORS_ORIGINS")
     allowed_hosts_raw: Optional[str] = Field(default=None, env="ALLOWED_HOSTS")
+    webhook_max_body_bytes: int = Field(
+        default=1024 * 1024, env="WEBHOOK_MAX_BODY_BYTES"
+    )
+
+    # Webhook ingest journal
+    webhook_journal_path: str = Field(
+        default="./data/webhook_journal.db", env="WEBHOOK_JOURNAL_PATH"
+    )
+    webhook_journal_commit_interval_ms: int = Field(
+        default=5, env="WEBHOOK_JOURNAL_COMMIT_INTERVAL_MS"
+    )
+    webhook_journal_max_batch: int = Field(default=500, env="WEBHOOK_JOURNAL_MAX_BATCH")
+    webhook_journal_max_attempts: int = Field(
+        default=5, env="WEBHOOK_JOURNAL_MAX_ATTEMPTS"
+    )
+
+    # Webhook deduplication (uses Redis when REDIS_HOST is set)
+    webhook_dedupe_ttl_seconds: int = Field(
+        default=3600, env="WEBHOOK_DEDUPE_TTL_SECONDS"
+    )
+    webhook_dedupe_max_entries: int = Field(
+        default=10000, env="WEBHOOK_DEDUPE_MAX_ENTRIES"
+    )
+
+    # Coalescing of bursty conversation.user.replied events (0 disables)
+    reply_coalesce_quiet_ms: int = Field(default=1500, env="REPLY_COALESCE_QUIET_MS")
+    reply_coalesce_max_delay_ms: int = Field(
+        default=5000, env="REPLY_COALESCE_MAX_DELAY_MS"
+    )
+
+    # Webhook worker pool
+    webhook_workers: int = Field(default=8, env="WEBHOOK_WORKERS")
+    webhook_worker_queue_size: int = Field(default=100, env="WEBHOOK_WORKER_QUEUE_SIZE")
 
     _cors_origins: list[str] = PrivateAttr(default_factory=list)
     _allowed_hosts: list[str] = PrivateAttr(default_factory=list)
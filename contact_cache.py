@@ -0,0 +1,184 @@
+"""
+Email to Intercom contact ID cache.
+Remembers resolved contacts and emails Intercom rejected, so repeat senders
+skip the contact lookup. It can persist to the data volume and survive
+restarts; saves from several worker processes are merged under a file lock.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+
+from cache import SharedJsonFile, TTLCache
+
+logger = logging.getLogger(__name__)
+
+_EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+# Cached value for emails that cannot be resolved to a contact
+_INVALID = ""
+
+
+def normalize_email(email: str) -> str:
+    """Normalize an email address for use as a cache key."""
+    return email.strip().lower()
+
+
+class ContactIdentityCache:
+    """TTL cache of contact IDs by email, with negative entries."""
+
+    def __init__(
+        self,
+        ttl: float = 86400.0,
+        negative_ttl: float = 3600.0,
+        max_entries: int = 10000,
+        path: Optional[str] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl (float): Seconds a resolved contact ID is kept
+            negative_ttl (float): Seconds an invalid email is remembered
+            max_entries (int): Maximum number of emails kept
+            path (Optional[str]): JSON file to persist to, None keeps the
+                cache in memory only
+        """
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.path = path
+        self._file = SharedJsonFile(path) if path else None
+        # email -> (contact ID or _INVALID, wall-clock expiry for persistence)
+        self._entries = TTLCache(max_entries=max_entries, ttl=ttl)
+        self.max_entries = max_entries
+        # Emails forgotten since the last save, dropped from the file as well
+        self._removed: Set[str] = set()
+        self._dirty = False
+
+    def get(self, email: str) -> Optional[str]:
+        """
+        Get the cached contact ID for an email.
+
+        Args:
+            email (str): Email address
+
+        Returns:
+            Optional[str]: Contact ID, or None if not cached or invalid
+        """
+        entry = self._entries.get(normalize_email(email))
+        return entry[0] if entry and entry[0] != _INVALID else None
+
+    def is_invalid(self, email: str) -> bool:
+        """
+        Check whether an email is malformed or was rejected by Intercom.
+
+        Args:
+            email (str): Email address
+
+        Returns:
+            bool: True if no contact can be resolved for the email
+        """
+        email = normalize_email(email)
+        if not _EMAIL_PATTERN.match(email):
+            return True
+        entry = self._entries.get(email)
+        return entry is not None and entry[0] == _INVALID
+
+    def set(self, email: str, contact_id: str):
+        """Cache the contact ID resolved for an email."""
+        self._store(normalize_email(email), contact_id, self.ttl)
+
+    def mark_invalid(self, email: str):
+        """Remember that Intercom rejected an email."""
+        self._store(normalize_email(email), _INVALID, self.negative_ttl)
+
+    def invalidate(self, email: str):
+        """Forget an email, e.g. after its contact was deleted."""
+        email = normalize_email(email)
+        self._entries.pop(email)
+        self._removed.add(email)
+        self._dirty = True
+
+    def _store(self, email: str, value: str, ttl: float):
+        self._entries.set(email, (value, time.time() + ttl), ttl)
+        self._removed.discard(email)
+        self._dirty = True
+
+    async def load(self):
+        """Load persisted entries that have not expired yet."""
+        if not self._file:
+            return
+
+        try:
+            entries = await asyncio.to_thread(self._file.read)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable contact cache {self.path}: {str(e)}")
+            return
+
+        now = time.time()
+        for email, (value, expires_at) in entries.items():
+            if expires_at > now:
+                self._entries.set(email, (value, expires_at), expires_at - now)
+        self._dirty = False
+        logger.info(f"Loaded {len(self._entries)} cached contacts")
+
+    async def save(self):
+        """
+        Persist live entries if anything changed since the last save.
+
+        Entries saved by other worker processes are merged in, so each
+        worker adds its contacts to the file instead of replacing it.
+        """
+        if not self._file or not self._dirty:
+            return
+
+        entries = {}
+        for email in self._entries.keys():
+            entry = self._entries.get(email)
+            if entry is not None:
+                entries[email] = entry
+        removed = set(self._removed)
+
+        try:
+            await asyncio.to_thread(
+                self._file.update, lambda saved: self._merged(saved, entries, removed)
+            )
+            self._removed -= removed
+            self._dirty = False
+        except Exception as e:
+            logger.error(f"Failed to save contact cache {self.path}: {str(e)}")
+
+    async def save_periodically(self, interval: float):
+        """
+        Save changed entries every interval until cancelled.
+
+        Args:
+            interval (float): Seconds between saves
+        """
+        while True:
+            await asyncio.sleep(interval)
+            await self.save()
+
+    def _merged(
+        self,
+        saved: Dict[str, Any],
+        entries: Dict[str, Tuple[str, float]],
+        removed: Set[str],
+    ) -> Dict[str, Tuple[str, float]]:
+        now = time.time()
+        merged = {
+            email: tuple(entry)
+            for email, entry in saved.items()
+            if entry[1] > now and email not in removed
+        }
+        for email, entry in entries.items():
+            # The entry expiring later is the one resolved most recently
+            if email not in merged or entry[1] >= merged[email][1]:
+                merged[email] = entry
+
+        if len(merged) > self.max_entries:
+            newest = sorted(merged.items(), key=lambda item: item[1][1])
+            merged = dict(newest[-self.max_entries :])
+        return merged
@@ -0,0 +1,108 @@
+"""
+Idempotency stores for Intercom webhook deliveries.
+Intercom retries slow deliveries with the same notification ID, so each ID is
+claimed once its event is journaled and later deliveries are recognised as
+duplicates.
+"""
+
+import logging
+
+from cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryIdempotencyStore:
+    """Per-process store backed by a bounded TTL+LRU cache."""
+
+    def __init__(self, ttl: float = 3600.0, max_entries: int = 10000):
+        """
+        Initialize the store.
+
+        Args:
+            ttl (float): Seconds a notification ID is remembered
+            max_entries (int): Maximum number of IDs remembered
+        """
+        self._seen = TTLCache(max_entries=max_entries, ttl=ttl)
+
+    async def seen(self, notification_id: str) -> bool:
+        """
+        Check whether a notification ID was claimed already.
+
+        Args:
+            notification_id (str): Intercom notification ID
+
+        Returns:
+            bool: True for duplicates
+        """
+        return notification_id in self._seen
+
+    async def claim(self, notification_id: str) -> bool:
+        """
+        Claim a notification ID.
+
+        Args:
+            notification_id (str): Intercom notification ID
+
+        Returns:
+            bool: True if this is the first delivery, False for duplicates
+        """
+        return self._seen.add(notification_id)
+
+
+class RedisIdempotencyStore:
+    """Store shared by all workers through Redis SET NX."""
+
+    def __init__(self, client, ttl: float = 3600.0, prefix: str = "webhook:seen:"):
+        """
+        Initialize the store.
+
+        Args:
+            client: redis.asyncio client
+            ttl (float): Seconds a notification ID is remembered
+            prefix (str): Key prefix for notification IDs
+        """
+        self.client = client
+        self.ttl = int(ttl)
+        self.prefix = prefix
+
+    async def seen(self, notification_id: str) -> bool:
+        """
+        Check whether a notification ID was claimed already.
+
+        Fails open if Redis is unavailable, like claim().
+
+        Args:
+            notification_id (str): Intercom notification ID
+
+        Returns:
+            bool: True for duplicates
+        """
+        try:
+            return bool(await self.client.exists(f"{self.prefix}{notification_id}"))
+        except Exception as e:
+            logger.warning(f"Redis idempotency check failed, accepting: {str(e)}")
+            return False
+
+    async def claim(self, notification_id: str) -> bool:
+        """
+        Claim a notification ID.
+
+        Fails open if Redis is unavailable, so deliveries are never dropped
+        because of a cache outage.
+
+        Args:
+            notification_id (str): Intercom notification ID
+
+        Returns:
+            bool: True if this is the first delivery, False for duplicates
+        """
+        try:
+            return bool(
+                await self.client.set(
+                    f"{self.prefix}{notification_id}", "1", nx=True, ex=self.ttl
+                )
+            )
+        except Exception as e:
+            logger.warning(f"Redis idempotency check failed, accepting: {str(e)}")
+            return True
@@ -0,0 +1,100 @@
+"""
+Delta links for incremental reads of Teams channel messages.
+A Graph delta link resumes a channel's message delta query where the last
+read stopped, so later reads transfer only new and changed messages. Links
+are kept per channel and can persist to the data volume to survive restarts.
+The file is shared by the worker processes: each read picks up links saved
+by the others, and updates are merged into it under a file lock.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Dict, Optional, Tuple
+
+from cache import SharedJsonFile
+
+logger = logging.getLogger(__name__)
+
+
+def channel_key(team_id: str, channel_id: str) -> str:
+    """Get the key a channel's delta link is stored under."""
+    return f"{team_id}/{channel_id}"
+
+
+class DeltaLinkStore:
+    """Delta and next links by channel, optionally kept in a JSON file."""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize the store.
+
+        Args:
+            path (Optional[str]): JSON file to persist to, None keeps the
+                links in memory only
+        """
+        self.path = path
+        self._file = SharedJsonFile(path) if path else None
+        self._links: Optional[Dict[str, str]] = None
+        # Modification time and size of the file the links were read from
+        self._version: Optional[Tuple[int, int]] = None
+
+    async def get(self, key: str) -> Optional[str]:
+        """Get the link to resume a channel's delta query from."""
+        links = await self._load()
+        return links.get(key)
+
+    async def set(self, key: str, link: str):
+        """Store the link to resume a channel's delta query from."""
+        links = await self._load()
+        links[key] = link
+        await self._save(key, link)
+
+    async def pop(self, key: str):
+        """Forget a channel's link, e.g. after Graph expired it."""
+        links = await self._load()
+        if links.pop(key, None) is not None:
+            await self._save(key, None)
+
+    async def _load(self) -> Dict[str, str]:
+        if not self._file:
+            if self._links is None:
+                self._links = {}
+            return self._links
+
+        # Re-read whenever another worker has saved since the last read
+        version = self._stat()
+        if self._links is None or version != self._version:
+            self._links, self._version = {}, version
+            if version is not None:
+                try:
+                    self._links = await asyncio.to_thread(self._file.read)
+                except Exception as e:
+                    logger.warning(
+                        f"Ignoring unreadable delta links {self.path}: {str(e)}"
+                    )
+        return self._links
+
+    async def _save(self, key: str, link: Optional[str]):
+        if not self._file:
+            return
+
+        def change(links: Dict[str, str]) -> Dict[str, str]:
+            # Merged into the file so links saved by other workers are kept
+            if link is None:
+                links.pop(key, None)
+            else:
+                links[key] = link
+            return links
+
+        try:
+            await asyncio.to_thread(self._file.update, change)
+        except Exception as e:
+            logger.warning(f"Failed to save delta links to {self.path}: {str(e)}")
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,247 @@
+"""
+Microsoft Graph JSON batching.
+Collects Graph requests for a few milliseconds and submits them as
+``/$batch`` requests of up to 20, resolving each caller with its own result.
+"""
+
+import asyncio
+import itertools
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+GRAPH_BASE_URL = "https://graph.microsoft.com/v1.0"
+
+# Graph rejects batches with more than 20 requests
+MAX_BATCH_SIZE = 20
+
+
+class GraphBatchError(Exception):
+    """A batched Graph request failed."""
+
+    def __init__(self, status: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"Graph API error {status}: {message}")
+        self.status = status
+        self.response_status_code = status
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header given in seconds.
+
+    Args:
+        value (Optional[str]): Header value
+
+    Returns:
+        Optional[float]: Seconds to wait, or None if absent or not numeric
+    """
+    try:
+        return max(float(value), 0.0) if value else None
+    except ValueError:
+        return None
+
+
+def _resolve(future: asyncio.Future, result: Any):
+    if not future.done():
+        future.set_result(result)
+
+
+def _reject(future: asyncio.Future, error: BaseException):
+    if not future.done():
+        future.set_exception(error)
+
+
+@dataclass(slots=True)
+class BatchRequest:
+    """A request waiting to be sent in a batch."""
+
+    id: str
+    method: str
+    url: str
+    body: Optional[Dict[str, Any]]
+    future: asyncio.Future
+
+
+class GraphBatcher:
+    """Coalesces Graph requests into JSON batch requests."""
+
+    def __init__(
+        self,
+        token_provider: Callable[[], Awaitable[str]],
+        window: float = 0.01,
+        max_batch: int = MAX_BATCH_SIZE,
+        base_url: str = GRAPH_BASE_URL,
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            token_provider (Callable): Coroutine function returning an access token
+            window (float): Seconds to collect requests before sending
+            max_batch (int): Requests per batch, at most 20
+            base_url (str): Graph API base URL including the version
+        """
+        self.token_provider = token_provider
+        self.window = window
+        self.max_batch = min(max_batch, MAX_BATCH_SIZE)
+        self.base_url = base_url.rstrip("/")
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._ids = itertools.count(1)
+        self._pending: List[BatchRequest] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: set = set()
+
+    def submit(
+        self,
+        method: str,
+        url: str,
+        body: Optional[Dict[str, Any]] = None,
+    ) -> BatchRequest:
+        """
+        Queue a request for the next batch.
+
+        Args:
+            method (str): HTTP method
+            url (str): Path relative to the API version, e.g. ``/teams/{id}``
+            body (Optional[Dict]): JSON body
+
+        Returns:
+            BatchRequest: Handle whose future resolves with the response body
+        """
+        loop = asyncio.get_running_loop()
+        request = BatchRequest(
+            id=str(next(self._ids)),
+            method=method,
+            url=url,
+            body=body,
+            future=loop.create_future(),
+        )
+        self._pending.append(request)
+
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._start_flush)
+        return request
+
+    async def request(
+        self, method: str, url: str, body: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Send a request through the batcher and wait for its response.
+
+        Args:
+            method (str): HTTP method
+            url (str): Path relative to the API version
+            body (Optional[Dict]): JSON body
+
+        Returns:
+            Dict: Response body
+        """
+        return await self.submit(method, url, body).future
+
+    async def close(self):
+        """Send pending requests and close the HTTP session."""
+        if self._flush_handle:
+            self._flush_handle.cancel()
+        self._start_flush()
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    def _start_flush(self):
+        self._flush_handle = None
+        if not self._pending:
+            return
+
+        requests, self._pending = self._pending, []
+        chunks = [
+            requests[start : start + self.max_batch]
+            for start in range(0, len(requests), self.max_batch)
+        ]
+        for chunk in chunks:
+            task = asyncio.ensure_future(self._send_chunk(chunk))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    async def _send_chunk(self, chunk: List[BatchRequest]):
+        payload = []
+        for request in chunk:
+            item = {"id": request.id, "method": request.method, "url": request.url}
+            if request.body is not None:
+                item["body"] = request.body
+                item["headers"] = {"Content-Type": "application/json"}
+            payload.append(item)
+
+        waiting = {
+            request.id: request for request in chunk if not request.future.done()
+        }
+        try:
+            response = await self._post_batch({"requests": payload})
+        except Exception as e:
+            logger.error(f"Graph batch of {len(payload)} requests failed: {str(e)}")
+            for request in waiting.values():
+                _reject(request.future, e)
+            return
+
+        for item in response.get("responses", []):
+            request = waiting.pop(str(item.get("id")), None)
+            if request is None:
+                continue
+
+            status = int(item.get("status", 500))
+            body = item.get("body") or {}
+            if status < 400:
+                _resolve(request.future, body)
+                continue
+
+            error = body.get("error", {}) if isinstance(body, dict) else {}
+            _reject(
+                request.future,
+                GraphBatchError(
+                    status,
+                    error.get("message", "Unknown error"),
+                    parse_retry_after((item.get("headers") or {}).get("Retry-After")),
+                ),
+            )
+
+        for request in waiting.values():
+            _reject(
+                request.future, GraphBatchError(500, "No response for request in batch")
+            )
+
+        logger.info(f"Sent Graph batch with {len(payload)} requests")
+
+    async def _post_batch(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        POST a JSON batch to Graph.
+
+        Args:
+            payload (Dict): Batch request body
+
+        Returns:
+            Dict: Batch response body
+        """
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=60)
+            )
+
+        token = await self.token_provider()
+        async with self.session.post(
+            f"{self.base_url}/$batch",
+            json=payload,
+            headers={"Authorization": f"Bearer {token}"},
+        ) as response:
+            data = await response.json()
+            if response.status >= 400:
+                error = data.get("error", {}) if isinstance(data, dict) else {}
+                raise GraphBatchError(
+                    response.status, error.get("message", "Batch request failed")
+                )
+            return data
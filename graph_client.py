@@ -1,32 +1,112 @@
 """
 Microsoft Graph API client for Teams integration.
 Handles authentication, teams, channels, and message operations.
+The Graph SDK and azure.identity are imported on first use, as together
+they take several hundred milliseconds to import.
 """
 
+import asyncio
 import logging
 import os
-from typing import Any, Dict, List
-
-from azure.identity import DeviceCodeCredential
-from azure.identity.aio import ClientSecretCredential
-from msgraph import GraphServiceClient
-from msgraph.generated.models.body_type import BodyType
-from msgraph.generated.models.channel import Channel
-from msgraph.generated.models.chat_message import ChatMessage
-from msgraph.generated.models.item_body import ItemBody
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
+from cache import SingleFlight, TTLCache
 from config import config
+from delta_links import DeltaLinkStore, channel_key
+from graph_batch import GraphBatcher, parse_retry_after
+from resilience import Resilience, error_status, is_rejected
+from send_scheduler import ChannelSendScheduler
+from team_directory import TeamDirectory
+from token_cache import SharedTokenCredential
 
 logger = logging.getLogger(__name__)
 
+# Graph returns at most 50 channel messages per page
+MAX_MESSAGES_PAGE = 50
+
+# Groups with a team, and the group fields returned for a team
+TEAM_GROUPS_FILTER = "resourceProvisioningOptions/Any(x:x eq 'Team')"
+TEAM_FIELDS = ("id", "displayName", "description", "createdDateTime")
+MAX_GROUPS_PAGE = 999
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    """Get the Retry-After of a throttled Graph call, batched or not."""
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is not None:
+        return retry_after
+    headers = getattr(error, "response_headers", None) or {}
+    for name, value in headers.items():
+        if name.lower() == "retry-after":
+            return parse_retry_after(value)
+    return None
+
+
+def _message_to_dict(message) -> Dict[str, Any]:
+    """Convert a Graph chat message into the dict returned by the API."""
+    return {
+        "id": message.id,
+        "content": message.body.content if message.body else "",
+        "contentType": (
+            message.body.content_type.value
+            if message.body and message.body.content_type
+            else "text"
+        ),
+        "createdDateTime": (
+            message.created_date_time.isoformat() if message.created_date_time else None
+        ),
+        "from": (
+            message.from_property.user.display_name
+            if message.from_property and message.from_property.user
+            else "Unknown"
+        ),
+    }
+
+
+def _import_sdk():
+    """Import the Graph SDK and azure.identity, e.g. from a worker thread."""
+    import azure.identity  # noqa: F401
+    import azure.identity.aio  # noqa: F401
+    import msgraph  # noqa: F401
+
 
 class GraphClient:
     """Microsoft Graph API client for Teams operations."""
 
-    def __init__(self):
+    def __init__(self, resilience: Optional[Resilience] = None, token_store=None):
+        """
+        Initialize the client.
+
+        Args:
+            resilience (Optional[Resilience]): Retry and circuit breaker
+                policy, shared with other clients
+            token_store: Store sharing app tokens between workers, see
+                token_cache.create_token_store; None keeps tokens per process
+        """
+        self.resilience = resilience or Resilience()
+        self.token_store = token_store
         self.credential = None
         self.client = None
         self._authenticated = False
+        self._scopes = ["https://graph.microsoft.com/.default"]
+        self.batcher = None
+        # (team_id, lowercased display name) -> channel
+        self._channels = TTLCache(
+            max_entries=1024, ttl=config.channel_cache_ttl_seconds
+        )
+        self._channel_lookups = SingleFlight()
+        self.delta_links = DeltaLinkStore(config.graph_delta_link_path)
+        self._channel_syncs = SingleFlight()
+        self.team_directory = TeamDirectory(
+            self._load_teams, ttl=config.team_directory_ttl_seconds
+        )
+        self.send_scheduler = ChannelSendScheduler(
+            channel_rate=config.teams_channel_send_rate,
+            channel_burst=config.teams_channel_send_burst,
+            global_rate=config.teams_global_send_rate,
+            global_burst=config.teams_global_send_burst,
+            max_wait=config.teams_send_max_queue_seconds,
+        )
 
     async def authenticate(self) -> bool:
         """
@@ -37,6 +117,10 @@ class GraphClient:
             bool: True if authentication successful, False otherwise
         """
         try:
+            # Import off the event loop so requests keep being served
+            await asyncio.to_thread(_import_sdk)
+            from msgraph import GraphServiceClient
+
             # Determine which authentication flow to use
             use_device_code = (
                 os.getenv("USE_DEVICE_CODE_AUTH", "false").lower() == "true"
@@ -52,6 +136,8 @@ class GraphClient:
                     "https://graph.microsoft.com/Channel.ReadBasic.All",
                 ]
 
+                from azure.identity import DeviceCodeCredential
+
                 # Use synchronous DeviceCodeCredential
                 self.credential = DeviceCodeCredential(
                     tenant_id=config.azure.tenant_id,
@@ -61,6 +147,7 @@ class GraphClient:
                 self.client = GraphServiceClient(
                     credentials=self.credential, scopes=device_scopes
                 )
+                self._scopes = device_scopes
 
                 # Test with /me endpoint (works with delegated auth)
                 try:
@@ -75,11 +162,21 @@ class GraphClient:
             else:
                 # Client Credentials Flow for production (application permissions)
                 logger.info("Using Client Credentials authentication flow...")
+                from azure.identity.aio import ClientSecretCredential
+
                 self.credential = ClientSecretCredential(
                     tenant_id=config.azure.tenant_id,
                     client_id=config.azure.client_id,
                     client_secret=config.azure.client_secret,
                 )
+                if self.token_store is not None:
+                    # Workers share one token and one refresher
+                    self.credential = SharedTokenCredential(
+                        self.credential,
+                        self.token_store,
+                        f"{config.azure.tenant_id}:{config.azure.client_id}",
+                        refresh_margin=config.graph_token_refresh_margin_seconds,
+                    )
 
                 self.client = GraphServiceClient(
                     credentials=self.credential,
@@ -102,6 +199,14 @@ class GraphClient:
 
             self._authenticated = True
             logger.info("Successfully authenticated with Microsoft Graph")
+
+            if config.graph_batch_enabled:
+                self.batcher = GraphBatcher(
+                    self._get_access_token,
+                    window=config.graph_batch_window_ms / 1000,
+                    max_batch=config.graph_batch_max_size,
+                )
+
             return True
 
         except Exception as e:
@@ -114,11 +219,27 @@ class GraphClient:
             self._authenticated = False
             return False
 
+    async def _get_access_token(self) -> str:
+        """
+        Get a bearer token for direct Graph REST calls.
+
+        Returns:
+            str: Access token
+        """
+        if asyncio.iscoroutinefunction(self.credential.get_token):
+            token = await self.credential.get_token(*self._scopes)
+        else:
+            token = await asyncio.to_thread(self.credential.get_token, *self._scopes)
+        return token.token
+
     async def get_teams(self) -> List[Dict[str, Any]]:
         """
         Get all teams the authenticated user/app has access to.
         Works with both delegated and application authentication.
 
+        Teams are served from the team directory, which is refreshed in the
+        background once older than TEAM_DIRECTORY_TTL_SECONDS.
+
         Returns:
             List[Dict]: List of team objects with id, displayName, description
         """
@@ -127,51 +248,115 @@ class GraphClient:
             return []
 
         try:
-            # Check if using device code (delegated) or client credentials (app-only)
-            use_device_code = (
-                os.getenv("USE_DEVICE_CODE_AUTH", "false").lower() == "true"
-            )
+            return await self.team_directory.teams()
+        except Exception as e:
+            logger.error(f"Failed to get teams: {str(e)}")
+            return []  # Return empty list instead of raising exception
 
-            teams = []
-            teams_response = None
+    async def get_team(self, team_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a team by ID from the team directory.
 
-            if use_device_code:
-                # Try joined teams for delegated auth
-                try:
-                    teams_response = await self.client.me.joined_teams.get()
-                except Exception as e:
-                    logger.warning(f"Cannot access joined teams: {e}")
-                    # Fallback to groups
-                    teams_response = await self.client.groups.get()
-            else:
-                # Use groups with team resource type for app-only auth
-                try:
-                    teams_response = await self.client.groups.get()
-                except Exception as e:
-                    logger.error(f"Cannot access groups: {e}")
-                    return []
-
-            if teams_response and teams_response.value:
-                for team in teams_response.value:
-                    teams.append(
-                        {
-                            "id": team.id,
-                            "displayName": team.display_name,
-                            "description": team.description or "",
-                            "createdDateTime": (
-                                team.created_date_time.isoformat()
-                                if team.created_date_time
-                                else None
-                            ),
-                        }
-                    )
+        Args:
+            team_id (str): The team ID
 
-            logger.info(f"Retrieved {len(teams)} teams")
-            return teams
+        Returns:
+            Optional[Dict]: Team object, or None if the app cannot see it
+        """
+        if not self._authenticated:
+            raise Exception("Not authenticated. Call authenticate() first.")
+        return await self.team_directory.get(team_id)
 
-        except Exception as e:
-            logger.error(f"Failed to get teams: {str(e)}")
-            return []  # Return empty list instead of raising exception
+    async def find_team(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a team by display name, ignoring case, in the team directory.
+
+        Args:
+            name (str): The team's display name
+
+        Returns:
+            Optional[Dict]: Team object, or None if no team has the name
+        """
+        if not self._authenticated:
+            raise Exception("Not authenticated. Call authenticate() first.")
+        return await self.team_directory.find(name)
+
+    async def iter_teams(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over all teams page by page, bypassing the team directory.
+
+        With application permissions only Teams-enabled groups are listed,
+        filtered by Graph, with just the fields the API returns.
+
+        Yields:
+            Dict: Team object with id, displayName, description and
+                createdDateTime
+        """
+        if not self._authenticated:
+            raise Exception("Not authenticated. Call authenticate() first.")
+
+        from kiota_abstractions.base_request_configuration import (
+            RequestConfiguration,
+        )
+        from msgraph.generated.groups import groups_request_builder
+
+        RequestBuilder = groups_request_builder.GroupsRequestBuilder
+
+        # Check if using device code (delegated) or client credentials (app-only)
+        use_device_code = os.getenv("USE_DEVICE_CODE_AUTH", "false").lower() == "true"
+        builder = self.client.groups
+        configuration = RequestConfiguration(
+            query_parameters=RequestBuilder.GroupsRequestBuilderGetQueryParameters(
+                filter=TEAM_GROUPS_FILTER,
+                select=list(TEAM_FIELDS),
+                top=MAX_GROUPS_PAGE,
+            )
+        )
+
+        async def fetch(next_link: Optional[str]):
+            if next_link:
+                return await builder.with_url(next_link).get()
+            return await builder.get(request_configuration=configuration)
+
+        if use_device_code:
+            # Try joined teams for delegated auth
+            try:
+                joined = self.client.me.joined_teams
+                response = await self.resilience.call("graph.teams", joined.get)
+                builder = joined
+            except Exception as e:
+                logger.warning(f"Cannot access joined teams: {e}")
+                # Fallback to groups
+                response = await self.resilience.call(
+                    "graph.teams", lambda: fetch(None)
+                )
+        else:
+            response = await self.resilience.call("graph.teams", lambda: fetch(None))
+
+        while response:
+            for team in response.value or []:
+                yield {
+                    "id": team.id,
+                    "displayName": team.display_name,
+                    "description": team.description or "",
+                    "createdDateTime": (
+                        team.created_date_time.isoformat()
+                        if team.created_date_time
+                        else None
+                    ),
+                }
+            next_link = response.odata_next_link
+            if not next_link:
+                return
+            response = await self.resilience.call(
+                "graph.teams", lambda: fetch(next_link)
+            )
+
+    async def _load_teams(self) -> List[Dict[str, Any]]:
+        """List all teams for the team directory."""
+        teams = [team async for team in self.iter_teams()]
+        logger.info(f"Retrieved {len(teams)} teams")
+        return teams
 
     async def get_team_channels(self, team_id: str) -> List[Dict[str, Any]]:
         """
@@ -186,7 +371,30 @@ class GraphClient:
         if not self._authenticated:
             raise Exception("Not authenticated. Call authenticate() first.")
 
+        return await self.resilience.call(
+            "graph.channels", lambda: self._get_team_channels(team_id)
+        )
+
+    async def _get_team_channels(self, team_id: str) -> List[Dict[str, Any]]:
+        """Fetch the channels of a team with a single attempt."""
         try:
+            if self.batcher:
+                response = await self.batcher.request(
+                    "GET", f"/teams/{team_id}/channels"
+                )
+                channels = [
+                    {
+                        "id": channel.get("id"),
+                        "displayName": channel.get("displayName"),
+                        "description": channel.get("description") or "",
+                        "membershipType": channel.get("membershipType") or "standard",
+                        "createdDateTime": channel.get("createdDateTime"),
+                    }
+                    for channel in response.get("value", [])
+                ]
+                logger.info(f"Retrieved {len(channels)} channels for team {team_id}")
+                return channels
+
             channels_response = await self.client.teams.by_team_id(
                 team_id
             ).channels.get()
@@ -237,6 +445,8 @@ class GraphClient:
             raise Exception("Not authenticated. Call authenticate() first.")
 
         try:
+            from msgraph.generated.models.channel import Channel
+
             channel = Channel(display_name=channel_name, description=description)
 
             created_channel = await self.client.teams.by_team_id(team_id).channels.post(
@@ -282,45 +492,175 @@ class GraphClient:
             raise Exception("Not authenticated. Call authenticate() first.")
 
         try:
-            body_type = (
-                BodyType.Html if message_type.lower() == "html" else BodyType.Text
+            return await self.resilience.call(
+                "graph.messages",
+                lambda: self._send_message(team_id, channel_id, message, message_type),
+                retry_safe=is_rejected,
             )
 
-            chat_message = ChatMessage(
-                body=ItemBody(content_type=body_type, content=message)
+        except Exception as e:
+            if getattr(e, "response_status_code", None) == 404:
+                self.invalidate_channel(team_id, channel_id)
+            logger.error(
+                f"Failed to send message to team {team_id}, "
+                f"channel {channel_id}: {str(e)}"
             )
+            raise
 
-            sent_message = (
-                await self.client.teams.by_team_id(team_id)
-                .channels.by_channel_id(channel_id)
-                .messages.post(chat_message)
-            )
+    async def reply_to_message(
+        self,
+        team_id: str,
+        channel_id: str,
+        message_id: str,
+        message: str,
+        message_type: str = "html",
+    ) -> Dict[str, Any]:
+        """
+        Reply to a channel message in its thread.
 
-            result = {
-                "id": sent_message.id,
-                "content": sent_message.body.content if sent_message.body else message,
-                "createdDateTime": (
-                    sent_message.created_date_time.isoformat()
-                    if sent_message.created_date_time
-                    else None
-                ),
-                "from": (
-                    sent_message.from_property.user.display_name
-                    if sent_message.from_property and sent_message.from_property.user
-                    else "Bot"
-                ),
-            }
+        Args:
+            team_id (str): The team ID
+            channel_id (str): The channel ID
+            message_id (str): ID of the message to reply to
+            message (str): Reply content
+            message_type (str): Message type (html or text)
 
-            logger.info(f"Sent message to team {team_id}, channel {channel_id}")
-            return result
+        Returns:
+            Dict: Sent reply object
+        """
+        if not self._authenticated:
+            raise Exception("Not authenticated. Call authenticate() first.")
+
+        try:
+            return await self.resilience.call(
+                "graph.messages",
+                lambda: self._send_message(
+                    team_id, channel_id, message, message_type, message_id
+                ),
+                retry_safe=is_rejected,
+            )
 
         except Exception as e:
             logger.error(
-                f"Failed to send message to team {team_id}, "
+                f"Failed to reply to message {message_id} in team {team_id}, "
                 f"channel {channel_id}: {str(e)}"
             )
             raise
 
+    async def _send_message(
+        self,
+        team_id: str,
+        channel_id: str,
+        message: str,
+        message_type: str,
+        reply_to: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Post a channel message, or a reply to one, with a single attempt."""
+        channel = (team_id, channel_id)
+        await self.send_scheduler.acquire(channel)
+        try:
+            return await self._post_message(
+                team_id, channel_id, message, message_type, reply_to
+            )
+        except Exception as e:
+            if is_rejected(e):
+                # Hold back this channel, or all of them when the tenant limit is hit
+                self.send_scheduler.defer(_retry_after(e) or 1.0, channel)
+            raise
+
+    async def _post_message(
+        self,
+        team_id: str,
+        channel_id: str,
+        message: str,
+        message_type: str,
+        reply_to: Optional[str],
+    ) -> Dict[str, Any]:
+        if self.batcher:
+            content_type = "html" if message_type.lower() == "html" else "text"
+            sent = await self._post_channel_message(
+                team_id,
+                channel_id,
+                {"body": {"contentType": content_type, "content": message}},
+                reply_to,
+            )
+            sender = (sent.get("from") or {}).get("user") or {}
+            logger.info(f"Sent message to team {team_id}, channel {channel_id}")
+            return {
+                "id": sent.get("id"),
+                "content": (sent.get("body") or {}).get("content", message),
+                "createdDateTime": sent.get("createdDateTime"),
+                "from": sender.get("displayName", "Bot"),
+            }
+
+        from msgraph.generated.models.body_type import BodyType
+        from msgraph.generated.models.chat_message import ChatMessage
+        from msgraph.generated.models.item_body import ItemBody
+
+        body_type = BodyType.Html if message_type.lower() == "html" else BodyType.Text
+
+        chat_message = ChatMessage(
+            body=ItemBody(content_type=body_type, content=message)
+        )
+
+        messages = (
+            self.client.teams.by_team_id(team_id)
+            .channels.by_channel_id(channel_id)
+            .messages
+        )
+        if reply_to:
+            sent_message = await messages.by_chat_message_id(reply_to).replies.post(
+                chat_message
+            )
+        else:
+            sent_message = await messages.post(chat_message)
+
+        result = {
+            "id": sent_message.id,
+            "content": sent_message.body.content if sent_message.body else message,
+            "createdDateTime": (
+                sent_message.created_date_time.isoformat()
+                if sent_message.created_date_time
+                else None
+            ),
+            "from": (
+                sent_message.from_property.user.display_name
+                if sent_message.from_property and sent_message.from_property.user
+                else "Bot"
+            ),
+        }
+
+        logger.info(f"Sent message to team {team_id}, channel {channel_id}")
+        return result
+
+    async def _post_channel_message(
+        self,
+        team_id: str,
+        channel_id: str,
+        body: Dict[str, Any],
+        reply_to: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Post a channel message through the batcher.
+
+        Posts are independent within a batch, so one throttled post never
+        fails the others; the per-key workers already send the posts of a
+        conversation one at a time.
+
+        Args:
+            team_id (str): The team ID
+            channel_id (str): The channel ID
+            body (Dict): chatMessage JSON body
+            reply_to (Optional[str]): ID of the message to reply to
+
+        Returns:
+            Dict: Created chatMessage JSON
+        """
+        url = f"/teams/{team_id}/channels/{channel_id}/messages"
+        if reply_to:
+            url += f"/{reply_to}/replies"
+        return await self.batcher.request("POST", url, body)
+
     async def get_channel_messages(
         self, team_id: str, channel_id: str, limit: int = 50
     ) -> List[Dict[str, Any]]:
@@ -339,36 +679,12 @@ class GraphClient:
             raise Exception("Not authenticated. Call authenticate() first.")
 
         try:
-            messages_response = (
-                await self.client.teams.by_team_id(team_id)
-                .channels.by_channel_id(channel_id)
-                .messages.get()
-            )
-            messages = []
-
-            if messages_response and messages_response.value:
-                for message in messages_response.value[:limit]:
-                    messages.append(
-                        {
-                            "id": message.id,
-                            "content": message.body.content if message.body else "",
-                            "contentType": (
-                                message.body.content_type.value
-                                if message.body and message.body.content_type
-                                else "text"
-                            ),
-                            "createdDateTime": (
-                                message.created_date_time.isoformat()
-                                if message.created_date_time
-                                else None
-                            ),
-                            "from": (
-                                message.from_property.user.display_name
-                                if message.from_property and message.from_property.user
-                                else "Unknown"
-                            ),
-                        }
-                    )
+            messages = [
+                message
+                async for message in self.iter_channel_messages(
+                    team_id, channel_id, limit
+                )
+            ]
 
             logger.info(
                 f"Retrieved {len(messages)} messages from team {team_id}, "
@@ -383,12 +699,179 @@ class GraphClient:
             )
             raise
 
+    async def iter_channel_messages(
+        self, team_id: str, channel_id: str, limit: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over the messages of a channel page by page.
+
+        Pages are requested with $top and followed through @odata.nextLink
+        only as they are consumed, so stopping early transfers nothing more.
+
+        Args:
+            team_id (str): The team ID
+            channel_id (str): The channel ID
+            limit (Optional[int]): Maximum number of messages to yield
+
+        Yields:
+            Dict: Message object
+        """
+        if not self._authenticated:
+            raise Exception("Not authenticated. Call authenticate() first.")
+
+        from kiota_abstractions.base_request_configuration import (
+            RequestConfiguration,
+        )
+        from msgraph.generated.teams.item.channels.item.messages import (
+            messages_request_builder,
+        )
+
+        RequestBuilder = messages_request_builder.MessagesRequestBuilder
+
+        builder = (
+            self.client.teams.by_team_id(team_id)
+            .channels.by_channel_id(channel_id)
+            .messages
+        )
+        page_size = (
+            MAX_MESSAGES_PAGE if limit is None else min(limit, MAX_MESSAGES_PAGE)
+        )
+        configuration = RequestConfiguration(
+            query_parameters=RequestBuilder.MessagesRequestBuilderGetQueryParameters(
+                top=max(page_size, 1)
+            )
+        )
+
+        async def fetch(next_link: Optional[str]):
+            if next_link:
+                return await builder.with_url(next_link).get()
+            return await builder.get(request_configuration=configuration)
+
+        next_link = None
+        yielded = 0
+        while limit is None or yielded < limit:
+            response = await self.resilience.call(
+                "graph.channels", lambda: fetch(next_link)
+            )
+            for message in (response.value if response else None) or []:
+                if limit is not None and yielded >= limit:
+                    return
+                yield _message_to_dict(message)
+                yielded += 1
+            next_link = response.odata_next_link if response else None
+            if not next_link:
+                return
+
+    async def sync_channel_messages(
+        self, team_id: str, channel_id: str, max_messages: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Get the messages posted or changed in a channel since the last sync.
+
+        Uses a delta query: the first sync reads the whole channel, later
+        syncs resume from the stored delta link and only transfer what is
+        new. Whole pages are read, so up to a page more than max_messages
+        may be returned; the remainder comes with the next sync.
+
+        Args:
+            team_id (str): The team ID
+            channel_id (str): The channel ID
+            max_messages (Optional[int]): Messages after which to stop early
+
+        Returns:
+            Tuple[List[Dict], bool]: Messages, and whether more are waiting
+        """
+        if not self._authenticated:
+            raise Exception("Not authenticated. Call authenticate() first.")
+
+        # Concurrent syncs of a channel would read the same delta twice
+        return await self._channel_syncs.do(
+            channel_key(team_id, channel_id),
+            lambda: self._sync_channel_messages(team_id, channel_id, max_messages),
+        )
+
+    async def _sync_channel_messages(
+        self, team_id: str, channel_id: str, max_messages: Optional[int]
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        from kiota_abstractions.base_request_configuration import (
+            RequestConfiguration,
+        )
+        from msgraph.generated.teams.item.channels.item.messages.delta import (
+            delta_request_builder,
+        )
+
+        RequestBuilder = delta_request_builder.DeltaRequestBuilder
+
+        builder = (
+            self.client.teams.by_team_id(team_id)
+            .channels.by_channel_id(channel_id)
+            .messages.delta
+        )
+        configuration = RequestConfiguration(
+            query_parameters=RequestBuilder.DeltaRequestBuilderGetQueryParameters(
+                top=MAX_MESSAGES_PAGE
+            )
+        )
+
+        async def fetch(link: Optional[str]):
+            if link:
+                return await builder.with_url(link).get()
+            return await builder.get(request_configuration=configuration)
+
+        key = channel_key(team_id, channel_id)
+        link = await self.delta_links.get(key)
+        try:
+            response = await self.resilience.call("graph.channels", lambda: fetch(link))
+        except Exception as e:
+            if link is None or error_status(e) not in (400, 410):
+                raise
+            # The delta link expired, so the channel is read again in full
+            logger.warning(
+                f"Delta link for team {team_id}, channel {channel_id} "
+                f"rejected, resyncing: {str(e)}"
+            )
+            await self.delta_links.pop(key)
+            link = None
+            response = await self.resilience.call("graph.channels", lambda: fetch(link))
+
+        messages = []
+        while True:
+            messages.extend(
+                _message_to_dict(message)
+                for message in (response.value if response else None) or []
+            )
+            if response and response.odata_delta_link:
+                link, more = response.odata_delta_link, False
+                break
+            next_link = response.odata_next_link if response else None
+            if not next_link:
+                more = False
+                break
+            link = next_link
+            if max_messages is not None and len(messages) >= max_messages:
+                more = True
+                break
+            response = await self.resilience.call("graph.channels", lambda: fetch(link))
+
+        # Saved only once the pages were read, so a failed sync is repeated
+        if link:
+            await self.delta_links.set(key, link)
+        logger.info(
+            f"Synced {len(messages)} new messages from team {team_id}, "
+            f"channel {channel_id}"
+        )
+        return messages, more
+
     async def find_or_create_channel(
         self, team_id: str, channel_name: str, description: str = ""
     ) -> Dict[str, Any]:
         """
         Find an existing channel or create a new one.
 
+        Channels are cached by team and case-insensitive name. Concurrent
+        lookups for the same channel share one Graph call and at most one
+        creation.
+
         Args:
             team_id (str): The team ID
             channel_name (str): Channel name to find or create
@@ -397,23 +880,15 @@ class GraphClient:
         Returns:
             Dict: Channel object (existing or newly created)
         """
-        try:
-            # First, try to find existing channel
-            channels = await self.get_team_channels(team_id)
-
-            for channel in channels:
-                if channel["displayName"].lower() == channel_name.lower():
-                    logger.info(
-                        f"Found existing channel '{channel_name}' in team {team_id}"
-                    )
-                    return channel
+        key = (team_id, channel_name.lower())
+        channel = self._channels.get(key)
+        if channel is not None:
+            return channel
 
-            # Channel not found, create new one
-            logger.info(
-                f"Channel '{channel_name}' not found, creating new one in "
-                f"team {team_id}"
+        try:
+            return await self._channel_lookups.do(
+                key, lambda: self._resolve_channel(team_id, channel_name, description)
             )
-            return await self.create_channel(team_id, channel_name, description)
 
         except Exception as e:
             logger.error(
@@ -422,8 +897,57 @@ class GraphClient:
             )
             raise
 
+    async def _resolve_channel(
+        self, team_id: str, channel_name: str, description: str
+    ) -> Dict[str, Any]:
+        """Look up a channel in Graph, creating it if missing, and cache it."""
+        # First, try to find existing channel
+        channels = await self.get_team_channels(team_id)
+
+        found = None
+        for channel in channels:
+            if not channel["displayName"]:
+                continue
+            # Cache the whole listing, later lookups for siblings are free
+            self._channels.set((team_id, channel["displayName"].lower()), channel)
+            if channel["displayName"].lower() == channel_name.lower():
+                found = channel
+
+        if found is not None:
+            logger.info(f"Found existing channel '{channel_name}' in team {team_id}")
+            return found
+
+        # Channel not found, create new one
+        logger.info(
+            f"Channel '{channel_name}' not found, creating new one in team {team_id}"
+        )
+        channel = await self.create_channel(team_id, channel_name, description)
+        self._channels.set((team_id, channel_name.lower()), channel)
+        return channel
+
+    def invalidate_channel(self, team_id: str, channel_id: str):
+        """
+        Drop cached lookups that resolve to a channel, e.g. after a 404.
+
+        Args:
+            team_id (str): The team ID
+            channel_id (str): The channel ID
+        """
+        for key in self._channels.keys():
+            if (
+                key[0] == team_id
+                and self._channels.get(key, {}).get("id") == channel_id
+            ):
+                self._channels.pop(key)
+                logger.info(
+                    f"Invalidated cached channel {channel_id} in team {team_id}"
+                )
+
     async def close(self):
         """Clean up resources."""
+        await self.team_directory.close()
+        if self.batcher:
+            await self.batcher.close()
         if self.credential:
             await self.credential.close()
         self._authenticated = False
@@ -0,0 +1,504 @@
+"""
+Durable ingest journal for incoming webhooks.
+Persists raw webhook payloads to SQLite (WAL mode) before they are acknowledged,
+and hands them to a consumer loop that processes and settles each entry.
+Entries sharing an ordering key are only handed out while no earlier entry
+for the key is held by another process or waiting for a retry.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS webhook_journal (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    topic TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    received_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    status TEXT NOT NULL DEFAULT 'pending'
+);
+CREATE INDEX IF NOT EXISTS idx_webhook_journal_status
+    ON webhook_journal (status, id);
+"""
+
+# Columns added after the first release, created on open when missing
+_COLUMNS = {"ordering_key": "TEXT", "notification_id": "TEXT"}
+
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_webhook_journal_ordering_key
+    ON webhook_journal (ordering_key, id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_webhook_journal_notification_id
+    ON webhook_journal (notification_id);
+"""
+
+# Available entries, skipping any whose key has an earlier pending entry
+# that is waiting for a retry or leased to another process
+_CLAIM = """
+SELECT id, topic, payload, attempts, received_at, ordering_key
+FROM webhook_journal AS entry
+WHERE status = 'pending' AND available_at <= :now AND lease_expires <= :now
+    AND NOT EXISTS (
+        SELECT 1 FROM webhook_journal AS earlier
+        WHERE earlier.ordering_key = entry.ordering_key
+            AND earlier.id < entry.id
+            AND earlier.status = 'pending'
+            AND (
+                earlier.available_at > :now
+                OR (earlier.lease_expires > :now AND earlier.lease_owner IS NOT :owner)
+            )
+    )
+ORDER BY id LIMIT :limit
+"""
+
+# topic, payload, received_at, ordering_key, notification_id, result future
+_PendingAppend = Tuple[
+    str, bytes, float, Optional[str], Optional[str], "asyncio.Future[Optional[int]]"
+]
+
+
+@dataclass(slots=True)
+class JournalEntry:
+    """A webhook event claimed from the journal."""
+
+    id: int
+    topic: str
+    payload: bytes
+    attempts: int
+    received_at: float
+    ordering_key: Optional[str] = None
+
+
+class IngestJournal:
+    """Append-only SQLite journal with group commit and leased consumption."""
+
+    def __init__(
+        self,
+        path: str,
+        commit_interval: float = 0.005,
+        max_batch: int = 500,
+        lease_seconds: float = 120.0,
+        max_attempts: int = 5,
+    ):
+        """
+        Initialize the journal.
+
+        Args:
+            path (str): SQLite database file path
+            commit_interval (float): Seconds to wait for more appends before commit
+            max_batch (int): Appends that force an immediate commit
+            lease_seconds (float): How long a claimed entry is reserved; the
+                leases of entries still held are renewed while consuming
+            max_attempts (int): Failures before an entry is marked dead
+        """
+        self.path = path
+        self.commit_interval = commit_interval
+        self.max_batch = max_batch
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._conn: Optional[sqlite3.Connection] = None
+        # A single thread owns the connection, which also serializes commits
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="ingest-journal"
+        )
+        self._pending: List[_PendingAppend] = []
+        # Entries claimed by this process and not settled yet, by ID
+        self._held: Dict[int, Optional[str]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: set = set()
+        self._new_entries = asyncio.Event()
+
+    async def open(self):
+        """Open the database and ensure the schema exists."""
+        await self._run(self._open_sync)
+        logger.info(f"Ingest journal opened at {self.path}")
+
+    def _open_sync(self):
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(
+            self.path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        # NORMAL is durable against process crashes in WAL mode
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(webhook_journal)")}
+        for name, column_type in _COLUMNS.items():
+            if name not in columns:
+                conn.execute(
+                    f"ALTER TABLE webhook_journal ADD COLUMN {name} {column_type}"
+                )
+        conn.executescript(_INDEXES)
+        self._conn = conn
+
+    async def close(self):
+        """Flush pending appends, release leases and close the database."""
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._start_flush()
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+
+        if self._conn:
+            await self._run(self._release_sync)
+            await self._run(self._conn.close)
+            self._conn = None
+
+        self._executor.shutdown(wait=True)
+        logger.info("Ingest journal closed")
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def append(
+        self,
+        topic: str,
+        payload: bytes,
+        ordering_key: Optional[str] = None,
+        notification_id: Optional[str] = None,
+    ) -> Optional[int]:
+        """
+        Durably append a webhook payload.
+
+        Appends arriving within the commit interval share one transaction.
+
+        Args:
+            topic (str): Webhook topic
+            payload (bytes): Raw webhook body
+            ordering_key (Optional[str]): Key whose entries are processed in
+                order, e.g. the conversation
+            notification_id (Optional[str]): Intercom notification ID; a
+                notification still in the journal is not appended again
+
+        Returns:
+            Optional[int]: Journal entry ID, or None for a duplicate notification
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(
+            (topic, payload, time.time(), ordering_key, notification_id, future)
+        )
+
+        if len(self._pending) >= self.max_batch:
+            if self._flush_handle:
+                self._flush_handle.cancel()
+                self._flush_handle = None
+            self._start_flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(
+                self.commit_interval, self._start_flush
+            )
+
+        return await future
+
+    def _start_flush(self):
+        self._flush_handle = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._flush(batch))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self, batch: List[_PendingAppend]):
+        rows = [entry[:-1] for entry in batch]
+        try:
+            entry_ids = await self._run(self._insert_sync, rows)
+        except Exception as e:
+            logger.error(f"Failed to commit {len(batch)} journal entries: {str(e)}")
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for entry_id, (*_, future) in zip(entry_ids, batch):
+            if not future.done():
+                future.set_result(entry_id)
+        self._new_entries.set()
+
+    def _insert_sync(self, rows: List[tuple]) -> List[Optional[int]]:
+        entry_ids = []
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            for row in rows:
+                # The unique notification ID makes redeliveries a no-op
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO webhook_journal "
+                    "(topic, payload, received_at, ordering_key, notification_id) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    row,
+                )
+                entry_ids.append(cursor.lastrowid if cursor.rowcount else None)
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return entry_ids
+
+    async def claim(self, limit: int = 100) -> List[JournalEntry]:
+        """
+        Lease the oldest available entries to this process.
+
+        An entry is skipped while an earlier entry with the same ordering key
+        waits for a retry or is leased to another process, so one key is
+        never processed by two processes and a failed entry is not overtaken.
+
+        Args:
+            limit (int): Maximum number of entries to claim
+
+        Returns:
+            List[JournalEntry]: Claimed entries in arrival order
+        """
+        entries = await self._run(self._claim_sync, limit, set(self._held))
+        for entry in entries:
+            self._held[entry.id] = entry.ordering_key
+        return entries
+
+    def _claim_sync(self, limit: int, held: Set[int]) -> List[JournalEntry]:
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self._conn.execute(
+                _CLAIM, {"now": now, "owner": self.owner, "limit": limit}
+            ).fetchall()
+            # An entry whose lease lapsed while it was queued here is not
+            # handed out a second time
+            rows = [row for row in rows if row[0] not in held]
+            if rows:
+                self._conn.executemany(
+                    "UPDATE webhook_journal SET lease_owner = ?, lease_expires = ? "
+                    "WHERE id = ?",
+                    [(self.owner, now + self.lease_seconds, row[0]) for row in rows],
+                )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return [JournalEntry(*row) for row in rows]
+
+    def holds(self, entry: JournalEntry) -> bool:
+        """
+        Check whether this process still holds an entry's lease.
+
+        Entries released because an earlier entry for their key failed must
+        not be processed; they are claimed again once it has succeeded.
+        """
+        return entry.id in self._held
+
+    async def ack(self, entry_id: int):
+        """Remove a successfully processed entry."""
+        await self._run(self._ack_sync, entry_id)
+        self._held.pop(entry_id, None)
+        # Later entries for the same key may be claimable now
+        self._new_entries.set()
+
+    def _ack_sync(self, entry_id: int):
+        self._conn.execute("DELETE FROM webhook_journal WHERE id = ?", (entry_id,))
+
+    async def fail(
+        self,
+        entry: JournalEntry,
+        error: str,
+        retry: bool = True,
+        delay: Optional[float] = None,
+    ):
+        """
+        Record a processing failure.
+
+        The entry is retried with exponential backoff until max_attempts,
+        after which it is kept as a dead entry for inspection. Later entries
+        for the same key held by this process are released until the retry
+        has succeeded.
+
+        Args:
+            entry (JournalEntry): The failed entry
+            error (str): Failure description
+            retry (bool): False to mark the entry dead immediately
+            delay (Optional[float]): Seconds until a retry that does not count
+                as an attempt, e.g. after backpressure
+        """
+        if delay is not None:
+            attempts = entry.attempts
+            status, available_at = "pending", time.time() + delay
+        elif not retry or entry.attempts + 1 >= self.max_attempts:
+            attempts = entry.attempts + 1
+            status, available_at = "dead", 0.0
+            logger.error(
+                f"Journal entry {entry.id} ({entry.topic}) failed {attempts} times, "
+                f"marking dead: {error}"
+            )
+        else:
+            attempts = entry.attempts + 1
+            status = "pending"
+            available_at = time.time() + min(2**attempts, 300)
+        key = self._held.pop(entry.id, entry.ordering_key)
+        released = [
+            entry_id
+            for entry_id, held_key in self._held.items()
+            if status == "pending"
+            and key is not None
+            and held_key == key
+            and entry_id > entry.id
+        ]
+        for entry_id in released:
+            del self._held[entry_id]
+        await self._run(
+            self._fail_sync, entry.id, attempts, available_at, status, error, released
+        )
+        self._new_entries.set()
+
+    def _fail_sync(
+        self,
+        entry_id: int,
+        attempts: int,
+        available_at: float,
+        status: str,
+        error: str,
+        released: List[int],
+    ):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute(
+                "UPDATE webhook_journal SET attempts = ?, available_at = ?, "
+                "status = ?, last_error = ?, lease_owner = NULL, lease_expires = 0 "
+                "WHERE id = ?",
+                (attempts, available_at, status, error, entry_id),
+            )
+            self._conn.executemany(
+                "UPDATE webhook_journal SET lease_owner = NULL, lease_expires = 0 "
+                "WHERE id = ? AND lease_owner = ?",
+                [(released_id, self.owner) for released_id in released],
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    async def renew_leases(self):
+        """Extend the leases of all entries this process still holds."""
+        if not self._held:
+            return
+        lost = await self._run(self._renew_sync, list(self._held))
+        for entry_id in lost:
+            logger.warning(f"Lost the lease of journal entry {entry_id}")
+            self._held.pop(entry_id, None)
+
+    def _renew_sync(self, entry_ids: List[int]) -> List[int]:
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute(
+                "UPDATE webhook_journal SET lease_expires = ? "
+                "WHERE lease_owner = ? AND status = 'pending'",
+                (now + self.lease_seconds, self.owner),
+            )
+            owned = {
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT id FROM webhook_journal "
+                    "WHERE lease_owner = ? AND status = 'pending'",
+                    (self.owner,),
+                )
+            }
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return [entry_id for entry_id in entry_ids if entry_id not in owned]
+
+    async def _keep_leases(self):
+        """Renew leases for as long as entries wait in queues or run."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await self.renew_leases()
+            except Exception as e:
+                logger.error(f"Failed to renew journal leases: {str(e)}")
+
+    def _release_sync(self):
+        self._conn.execute(
+            "UPDATE webhook_journal SET lease_owner = NULL, lease_expires = 0 "
+            "WHERE lease_owner = ? AND status = 'pending'",
+            (self.owner,),
+        )
+
+    async def stats(self) -> Dict[str, int]:
+        """Get entry counts by status."""
+        return await self._run(self._stats_sync)
+
+    def _stats_sync(self) -> Dict[str, int]:
+        counts = {"pending": 0, "dead": 0}
+        for status, count in self._conn.execute(
+            "SELECT status, COUNT(*) FROM webhook_journal GROUP BY status"
+        ):
+            counts[status] = count
+        return counts
+
+    async def consume(
+        self,
+        dispatch: Callable[[JournalEntry], Awaitable[None]],
+        batch_size: int = 100,
+        poll_interval: float = 1.0,
+        paused: Optional[Callable[[], bool]] = None,
+    ):
+        """
+        Claim entries forever and pass them to dispatch in arrival order.
+
+        The dispatch callable is responsible for calling ack() or fail().
+        Entries appended by other processes or scheduled for retry are
+        picked up on the next poll. Leases of dispatched entries are renewed
+        until they are settled, however long they wait in worker queues.
+
+        Args:
+            dispatch (Callable): Coroutine function that processes one entry
+            batch_size (int): Entries claimed per round trip
+            poll_interval (float): Idle wait between claims in seconds
+            paused (Optional[Callable]): While this returns True no entries
+                are claimed, e.g. during a downstream outage
+        """
+        renewer = asyncio.create_task(self._keep_leases())
+        try:
+            while True:
+                if paused and paused():
+                    await asyncio.sleep(poll_interval)
+                    continue
+
+                try:
+                    self._new_entries.clear()
+                    entries = await self.claim(batch_size)
+                except Exception as e:
+                    logger.error(f"Failed to claim journal entries: {str(e)}")
+                    await asyncio.sleep(poll_interval)
+                    continue
+
+                if not entries:
+                    try:
+                        await asyncio.wait_for(self._new_entries.wait(), poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                for entry in entries:
+                    await dispatch(entry)
+        finally:
+            renewer.cancel()
+            await asyncio.gather(renewer, return_exceptions=True)
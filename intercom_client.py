@@ -3,42 +3,207 @@ Intercom API client for FIN AI integration.
 Handles conversations, tickets, and AI responses.
 """
 
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+from email.utils import formatdate
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+from urllib.parse import parse_qs, urlencode, urlparse
 
 import aiohttp
+import msgspec
 
+from cache import TTLCache
+from capabilities import CapabilityCache
 from config import config
+from intercom_models import Conversation, ConversationPart, decode_conversation
+from rate_limiter import RateLimitScheduler, retry_delay
+from resilience import (
+    Resilience,
+    error_status,
+    is_rejected,
+    is_throttled,
+    is_transient,
+)
 
 logger = logging.getLogger(__name__)
 
 
+# Optional feature names tracked by the capability cache
+FIN_AI = "fin_ai"
+
+# Statuses meaning the workspace cannot use an endpoint at all
+UNAVAILABLE_STATUSES = (401, 403, 404, 405)
+
+# Largest page size the list and search endpoints accept
+MAX_PER_PAGE = 150
+
+PageFetcher = Callable[
+    [Optional[str]], Awaitable[Tuple[List[Dict[str, Any]], Optional[str]]]
+]
+
+
+def next_cursor(response: Dict[str, Any]) -> Optional[str]:
+    """
+    Get the cursor of the next page from a paginated response.
+
+    Args:
+        response (Dict): List or search response
+
+    Returns:
+        Optional[str]: ``starting_after`` of the next page, or None on the last
+    """
+    next_page = (response.get("pages") or {}).get("next")
+    if isinstance(next_page, dict):
+        return next_page.get("starting_after")
+    if isinstance(next_page, str):
+        # Older API versions link the next page by URL
+        return parse_qs(urlparse(next_page).query).get("starting_after", [None])[0]
+    return None
+
+
+async def _iter_pages(
+    fetch: PageFetcher, cursor: Optional[str], limit: Optional[int]
+) -> AsyncIterator[Dict[str, Any]]:
+    """Yield items page by page, fetching the next page in the background."""
+    pending = asyncio.ensure_future(fetch(cursor))
+    yielded = 0
+    try:
+        while pending is not None:
+            items, cursor = await pending
+            pending = None
+            if cursor and items and (limit is None or yielded + len(items) < limit):
+                pending = asyncio.ensure_future(fetch(cursor))
+
+            for item in items:
+                if limit is not None and yielded >= limit:
+                    return
+                yield item
+                yielded += 1
+    finally:
+        if pending is not None:
+            pending.cancel()
+            await asyncio.gather(pending, return_exceptions=True)
+
+
+def endpoint_family(endpoint: str) -> str:
+    """Get the resource an endpoint belongs to, e.g. ``conversations``."""
+    return endpoint.lstrip("/").split("?", 1)[0].split("/", 1)[0] or "root"
+
+
+class IntercomAPIError(Exception):
+    """Intercom returned an error response."""
+
+    def __init__(self, status: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"Intercom API error: {message}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+@dataclass(slots=True)
+class CachedConversation:
+    """A fetched conversation and the validators needed to revalidate it."""
+
+    # Raw JSON, far smaller than the decoded object tree
+    body: bytes
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    updated_at: Optional[int] = None
+
+
 class IntercomClient:
     """Intercom API client for FIN AI integration."""
 
-    def __init__(self):
+    def __init__(self, resilience: Optional[Resilience] = None):
+        """
+        Initialize the client.
+
+        Args:
+            resilience (Optional[Resilience]): Retry and circuit breaker
+                policy, shared with other clients
+        """
+        self.resilience = resilience or Resilience()
         self.base_url = config.intercom.base_url
         self.access_token = config.intercom.access_token
         self.session = None
+        self._conversations = TTLCache(
+            max_entries=config.intercom_conversation_cache_size,
+            ttl=config.intercom_conversation_cache_ttl_seconds,
+        )
+        self.capabilities = CapabilityCache(
+            reprobe_interval=config.capability_reprobe_seconds,
+            max_interval=config.capability_reprobe_max_seconds,
+        )
+        # Intercom spreads its per-minute limit over 10 second windows
+        self.scheduler = RateLimitScheduler(
+            rate=config.intercom_rate_limit_per_minute / 60,
+            capacity=config.intercom_rate_limit_per_minute / 6,
+            bulk_reserve=config.intercom_rate_limit_bulk_reserve,
+        )
 
-    async def __aenter__(self):
-        """Async context manager entry."""
+    async def open(self) -> "IntercomClient":
+        """
+        Open the pooled HTTP session.
+
+        The application keeps one client open for its lifetime so requests
+        reuse warm keep-alive connections instead of paying TCP and TLS
+        setup every time.
+
+        Returns:
+            IntercomClient: This client
+        """
+        if self.session and not self.session.closed:
+            return self
+
+        connector = aiohttp.TCPConnector(
+            limit=config.intercom_connection_limit,
+            keepalive_timeout=config.intercom_keepalive_seconds,
+            ttl_dns_cache=config.intercom_dns_cache_seconds,
+        )
         self.session = aiohttp.ClientSession(
+            connector=connector,
             headers={
                 "Authorization": f"Bearer {self.access_token}",
                 "Accept": "application/json",
                 "Content-Type": "application/json",
-            }
+            },
+            timeout=aiohttp.ClientTimeout(
+                total=config.intercom_request_timeout_seconds,
+                connect=config.intercom_connect_timeout_seconds,
+            ),
         )
         return self
 
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit."""
+    async def close(self):
+        """Close the HTTP session and its pooled connections."""
         if self.session:
             await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.close()
 
     async def _make_request(
-        self, method: str, endpoint: str, data: Optional[Dict] = None
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict] = None,
+        timeout: Optional[float] = None,
     ) -> Dict[str, Any]:
         """
         Make HTTP request to Intercom API.
@@ -47,36 +212,132 @@ class IntercomClient:
             method (str): HTTP method
             endpoint (str): API endpoint
             data (Optional[Dict]): Request payload
+            timeout (Optional[float]): Total timeout in seconds for this
+                request, overriding the session default
 
         Returns:
             Dict: API response
         """
+        _, _, response_data = await self._request(method, endpoint, data, timeout)
+        return response_data
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        headers: Optional[Dict[str, str]] = None,
+        raw: bool = False,
+    ) -> Tuple[int, Mapping[str, str], Any]:
+        """
+        Make HTTP request to Intercom API and keep the response metadata.
+
+        Args:
+            method (str): HTTP method
+            endpoint (str): API endpoint
+            data (Optional[Dict]): Request payload
+            timeout (Optional[float]): Total timeout in seconds for this request
+            headers (Optional[Dict]): Extra request headers
+            raw (bool): Return the body as undecoded JSON bytes
+
+        Returns:
+            Tuple: Status, response headers and body (None for 304)
+        """
         if not self.session:
-            raise Exception("Client not initialized. Use async context manager.")
+            raise Exception("Client not initialized. Call open() first.")
 
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        options = {}
+        if timeout is not None:
+            options["timeout"] = aiohttp.ClientTimeout(total=timeout)
+        if headers:
+            options["headers"] = headers
+
+        # Reads are retried on any transient failure, writes only when
+        # Intercom refused them; rate limits are only retried by _send
+        retry_safe = is_transient if method in ("GET", "HEAD") else is_rejected
+        return await self.resilience.call(
+            f"intercom.{endpoint_family(endpoint)}",
+            lambda: self._send(method, url, endpoint, data, options, raw),
+            retry_safe=lambda error: retry_safe(error) and not is_throttled(error),
+        )
 
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        endpoint: str,
+        data: Optional[Dict],
+        options: Dict[str, Any],
+        raw: bool = False,
+    ) -> Tuple[int, Mapping[str, str], Any]:
+        """Send one request, waiting out rate limits as Intercom asks."""
+        retries = config.intercom_rate_limit_max_retries
+        for attempt in range(retries + 1):
+            await self.scheduler.acquire()
+            try:
+                async with self.session.request(
+                    method, url, json=data, **options
+                ) as response:
+                    self._track_rate_limit(response.headers)
+
+                    if response.status == 304:
+                        return response.status, response.headers, None
+
+                    if response.status == 429 and attempt < retries:
+                        delay = retry_delay(response.headers)
+                        logger.warning(
+                            f"Intercom rate limit hit on {endpoint}, "
+                            f"retrying in {delay:.1f}s"
+                        )
+                        self.scheduler.defer(delay)
+                        continue
+
+                    if raw and response.status < 400:
+                        return response.status, response.headers, await response.read()
+
+                    response_data = await response.json()
+
+                    if response.status >= 400:
+                        logger.error(
+                            f"Intercom API error {response.status}: {response_data}"
+                        )
+                        error_msg = response_data.get("errors", [{}])[0].get(
+                            "message", "Unknown error"
+                        )
+                        raise IntercomAPIError(
+                            response.status,
+                            error_msg,
+                            (
+                                retry_delay(response.headers)
+                                if response.status == 429
+                                else None
+                            ),
+                        )
+
+                    return response.status, response.headers, response_data
+
+            except aiohttp.ClientError as e:
+                logger.error(f"HTTP client error: {str(e)}")
+                raise
+            except Exception as e:
+                logger.error(f"Request failed: {str(e)}")
+                raise
+
+    def _track_rate_limit(self, headers: Mapping[str, str]):
+        """Feed the rate-limit headers of a response to the scheduler."""
+        remaining = headers.get("X-RateLimit-Remaining")
+        if remaining is None:
+            return
         try:
-            async with self.session.request(method, url, json=data) as response:
-                response_data = await response.json()
-
-                if response.status >= 400:
-                    logger.error(
-                        f"Intercom API error {response.status}: {response_data}"
-                    )
-                    error_msg = response_data.get("errors", [{}])[0].get(
-                        "message", "Unknown error"
-                    )
-                    raise Exception(f"Intercom API error: {error_msg}")
-
-                return response_data
-
-        except aiohttp.ClientError as e:
-            logger.error(f"HTTP client error: {str(e)}")
-            raise
-        except Exception as e:
-            logger.error(f"Request failed: {str(e)}")
-            raise
+            self.scheduler.update(
+                limit=int(headers.get("X-RateLimit-Limit") or 0) or None,
+                remaining=int(remaining),
+                reset_at=float(headers.get("X-RateLimit-Reset") or 0) or None,
+            )
+        except ValueError:
+            logger.warning("Ignoring malformed Intercom rate-limit headers")
 
     async def get_conversations(self, limit: int = 20) -> List[Dict[str, Any]]:
         """
@@ -101,23 +362,184 @@ class IntercomClient:
             logger.error(f"Failed to get conversations: {str(e)}")
             raise
 
-    async def get_conversation(self, conversation_id: str) -> Dict[str, Any]:
+    async def get_conversations_page(
+        self, per_page: int = 50, starting_after: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Get one page of conversations.
+
+        Args:
+            per_page (int): Conversations per page, at most 150
+            starting_after (Optional[str]): Cursor from the previous page
+
+        Returns:
+            Tuple: Conversations and the cursor of the next page, if any
+        """
+        params = {"per_page": min(per_page, MAX_PER_PAGE)}
+        if starting_after:
+            params["starting_after"] = starting_after
+
+        response = await self._make_request(
+            "GET", f"/conversations?{urlencode(params)}"
+        )
+        return response.get("conversations", []), next_cursor(response)
+
+    async def iter_conversations(
+        self,
+        per_page: int = 50,
+        limit: Optional[int] = None,
+        starting_after: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over conversations page by page.
+
+        The next page is requested while the current one is consumed.
+
+        Args:
+            per_page (int): Conversations per page, at most 150
+            limit (Optional[int]): Maximum conversations to yield
+            starting_after (Optional[str]): Cursor to start from
+
+        Yields:
+            Dict: Conversation object
+        """
+
+        async def fetch(cursor: Optional[str]):
+            return await self.get_conversations_page(per_page, cursor)
+
+        async for conversation in _iter_pages(fetch, starting_after, limit):
+            yield conversation
+
+    async def iter_search(
+        self,
+        query: Dict[str, Any],
+        per_page: int = 50,
+        limit: Optional[int] = None,
+        sort: Optional[Dict[str, str]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over conversation search results page by page.
+
+        The next page is requested while the current one is consumed.
+
+        Args:
+            query (Dict): Intercom search query, e.g. a field/operator/value
+                filter or an AND/OR of filters
+            per_page (int): Results per page, at most 150
+            limit (Optional[int]): Maximum conversations to yield
+            sort (Optional[Dict]): Sort order, e.g.
+                ``{"field": "updated_at", "order": "ascending"}``
+
+        Yields:
+            Dict: Conversation object
+        """
+
+        async def fetch(cursor: Optional[str]):
+            data = {
+                "query": query,
+                "pagination": {"per_page": min(per_page, MAX_PER_PAGE)},
+            }
+            if cursor:
+                data["pagination"]["starting_after"] = cursor
+            if sort:
+                data["sort"] = sort
+            response = await self._make_request("POST", "/conversations/search", data)
+            return response.get("conversations", []), next_cursor(response)
+
+        async for conversation in _iter_pages(fetch, None, limit):
+            yield conversation
+
+    async def get_conversation(
+        self, conversation_id: str, updated_at: Optional[int] = None
+    ) -> Dict[str, Any]:
         """
         Get a specific conversation by ID.
 
+        Conversations are cached with their ETag and ``updated_at``. A cached
+        copy at least as new as ``updated_at`` is returned without a request;
+        otherwise the fetch is conditional and a 304 is served from the cache.
+
         Args:
             conversation_id (str): The conversation ID
+            updated_at (Optional[int]): Latest known update time, e.g. from a
+                webhook, as a Unix timestamp
 
         Returns:
             Dict: Conversation object
         """
+        return msgspec.json.decode(
+            await self._fetch_conversation(conversation_id, updated_at)
+        )
+
+    async def get_conversation_model(
+        self, conversation_id: str, updated_at: Optional[int] = None
+    ) -> Conversation:
+        """
+        Get a specific conversation as a typed model.
+
+        Only the fields the integration reads are decoded, and the parts are
+        decoded when Conversation.parts() is called. Caching works as in
+        get_conversation.
+
+        Args:
+            conversation_id (str): The conversation ID
+            updated_at (Optional[int]): Latest known update time, see
+                get_conversation
+
+        Returns:
+            Conversation: Typed conversation
+        """
+        return decode_conversation(
+            await self._fetch_conversation(conversation_id, updated_at)
+        )
+
+    async def _fetch_conversation(
+        self, conversation_id: str, updated_at: Optional[int]
+    ) -> bytes:
+        """Get the raw JSON of a conversation, from the cache when current."""
+        cached = self._conversations.get(conversation_id)
+        if (
+            cached
+            and updated_at is not None
+            and cached.updated_at is not None
+            and updated_at <= cached.updated_at
+        ):
+            logger.info(f"Conversation {conversation_id} served from cache")
+            return cached.body
+
+        headers = {}
+        if cached:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+            elif cached.updated_at:
+                headers["If-Modified-Since"] = formatdate(
+                    cached.updated_at, usegmt=True
+                )
+
         try:
-            response = await self._make_request(
-                "GET", f"/conversations/{conversation_id}"
+            status, response_headers, body = await self._request(
+                "GET", f"/conversations/{conversation_id}", headers=headers, raw=True
+            )
+
+            if status == 304 and cached:
+                self._conversations.set(conversation_id, cached)
+                logger.info(f"Conversation {conversation_id} not modified")
+                return cached.body
+
+            self._conversations.set(
+                conversation_id,
+                CachedConversation(
+                    body=body,
+                    etag=response_headers.get("ETag"),
+                    last_modified=response_headers.get("Last-Modified"),
+                    updated_at=decode_conversation(body).updated_at,
+                ),
             )
 
             logger.info(f"Retrieved conversation {conversation_id}")
-            return response
+            return body
 
         except Exception as e:
             logger.error(f"Failed to get conversation {conversation_id}: {str(e)}")
@@ -181,6 +603,7 @@ class IntercomClient:
             response = await self._make_request(
                 "POST", f"/conversations/{conversation_id}/reply", data
             )
+            self._conversations.pop(conversation_id)
 
             logger.info(f"Replied to conversation {conversation_id}")
             return response
@@ -228,22 +651,24 @@ class IntercomClient:
             raise
 
     async def get_conversation_parts(
-        self, conversation_id: str
-    ) -> List[Dict[str, Any]]:
+        self, conversation_id: str, updated_at: Optional[int] = None
+    ) -> List[ConversationPart]:
         """
         Get all parts (messages) of a conversation.
 
         Args:
             conversation_id (str): The conversation ID
+            updated_at (Optional[int]): Latest known update time, see
+                get_conversation
 
         Returns:
-            List[Dict]: List of conversation parts
+            List[ConversationPart]: Typed conversation parts
         """
         try:
-            conversation = await self.get_conversation(conversation_id)
-            parts = conversation.get("conversation_parts", {}).get(
-                "conversation_parts", []
+            conversation = await self.get_conversation_model(
+                conversation_id, updated_at
             )
+            parts = conversation.parts()
 
             logger.info(
                 f"Retrieved {len(parts)} parts for conversation {conversation_id}"
@@ -269,6 +694,10 @@ class IntercomClient:
         Returns:
             Optional[Dict]: FIN AI response if available
         """
+        # Workspaces without FIN AI access are not asked on every reply
+        if not self.capabilities.should_try(FIN_AI):
+            return None
+
         try:
             # Note: This is a placeholder for FIN AI integration
             # The actual implementation would depend on Intercom's FIN AI API
@@ -285,16 +714,23 @@ class IntercomClient:
                 "POST", "/conversations/ai/suggest", data
             )
 
+            self.capabilities.record(FIN_AI, True)
             logger.info(f"Generated FIN AI response for conversation {conversation_id}")
             return response
 
         except Exception as e:
+            if error_status(e) in UNAVAILABLE_STATUSES:
+                self.capabilities.record(FIN_AI, False)
             logger.warning(
                 f"FIN AI response not available for conversation "
                 f"{conversation_id}: {str(e)}"
             )
             return None
 
+        finally:
+            # Ends a probe left open by any other error or by cancellation
+            self.capabilities.release(FIN_AI)
+
     async def get_user(self, user_id: str) -> Dict[str, Any]:
         """
         Get user information by ID.
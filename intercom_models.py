@@ -0,0 +1,244 @@
+"""
+Typed Intercom payload models.
+Webhook bodies and API responses are decoded straight from raw bytes into
+compact msgspec structs that keep only the fields the integration reads;
+unknown fields are skipped by the decoder without being materialised.
+"""
+
+from typing import List, Optional, Union
+
+import msgspec
+
+
+class ItemReference(msgspec.Struct, gc=False):
+    """Type and ID of the object a notification is about."""
+
+    type: Optional[str] = None
+    id: Optional[str] = None
+
+
+class EnvelopeData(msgspec.Struct, gc=False):
+    item: ItemReference = msgspec.field(default_factory=ItemReference)
+
+
+class WebhookEnvelope(msgspec.Struct, gc=False):
+    """Top-level notification fields needed by the ingest route."""
+
+    topic: Optional[str] = None
+    id: Optional[str] = None
+    delivery_attempts: int = 1
+    data: EnvelopeData = msgspec.field(default_factory=EnvelopeData)
+
+
+class Admin(msgspec.Struct, gc=False):
+    """Admin reference, e.g. a conversation assignee."""
+
+    type: Optional[str] = None
+    id: Optional[str] = None
+    name: Optional[str] = None
+    email: Optional[str] = None
+
+
+class Author(msgspec.Struct, gc=False):
+    """Author of a conversation part."""
+
+    type: Optional[str] = None
+    id: Optional[str] = None
+    name: Optional[str] = None
+    email: Optional[str] = None
+
+
+class ConversationPart(msgspec.Struct, gc=False):
+    """A single message or action within a conversation."""
+
+    id: Optional[str] = None
+    part_type: Optional[str] = None
+    body: Optional[str] = None
+    created_at: Optional[int] = None
+    author: Optional[Author] = None
+
+
+class ConversationPartList(msgspec.Struct, gc=False):
+    conversation_parts: List[ConversationPart] = []
+    total_count: Optional[int] = None
+
+
+class ConversationSource(msgspec.Struct, gc=False):
+    """The message that started a conversation."""
+
+    type: Optional[str] = None
+    id: Optional[str] = None
+    subject: Optional[str] = None
+    body: Optional[str] = None
+    author: Optional[Author] = None
+
+
+class ConversationItem(msgspec.Struct, gc=False):
+    """Conversation object carried by conversation.* webhooks."""
+
+    type: Optional[str] = None
+    id: Optional[str] = None
+    updated_at: Optional[int] = None
+    assignee: Optional[Admin] = None
+    source: Optional[ConversationSource] = None
+    conversation_parts: Optional[ConversationPartList] = None
+
+
+class ContactItem(msgspec.Struct, gc=False):
+    """Contact object carried by contact.* and visitor.* webhooks."""
+
+    type: Optional[str] = None
+    id: Optional[str] = None
+    name: Optional[str] = None
+    email: Optional[str] = None
+
+
+class Contact(msgspec.Struct, gc=False):
+    """Contact returned by the contacts API."""
+
+    type: Optional[str] = None
+    id: Optional[str] = None
+    role: Optional[str] = None
+    external_id: Optional[str] = None
+    name: Optional[str] = None
+    email: Optional[str] = None
+
+
+class Conversation(msgspec.Struct, gc=False):
+    """
+    Conversation returned by the conversations API.
+
+    The part list, usually most of the payload, is kept as raw JSON and only
+    decoded by parts().
+    """
+
+    type: Optional[str] = None
+    id: Optional[str] = None
+    title: Optional[str] = None
+    created_at: Optional[int] = None
+    updated_at: Optional[int] = None
+    state: Optional[str] = None
+    open: Optional[bool] = None
+    assignee: Optional[Admin] = None
+    source: Optional[ConversationSource] = None
+    conversation_parts: msgspec.Raw = msgspec.Raw()
+
+    def parts(self) -> List[ConversationPart]:
+        """Decode the conversation parts; call once and keep the result."""
+        if not self.conversation_parts:
+            return []
+        part_list = _part_list_decoder.decode(self.conversation_parts)
+        return part_list.conversation_parts if part_list else []
+
+
+class ConversationData(msgspec.Struct, gc=False):
+    item: ConversationItem = msgspec.field(default_factory=ConversationItem)
+
+
+class ContactData(msgspec.Struct, gc=False):
+    item: ContactItem = msgspec.field(default_factory=ContactItem)
+
+
+class ConversationEvent(msgspec.Struct, gc=False):
+    """Decoded conversation.* webhook."""
+
+    topic: str
+    id: Optional[str] = None
+    delivery_attempts: int = 1
+    created_at: Optional[int] = None
+    data: ConversationData = msgspec.field(default_factory=ConversationData)
+
+
+class ContactEvent(msgspec.Struct, gc=False):
+    """Decoded contact.* and visitor.* webhook."""
+
+    topic: str
+    id: Optional[str] = None
+    delivery_attempts: int = 1
+    created_at: Optional[int] = None
+    data: ContactData = msgspec.field(default_factory=ContactData)
+
+
+WebhookEvent = Union[ConversationEvent, ContactEvent]
+
+_envelope_decoder = msgspec.json.Decoder(WebhookEnvelope)
+_conversation_decoder = msgspec.json.Decoder(Conversation)
+_contact_decoder = msgspec.json.Decoder(Contact)
+_part_list_decoder = msgspec.json.Decoder(Optional[ConversationPartList])
+
+# Decoders by topic family (the part of the topic before the first dot)
+_event_decoders = {
+    "conversation": msgspec.json.Decoder(ConversationEvent),
+    "contact": msgspec.json.Decoder(ContactEvent),
+    "visitor": msgspec.json.Decoder(ContactEvent),
+}
+
+
+def decode_envelope(payload: bytes) -> WebhookEnvelope:
+    """
+    Decode the notification envelope from a raw webhook body.
+
+    Args:
+        payload (bytes): Raw webhook body
+
+    Returns:
+        WebhookEnvelope: Topic, notification ID, delivery attempts and the
+            type and ID of the item
+
+    Raises:
+        msgspec.DecodeError: If the body is not valid JSON or has wrong types
+    """
+    return _envelope_decoder.decode(payload)
+
+
+def decode_event(topic: str, payload: bytes) -> WebhookEvent:
+    """
+    Decode a raw webhook body into the typed event for its topic.
+
+    Args:
+        topic (str): Webhook topic
+        payload (bytes): Raw webhook body
+
+    Returns:
+        WebhookEvent: Decoded event
+
+    Raises:
+        ValueError: If no schema is registered for the topic family
+        msgspec.DecodeError: If the body does not match the schema
+    """
+    decoder = _event_decoders.get(topic.split(".", 1)[0])
+    if decoder is None:
+        raise ValueError(f"No webhook schema for topic: {topic}")
+    return decoder.decode(payload)
+
+
+def decode_conversation(payload: bytes) -> Conversation:
+    """
+    Decode a conversation API response without materialising its parts.
+
+    Args:
+        payload (bytes): Raw response body
+
+    Returns:
+        Conversation: Decoded conversation
+
+    Raises:
+        msgspec.DecodeError: If the body does not match the schema
+    """
+    return _conversation_decoder.decode(payload)
+
+
+def decode_contact(payload: bytes) -> Contact:
+    """
+    Decode a contact API response.
+
+    Args:
+        payload (bytes): Raw response body
+
+    Returns:
+        Contact: Decoded contact
+
+    Raises:
+        msgspec.DecodeError: If the body does not match the schema
+    """
+    return _contact_decoder.decode(payload)
@@ -3,19 +3,36 @@ Main application for Teams-Intercom Integration.
 FastAPI server with webhook endpoints and integration logic.
 """
 
-import json
+import asyncio
 from contextlib import asynccontextmanager
-from typing import Any, Dict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
 
+import msgspec
 import structlog
 import uvicorn
-from fastapi import BackgroundTasks, FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
-
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from backfill import (
+    BackfillJob,
+    parse_concurrency,
+    parse_timestamp,
+    sync_conversation,
+)
+from cache import create_redis_client
 from config import config
+from contact_cache import ContactIdentityCache
+from dedupe import InMemoryIdempotencyStore, RedisIdempotencyStore
 from graph_client import GraphClient
-from intercom_client import IntercomClient
-from webhook_handler import WebhookHandler
+from ingest_journal import IngestJournal, JournalEntry
+from intercom_client import IntercomAPIError, IntercomClient
+from intercom_models import WebhookEvent, decode_envelope, decode_event
+from resilience import CircuitOpenError, Resilience, backoff_delay
+from send_scheduler import SendQueueFull
+from token_cache import create_token_store
+from webhook_handler import WebhookHandler, ordering_key
+from worker_pool import ShardedWorkerPool
 
 # Configure structured logging
 structlog.configure(
@@ -39,29 +56,111 @@ structlog.configure(
 logger = structlog.get_logger(__name__)
 
 # Global clients
+resilience = None
+contact_cache = None
 graph_client = None
+intercom_client = None
 webhook_handler = None
+ingest_journal = None
+journal_consumer = None
+worker_pool = None
+redis_client = None
+idempotency_store = None
+deferred_settlements = set()
+backfill_job = None
+backfill_task = None
+graph_auth_task = None
+contact_cache_task = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
-    global graph_client, webhook_handler
+    global resilience, graph_client, intercom_client, webhook_handler
+    global ingest_journal, journal_consumer, worker_pool
+    global redis_client, idempotency_store, contact_cache, graph_auth_task
+    global contact_cache_task
 
     # Startup
     logger.info("Starting Teams-Intercom Integration")
 
     try:
-        # Initialize Graph client
-        graph_client = GraphClient()
-        authenticated = await graph_client.authenticate()
+        # Retry policy and circuit breakers shared by the API clients
+        resilience = Resilience(
+            max_attempts=config.retry_max_attempts,
+            backoff_base=config.retry_backoff_base_ms / 1000,
+            backoff_max=config.retry_backoff_max_ms / 1000,
+            failure_threshold=config.circuit_failure_threshold,
+            reset_timeout=config.circuit_reset_seconds,
+        )
+
+        redis_client = create_redis_client(
+            config.redis_host, config.redis_port, config.redis_db, config.redis_password
+        )
 
-        if not authenticated:
-            logger.error("Failed to authenticate with Microsoft Graph")
-            raise Exception("Microsoft Graph authentication failed")
+        # Initialize Graph client, sharing its token with the other workers
+        token_store = create_token_store(redis_client, config.graph_token_cache_path)
+        graph_client = GraphClient(resilience, token_store)
+        if config.fast_start:
+            # Accept and journal webhooks right away; the journal is drained
+            # once Graph is ready
+            graph_auth_task = asyncio.create_task(authenticate_graph())
+        else:
+            authenticated = await graph_client.authenticate()
+
+            if not authenticated:
+                logger.error("Failed to authenticate with Microsoft Graph")
+                raise Exception("Microsoft Graph authentication failed")
+
+        # One pooled Intercom client shared by every handler and route
+        intercom_client = await IntercomClient(resilience).open()
+
+        # Contacts resolved for Teams senders, persisted on the data volume
+        contact_cache = ContactIdentityCache(
+            ttl=config.contact_cache_ttl_seconds,
+            negative_ttl=config.contact_cache_negative_ttl_seconds,
+            max_entries=config.contact_cache_max_entries,
+            path=config.contact_cache_path or None,
+        )
+        await contact_cache.load()
+        # Saved off the request path; the final save runs at shutdown
+        contact_cache_task = asyncio.create_task(
+            contact_cache.save_periodically(config.contact_cache_save_interval_seconds)
+        )
 
         # Initialize webhook handler
-        webhook_handler = WebhookHandler(graph_client, IntercomClient)
+        webhook_handler = WebhookHandler(graph_client, intercom_client)
+
+        # Deduplicate Intercom retries, shared across workers when Redis is set
+        if redis_client:
+            idempotency_store = RedisIdempotencyStore(
+                redis_client, ttl=config.webhook_dedupe_ttl_seconds
+            )
+        else:
+            idempotency_store = InMemoryIdempotencyStore(
+                ttl=config.webhook_dedupe_ttl_seconds,
+                max_entries=config.webhook_dedupe_max_entries,
+            )
+
+        # Open the ingest journal and start draining it
+        ingest_journal = IngestJournal(
+            config.webhook_journal_path,
+            commit_interval=config.webhook_journal_commit_interval_ms / 1000,
+            max_batch=config.webhook_journal_max_batch,
+            max_attempts=config.webhook_journal_max_attempts,
+        )
+        await ingest_journal.open()
+
+        # Process journaled events on workers sharded by conversation/contact
+        worker_pool = ShardedWorkerPool(
+            process_journal_entry,
+            num_workers=config.webhook_workers,
+            queue_size=config.webhook_worker_queue_size,
+        )
+        worker_pool.start()
+        journal_consumer = asyncio.create_task(
+            ingest_journal.consume(dispatch_journal_entry, paused=ingest_paused)
+        )
 
         logger.info("Application initialized successfully")
 
@@ -75,6 +174,47 @@ async def lifespan(app: FastAPI):
         # Shutdown
         logger.info("Shutting down Teams-Intercom Integration")
 
+        if graph_auth_task and not graph_auth_task.done():
+            graph_auth_task.cancel()
+            await asyncio.gather(graph_auth_task, return_exceptions=True)
+
+        if backfill_task and not backfill_task.done():
+            # The job saves its checkpoint, so the next run resumes from it
+            backfill_task.cancel()
+            await asyncio.gather(backfill_task, return_exceptions=True)
+
+        if journal_consumer:
+            journal_consumer.cancel()
+            try:
+                await journal_consumer
+            except asyncio.CancelledError:
+                pass
+
+        if worker_pool:
+            await worker_pool.stop()
+
+        if webhook_handler:
+            await webhook_handler.close()
+
+        if deferred_settlements:
+            await asyncio.gather(*deferred_settlements, return_exceptions=True)
+
+        if intercom_client:
+            await intercom_client.close()
+
+        if contact_cache_task and not contact_cache_task.done():
+            contact_cache_task.cancel()
+            await asyncio.gather(contact_cache_task, return_exceptions=True)
+
+        if contact_cache:
+            await contact_cache.save()
+
+        if ingest_journal:
+            await ingest_journal.close()
+
+        if redis_client:
+            await redis_client.aclose()
+
         if graph_client:
             await graph_client.close()
 
@@ -103,52 +243,115 @@ async def health_check():
     """Detailed health check."""
     health_status = {
         "status": "healthy",
-        "timestamp": structlog.processors.TimeStamper()._make_stamper(
-            "%Y-%m-%d %H:%M:%S"
-        )(),
+        "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
         "services": {
-            "graph_api": graph_client._authenticated if graph_client else False,
+            "graph_api": graph_ready(),
             "webhook_handler": webhook_handler is not None,
+            "webhook_journal": ingest_journal is not None,
+            "webhook_workers": worker_pool is not None,
         },
     }
 
+    if ingest_journal:
+        health_status["webhook_journal"] = await ingest_journal.stats()
+    if worker_pool:
+        health_status["webhook_workers"] = worker_pool.stats()
+    if graph_client:
+        health_status["teams_send"] = graph_client.send_scheduler.stats()
+        health_status["team_directory"] = graph_client.team_directory.stats()
+    if intercom_client:
+        health_status["intercom_rate_limit"] = intercom_client.scheduler.stats()
+        health_status["capabilities"] = intercom_client.capabilities.stats()
+    if resilience:
+        health_status["circuits"] = resilience.stats()
+        if resilience.open_circuits():
+            health_status["status"] = "degraded"
+
     if not all(health_status["services"].values()):
         health_status["status"] = "degraded"
 
     return health_status
 
 
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness check: the process is up and serving requests."""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    """
+    Readiness check: webhooks can be accepted and journaled.
+
+    Journaled events are processed once ``processing`` is true; until Graph
+    is authenticated, or while its circuit is open, they wait in the journal.
+    """
+    ready = webhook_handler is not None and ingest_journal is not None
+    status = {
+        "status": "ready" if ready else "starting",
+        "graph_api": graph_ready(),
+        "processing": ready and not ingest_paused(),
+    }
+    if not ready:
+        return JSONResponse(status_code=503, content=status)
+    return status
+
+
 @app.post(config.webhook_path)
-async def handle_intercom_webhook(request: Request, background_tasks: BackgroundTasks):
+async def handle_intercom_webhook(request: Request):
     """
     Handle incoming Intercom webhooks.
 
+    The event is durably journaled before the 200 is returned and processed
+    asynchronously by the journal consumer.
+
     Args:
         request: FastAPI request object
-        background_tasks: Background task manager
 
     Returns:
         JSON response
     """
     try:
-        # Get raw payload and signature
-        payload = await request.body()
-        signature = request.headers.get("X-Hub-Signature-256", "")
+        # Reject oversized bodies before reading them
+        max_bytes = config.webhook_max_body_bytes
+        content_length = request.headers.get("Content-Length")
+        if content_length is not None:
+            if not content_length.isdigit():
+                raise HTTPException(status_code=400, detail="Invalid Content-Length")
+            if int(content_length) > max_bytes:
+                logger.error(f"Webhook body too large: {content_length} bytes")
+                raise HTTPException(status_code=413, detail="Payload too large")
+
+        # Hash the body incrementally while it streams in
+        signature = webhook_handler.signature_from_headers(request.headers)
+        signature_check = webhook_handler.start_signature_check(signature)
+        chunks = []
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > max_bytes:
+                logger.error(f"Webhook body exceeded {max_bytes} bytes while streaming")
+                raise HTTPException(status_code=413, detail="Payload too large")
+            if signature_check:
+                signature_check.update(chunk)
+            chunks.append(chunk)
+        payload = b"".join(chunks)
 
         # Verify webhook signature
-        if not webhook_handler.verify_webhook_signature(payload, signature):
+        if signature_check and not signature_check.is_valid():
             logger.error("Invalid webhook signature")
             raise HTTPException(status_code=401, detail="Invalid signature")
 
-        # Parse JSON payload
+        # Decode only the envelope fields straight from the raw bytes
         try:
-            data = json.loads(payload.decode("utf-8"))
-        except json.JSONDecodeError as e:
+            envelope = decode_envelope(payload)
+        except msgspec.DecodeError as e:
             logger.error(f"Invalid JSON payload: {str(e)}")
             raise HTTPException(status_code=400, detail="Invalid JSON payload")
 
         # Extract event type
-        topic = data.get("topic")
+        topic = envelope.topic
         if not topic:
             logger.error("Missing topic in webhook data")
             raise HTTPException(status_code=400, detail="Missing topic")
@@ -156,8 +359,39 @@ async def handle_intercom_webhook(request: Request, background_tasks: Background
         # Log webhook received
         logger.info(f"Received webhook: {topic}")
 
-        # Process webhook in background
-        background_tasks.add_task(process_webhook_background, topic, data)
+        # Ignored topics never reach the journal or the workers
+        if topic not in webhook_handler.registry:
+            logger.info(f"Ignoring unregistered webhook topic: {topic}")
+            return JSONResponse(
+                status_code=200, content={"status": "ignored", "topic": topic}
+            )
+
+        # Drop redeliveries of a notification we already accepted
+        notification_id = envelope.id
+        duplicate = bool(notification_id) and await idempotency_store.seen(
+            notification_id
+        )
+        if not duplicate:
+            # Journal the raw payload so the event survives crashes and
+            # restarts; the journal also rejects a notification it still holds
+            entry_id = await ingest_journal.append(
+                topic, payload, ordering_key(envelope), notification_id
+            )
+            duplicate = entry_id is None
+
+        if duplicate:
+            logger.info(
+                f"Duplicate webhook {notification_id} ({topic}), delivery attempt "
+                f"{envelope.delivery_attempts}"
+            )
+            return JSONResponse(
+                status_code=200, content={"status": "duplicate", "topic": topic}
+            )
+
+        if notification_id:
+            # Claimed only once durable, so a crash before the commit never
+            # turns Intercom's retry into a duplicate
+            await idempotency_store.claim(notification_id)
 
         return JSONResponse(
             status_code=200, content={"status": "accepted", "topic": topic}
@@ -170,31 +404,146 @@ async def handle_intercom_webhook(request: Request, background_tasks: Background
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-async def process_webhook_background(event_type: str, data: Dict[str, Any]):
+def graph_ready() -> bool:
+    """Check whether Graph authentication has completed."""
+    return graph_client is not None and graph_client._authenticated
+
+
+async def authenticate_graph():
+    """Authenticate with Graph in the background, retrying until it succeeds."""
+    attempt = 0
+    while not (await graph_client.authenticate() and graph_client._authenticated):
+        await graph_client.close()
+        attempt += 1
+        delay = backoff_delay(attempt, 1.0, 60.0)
+        logger.warning(f"Graph authentication failed, retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+    logger.info("Microsoft Graph ready, processing journaled webhooks")
+
+
+def ingest_paused() -> bool:
+    """
+    Check whether journaled webhooks should wait for an outage to end.
+
+    Every event ends in a Teams post, so entries stay in the journal while
+    Graph authentication is still running in fast-start mode, and while the
+    Graph messages circuit is open, instead of failing one by one.
+    """
+    if graph_auth_task is not None and not graph_auth_task.done():
+        return True
+    return resilience is not None and resilience.is_open("graph.messages")
+
+
+async def dispatch_journal_entry(entry: JournalEntry):
+    """
+    Route a journaled webhook to the worker owning its conversation or contact.
+
+    Args:
+        entry: Journal entry claimed by the consumer
+    """
+    try:
+        event = decode_event(entry.topic, entry.payload)
+    except ValueError as e:
+        logger.error(f"Journal entry {entry.id} has an invalid payload: {str(e)}")
+        await ingest_journal.fail(entry, str(e), retry=False)
+        return
+
+    # Only the trimmed event is queued, the raw body is released here
+    entry.payload = b""
+    await worker_pool.submit(ordering_key(event), entry, event)
+
+
+async def process_journal_entry(entry: JournalEntry, event: WebhookEvent):
+    """
+    Process a journaled webhook and settle it in the journal.
+
+    Args:
+        entry: Journal entry claimed by the consumer
+        event: Decoded webhook event
+    """
+    if not ingest_journal.holds(entry):
+        # Its lease was lost while queued; whoever holds it now processes it
+        logger.info(f"Skipping journal entry {entry.id} no longer leased here")
+        return
+
+    try:
+        result = await webhook_handler.process_webhook(entry.topic, event)
+
+        completion = result.pop("completion", None)
+        if completion is not None:
+            # Coalesced events are settled once their batch has been sent
+            task = asyncio.create_task(settle_journal_entry(entry, completion))
+            deferred_settlements.add(task)
+            task.add_done_callback(deferred_settlements.discard)
+            return
+
+        logger.info(f"Webhook processed successfully: {result}")
+        await ingest_journal.ack(entry.id)
+
+    except Exception as e:
+        await record_journal_failure(entry, e)
+
+
+async def settle_journal_entry(entry: JournalEntry, completion: asyncio.Future):
     """
-    Process webhook in background task.
+    Settle a coalesced webhook once its batch has been processed.
 
     Args:
-        event_type: Type of webhook event
-        data: Webhook data
+        entry: Journal entry claimed by the consumer
+        completion: Future resolved with the batch result
     """
     try:
-        result = await webhook_handler.process_webhook(event_type, data)
+        result = await completion
         logger.info(f"Webhook processed successfully: {result}")
+        await ingest_journal.ack(entry.id)
 
     except Exception as e:
-        logger.error(f"Background webhook processing failed: {str(e)}")
+        await record_journal_failure(entry, e)
+
+
+async def record_journal_failure(entry: JournalEntry, error: Exception):
+    """
+    Record a processing failure so the journal retries the entry.
+
+    Args:
+        entry: Journal entry claimed by the consumer
+        error: Processing error
+    """
+    # A backed-up Teams channel or an open circuit is retried once it has
+    # cleared, without using up one of the entry's attempts
+    delay = None
+    if isinstance(error, SendQueueFull):
+        delay = error.retry_after
+    elif isinstance(error, CircuitOpenError):
+        delay = config.circuit_reset_seconds
+
+    try:
+        if delay is not None:
+            logger.warning(f"Deferring journal entry {entry.id}: {str(error)}")
+            await ingest_journal.fail(entry, str(error), delay=delay)
+            return
+
+        logger.error(f"Journaled webhook processing failed: {str(error)}")
+        await ingest_journal.fail(entry, str(error))
+    except Exception as journal_error:
+        logger.error(f"Failed to record webhook failure: {str(journal_error)}")
 
 
 @app.get("/teams")
-async def get_teams():
-    """Get all Teams the bot has access to."""
+async def get_teams(refresh: bool = False):
+    """
+    Get all Teams the bot has access to.
+
+    Served from the team directory; refresh=true reloads it from Graph first.
+    """
     try:
         if not graph_client or not graph_client._authenticated:
             raise HTTPException(
                 status_code=401, detail="Not authenticated with Microsoft Graph"
             )
 
+        if refresh:
+            await graph_client.team_directory.refresh()
         teams = await graph_client.get_teams()
         return {"teams": teams, "count": len(teams)}
 
@@ -271,14 +620,28 @@ async def send_message(team_id: str, channel_id: str, message_data: Dict[str, st
 
 
 @app.get("/teams/{team_id}/channels/{channel_id}/messages")
-async def get_channel_messages(team_id: str, channel_id: str, limit: int = 50):
-    """Get messages from a Teams channel."""
+async def get_channel_messages(
+    team_id: str, channel_id: str, limit: int = 50, delta: bool = False
+):
+    """
+    Get messages from a Teams channel.
+
+    With delta=true only the messages posted or changed since the previous
+    delta read are returned; "more" tells whether another read is needed to
+    catch up.
+    """
     try:
         if not graph_client or not graph_client._authenticated:
             raise HTTPException(
                 status_code=401, detail="Not authenticated with Microsoft Graph"
             )
 
+        if delta:
+            messages, more = await graph_client.sync_channel_messages(
+                team_id, channel_id, limit
+            )
+            return {"messages": messages, "count": len(messages), "more": more}
+
         messages = await graph_client.get_channel_messages(team_id, channel_id, limit)
         return {"messages": messages, "count": len(messages)}
 
@@ -291,13 +654,44 @@ async def get_channel_messages(team_id: str, channel_id: str, limit: int = 50):
 
 
 @app.get("/intercom/conversations")
-async def get_intercom_conversations(limit: int = 20):
-    """Get recent Intercom conversations."""
+async def get_intercom_conversations(
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    per_page: int = 50,
+):
+    """
+    Get Intercom conversations.
+
+    Without ``stream`` one page of up to ``limit`` conversations is returned
+    with the cursor of the next page. With ``stream`` conversations are sent
+    as NDJSON, one per line, paging through Intercom from ``cursor`` until
+    ``limit`` (0 for no limit) is reached.
+    """
     try:
-        async with IntercomClient() as client:
-            conversations = await client.get_conversations(limit)
+        if stream:
+
+            async def export():
+                try:
+                    async for conversation in intercom_client.iter_conversations(
+                        per_page=per_page, limit=limit or None, starting_after=cursor
+                    ):
+                        yield msgspec.json.encode(conversation) + b"\n"
+                except Exception as e:
+                    logger.error(f"Intercom conversation export stopped: {str(e)}")
+                    raise
+
+            return StreamingResponse(export(), media_type="application/x-ndjson")
+
+        conversations, next_cursor = await intercom_client.get_conversations_page(
+            limit, cursor
+        )
 
-        return {"conversations": conversations, "count": len(conversations)}
+        return {
+            "conversations": conversations,
+            "count": len(conversations),
+            "next_cursor": next_cursor,
+        }
 
     except Exception as e:
         logger.error(f"Failed to get Intercom conversations: {str(e)}")
@@ -317,39 +711,8 @@ async def sync_conversation_to_teams(sync_data: Dict[str, Any]):
         if not team_id:
             raise HTTPException(status_code=400, detail="Team ID is required")
 
-        # Get conversation details from Intercom
-        async with IntercomClient() as client:
-            conversation = await client.get_conversation(conversation_id)
-
-        # Format message for Teams
-        user = conversation.get("source", {}).get("author", {})
-        user_name = user.get("name", "Unknown User")
-        user_email = user.get("email", "No email")
-
-        parts = conversation.get("conversation_parts", {}).get("conversation_parts", [])
-        latest_message = "No message content"
-        if parts:
-            latest_message = parts[-1].get("body", "No message content")
-
-        teams_message = f"""
-🔄 **Manual Sync - Conversation {conversation_id}**
-
-**Customer:** {user_name} ({user_email})
-**Latest Message:**
-{latest_message}
-
-[View in Intercom](https://app.intercom.com/a/apps/{conversation_id})
-"""
-
-        # Send to Teams
-        channel = await graph_client.find_or_create_channel(
-            team_id,
-            config.default_channel_name,
-            "Customer support inquiries from Intercom",
-        )
-
-        sent_message = await graph_client.send_message(
-            team_id, channel["id"], teams_message, "html"
+        sent_message = await sync_conversation(
+            graph_client, intercom_client, conversation_id, team_id
         )
 
         return {
@@ -365,6 +728,85 @@ async def sync_conversation_to_teams(sync_data: Dict[str, Any]):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/backfill")
+async def start_backfill(backfill_data: Dict[str, Any]):
+    """
+    Start a backfill of conversations updated in a time range into Teams.
+
+    ``since`` and ``until`` are Unix timestamps or ISO 8601 times (UTC).
+    A run for the same range resumes from its checkpoint unless ``restart``
+    is set. Progress is reported by ``GET /backfill``.
+    """
+    global backfill_job, backfill_task
+
+    if backfill_task and not backfill_task.done():
+        raise HTTPException(status_code=409, detail="A backfill is already running")
+
+    team_id = backfill_data.get("team_id", config.default_team_id)
+    if not team_id:
+        raise HTTPException(status_code=400, detail="Team ID is required")
+
+    try:
+        since = parse_timestamp(backfill_data["since"])
+        until = parse_timestamp(backfill_data["until"])
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=400, detail="Valid since and until times are required"
+        )
+    if since > until:
+        raise HTTPException(status_code=400, detail="since must not be after until")
+
+    try:
+        concurrency = parse_concurrency(
+            backfill_data.get("concurrency", config.backfill_concurrency)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def sync(conversation: Dict[str, Any]):
+        return await sync_conversation(
+            graph_client,
+            intercom_client,
+            str(conversation["id"]),
+            team_id,
+            conversation.get("updated_at"),
+        )
+
+    job = BackfillJob(
+        intercom_client,
+        sync,
+        since,
+        until,
+        checkpoint_path=config.backfill_checkpoint_path or None,
+        concurrency=concurrency,
+        per_page=config.backfill_page_size,
+        checkpoint_interval=config.backfill_checkpoint_interval_seconds,
+    )
+    await job.load(restart=bool(backfill_data.get("restart", False)))
+
+    async def run():
+        try:
+            await job.run()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Backfill stopped: {str(e)}")
+
+    backfill_job = job
+    backfill_task = asyncio.create_task(run())
+    logger.info(f"Started backfill of conversations updated {since}-{until}")
+
+    return {"status": "started", "backfill": job.stats()}
+
+
+@app.get("/backfill")
+async def get_backfill():
+    """Get the progress and throughput of the current or last backfill."""
+    if backfill_job is None:
+        raise HTTPException(status_code=404, detail="No backfill has been started")
+    return backfill_job.stats()
+
+
 @app.post("/teams/message-from-intercom")
 async def forward_teams_message_to_intercom(message_data: Dict[str, Any]):
     """Forward a Teams message to create/update an Intercom conversation."""
@@ -378,19 +820,29 @@ async def forward_teams_message_to_intercom(message_data: Dict[str, Any]):
                 status_code=400, detail="Message and user email are required"
             )
 
-        async with IntercomClient() as client:
-            if conversation_id:
-                # Reply to existing conversation
-                result = await client.reply_to_conversation(
-                    conversation_id, teams_message, "comment"
-                )
-            else:
-                # Create new conversation or find/create user first
-                user_data = {"email": user_email, "role": "user"}
-                user = await client.create_or_update_user(user_data)
-
-                result = await client.create_conversation(
-                    user["id"], teams_message, "comment"
+        if conversation_id:
+            # Reply to existing conversation
+            result = await intercom_client.reply_to_conversation(
+                conversation_id, teams_message, "comment"
+            )
+        else:
+            # Repeat senders reuse their cached contact
+            contact_id = contact_cache.get(user_email)
+            result = None
+            if contact_id:
+                try:
+                    result = await intercom_client.create_conversation(
+                        contact_id, teams_message, "comment"
+                    )
+                except IntercomAPIError as e:
+                    if e.status != 404:
+                        raise
+                    contact_cache.invalidate(user_email)
+
+            if result is None:
+                contact_id = await resolve_contact_id(user_email)
+                result = await intercom_client.create_conversation(
+                    contact_id, teams_message, "comment"
                 )
 
         return {
@@ -399,11 +851,42 @@ async def forward_teams_message_to_intercom(message_data: Dict[str, Any]):
             "intercom_response": result,
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to forward Teams message to Intercom: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def resolve_contact_id(user_email: str) -> str:
+    """
+    Find or create the Intercom contact for an email and cache its ID.
+
+    Args:
+        user_email (str): Sender email
+
+    Returns:
+        str: Contact ID
+
+    Raises:
+        HTTPException: 400 if the email is malformed or rejected by Intercom
+    """
+    if contact_cache.is_invalid(user_email):
+        raise HTTPException(status_code=400, detail="Invalid user email")
+
+    user_data = {"email": user_email, "role": "user"}
+    try:
+        user = await intercom_client.create_or_update_user(user_data)
+    except IntercomAPIError as e:
+        if e.status not in (400, 422):
+            raise
+        contact_cache.mark_invalid(user_email)
+        raise HTTPException(status_code=400, detail="Invalid user email")
+
+    contact_cache.set(user_email, user["id"])
+    return user["id"]
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
@@ -0,0 +1,180 @@
+"""
+Priority-aware token bucket for outbound API calls.
+Requests wait for a token in priority order. The bucket follows the budget
+that the API reports in its rate-limit headers, and it pauses when asked to
+back off. Part of the budget is kept for interactive work, so bulk traffic
+cannot starve webhooks.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Priority of bulk and manual traffic; anything higher counts as interactive
+PRIORITY_BULK = 0
+
+# Priority of calls made from the current task, set by the webhook dispatcher
+request_priority: ContextVar[int] = ContextVar(
+    "request_priority", default=PRIORITY_BULK
+)
+
+
+def retry_delay(headers: Mapping[str, str], default: float = 1.0) -> float:
+    """
+    Get how long to wait after a rate-limited response.
+
+    Uses Retry-After in seconds, then the X-RateLimit-Reset time, then the
+    default.
+
+    Args:
+        headers (Mapping): Response headers
+        default (float): Seconds to wait when the headers give no hint
+
+    Returns:
+        float: Seconds to wait
+    """
+    try:
+        retry_after = headers.get("Retry-After")
+        if retry_after:
+            return max(float(retry_after), 0.0)
+        reset_at = headers.get("X-RateLimit-Reset")
+        if reset_at:
+            return max(float(reset_at) - time.time(), 0.0) or default
+    except ValueError:
+        pass
+    return default
+
+
+class RateLimitScheduler:
+    """Token bucket that hands out tokens to waiters by priority."""
+
+    def __init__(self, rate: float, capacity: float, bulk_reserve: float = 0.2):
+        """
+        Initialize the scheduler.
+
+        Args:
+            rate (float): Tokens added per second
+            capacity (float): Maximum tokens, i.e. the allowed burst
+            bulk_reserve (float): Fraction of capacity that only interactive
+                requests may use
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.reserve = capacity * bulk_reserve
+        self.tokens = capacity
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    async def acquire(self, priority: Optional[int] = None):
+        """
+        Wait for a token.
+
+        Args:
+            priority (Optional[int]): Request priority, higher goes first.
+                Defaults to the current task's ``request_priority``.
+        """
+        if priority is None:
+            priority = request_priority.get()
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (-priority, next(self._order), future))
+        self._drain()
+        await future
+
+    def update(
+        self,
+        limit: Optional[int] = None,
+        remaining: Optional[int] = None,
+        reset_at: Optional[float] = None,
+    ):
+        """
+        Align the bucket with the budget reported by the API.
+
+        Args:
+            limit (Optional[int]): Requests allowed in the current window
+            remaining (Optional[int]): Requests left in the current window
+            reset_at (Optional[float]): Unix time at which the window resets
+        """
+        self.limit = limit if limit is not None else self.limit
+        if remaining is None:
+            return
+
+        self.remaining = remaining
+        self._refill()
+        self.tokens = min(self.tokens, remaining)
+        if remaining <= 0 and reset_at:
+            self.defer(reset_at - time.time())
+
+    def defer(self, seconds: float):
+        """
+        Hand out no tokens for a while, e.g. for a Retry-After.
+
+        Args:
+            seconds (float): Seconds to pause
+        """
+        if seconds <= 0:
+            return
+        until = time.monotonic() + seconds
+        if until > self._paused_until:
+            logger.warning(f"Rate limited, pausing requests for {seconds:.1f}s")
+            self._paused_until = until
+        self._drain()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the current budget and queue depth."""
+        self._refill()
+        return {
+            "tokens": round(self.tokens, 1),
+            "waiting": sum(1 for _, _, future in self._waiters if not future.done()),
+            "paused_for": round(max(self._paused_until - time.monotonic(), 0.0), 1),
+            "limit": self.limit,
+            "remaining": self.remaining,
+        }
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    def _drain(self):
+        if self._wakeup:
+            self._wakeup.cancel()
+            self._wakeup = None
+
+        self._refill()
+        now = time.monotonic()
+        delay = None
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+
+            if now < self._paused_until:
+                delay = self._paused_until - now
+                break
+
+            floor = 0.0 if -priority > PRIORITY_BULK else self.reserve
+            if self.tokens - 1 < floor:
+                delay = (floor + 1 - self.tokens) / self.rate
+                break
+
+            heapq.heappop(self._waiters)
+            self.tokens -= 1
+            future.set_result(None)
+
+        if delay is not None:
+            self._wakeup = asyncio.get_running_loop().call_later(delay, self._drain)
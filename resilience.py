@@ -0,0 +1,285 @@
+"""
+Retry and circuit breaking for outbound API calls.
+Retry-safe failures are retried with exponential backoff and full jitter.
+Each endpoint has a circuit breaker that fails fast while the endpoint is
+down and lets a single probe through once the reset timeout has passed.
+"""
+
+import asyncio
+import logging
+import random
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_TRANSIENT_ERRORS = (asyncio.TimeoutError, aiohttp.ClientError, ConnectionError)
+
+
+def _transient_errors() -> tuple:
+    # httpx comes with the Graph SDK, which is imported lazily; its errors
+    # can only occur once it has been loaded
+    httpx = sys.modules.get("httpx")
+    if httpx is None:
+        return _TRANSIENT_ERRORS
+    return _TRANSIENT_ERRORS + (httpx.TransportError,)
+
+
+class CircuitOpenError(Exception):
+    """A call was rejected because the endpoint's circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit {name} is open, retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+def error_status(error: BaseException) -> Optional[int]:
+    """Get the HTTP status carried by an API error, if any."""
+    status = getattr(error, "status", None)
+    if status is None:
+        status = getattr(error, "response_status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    Check whether a failure says the endpoint is unhealthy.
+
+    Connection errors, timeouts, throttling and 5xx responses are transient;
+    other errors mean the endpoint answered and the request itself was bad.
+    """
+    if isinstance(error, _transient_errors()):
+        return True
+    status = error_status(error)
+    return status is not None and (status == 429 or status >= 500)
+
+
+def is_throttled(error: BaseException) -> bool:
+    """
+    Check whether the endpoint throttled a request.
+
+    A 429 is worth retrying after the delay the endpoint asks for, but it
+    shows the endpoint is up, so it never counts towards opening a circuit.
+    """
+    return error_status(error) == 429
+
+
+def is_rejected(error: BaseException) -> bool:
+    """
+    Check whether the endpoint refused a request without processing it.
+
+    Throttled (429) and unavailable (503) responses are safe to retry even
+    for requests that are not idempotent.
+    """
+    return error_status(error) in (429, 503)
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Get the delay before a retry with exponential backoff and full jitter.
+
+    Args:
+        attempt (int): Number of the attempt that failed, starting at 1
+        base (float): Delay in seconds for the first retry
+        cap (float): Maximum delay in seconds
+
+    Returns:
+        float: Seconds to wait
+    """
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Tracks failures of one endpoint and fails fast while it is down."""
+
+    def __init__(
+        self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0
+    ):
+        """
+        Initialize the breaker.
+
+        Args:
+            name (str): Endpoint name
+            failure_threshold (int): Consecutive failures that open the circuit
+            reset_timeout (float): Seconds before an open circuit is probed
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        """Get the circuit state: closed, open or half_open."""
+        if self._opened_at is None:
+            return CLOSED
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return OPEN
+        return HALF_OPEN
+
+    def before_call(self):
+        """
+        Check that a call may proceed.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half open with a
+                probe already in flight
+        """
+        state = self.state
+        if state == CLOSED:
+            return
+        if state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return
+        raise CircuitOpenError(self.name, self.retry_after())
+
+    def record_success(self):
+        """Close the circuit after a call that reached a healthy endpoint."""
+        if self._opened_at is not None:
+            logger.info(f"Circuit {self.name} closed")
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self):
+        """Count a transient failure and open the circuit at the threshold."""
+        self.failures += 1
+        if self._probing or (
+            self._opened_at is None and self.failures >= self.failure_threshold
+        ):
+            logger.warning(f"Circuit {self.name} opened after {self.failures} failures")
+            self._opened_at = time.monotonic()
+            self._probing = False
+
+    def abandon(self):
+        """Release the probe slot of a call that was cancelled."""
+        self._probing = False
+
+    def retry_after(self) -> float:
+        """Get the seconds until an open circuit is probed again."""
+        if self._opened_at is None:
+            return 0.0
+        return max(self._opened_at + self.reset_timeout - time.monotonic(), 0.0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the circuit state."""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_after": round(self.retry_after(), 1),
+        }
+
+
+class Resilience:
+    """Shared retry policy and per-endpoint circuit breakers."""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff_base: float = 0.2,
+        backoff_max: float = 5.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+    ):
+        """
+        Initialize the policy.
+
+        Args:
+            max_attempts (int): Attempts per call, including the first
+            backoff_base (float): Delay in seconds for the first retry
+            backoff_max (float): Maximum retry delay in seconds
+            failure_threshold (int): Consecutive failures that open a circuit
+            reset_timeout (float): Seconds before an open circuit is probed
+        """
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def breaker(self, name: str) -> CircuitBreaker:
+        """Get the circuit breaker for an endpoint, creating it on first use."""
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = self._breakers[name] = CircuitBreaker(
+                name, self.failure_threshold, self.reset_timeout
+            )
+        return breaker
+
+    async def call(
+        self,
+        name: str,
+        operation: Callable[[], Awaitable[T]],
+        retry_safe: Callable[[BaseException], bool] = is_transient,
+    ) -> T:
+        """
+        Run an operation through the endpoint's breaker, retrying on failure.
+
+        Args:
+            name (str): Endpoint name, e.g. ``graph.messages``
+            operation (Callable): Coroutine function making one attempt
+            retry_safe (Callable): Whether a failure may be retried; use
+                is_transient for idempotent calls and is_rejected otherwise
+
+        Returns:
+            Any: Result of the operation
+
+        Raises:
+            CircuitOpenError: If the endpoint's circuit is open
+        """
+        breaker = self.breaker(name)
+        for attempt in range(1, self.max_attempts + 1):
+            breaker.before_call()
+            try:
+                result = await operation()
+            except asyncio.CancelledError:
+                breaker.abandon()
+                raise
+            except Exception as e:
+                if is_transient(e) and not is_throttled(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+
+                if attempt >= self.max_attempts or not retry_safe(e):
+                    raise
+
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                delay = max(delay, getattr(e, "retry_after", None) or 0.0)
+                logger.warning(
+                    f"{name} attempt {attempt} failed, retrying in {delay:.2f}s: "
+                    f"{str(e)}"
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            breaker.record_success()
+            return result
+
+    def is_open(self, name: str) -> bool:
+        """Check whether an endpoint's circuit is open and not yet probed."""
+        breaker = self._breakers.get(name)
+        return breaker is not None and breaker.state == OPEN
+
+    def open_circuits(self) -> List[str]:
+        """Get the endpoints whose circuits are not closed."""
+        return [
+            name for name, breaker in self._breakers.items() if breaker.state != CLOSED
+        ]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get the state of every circuit."""
+        return {name: breaker.stats() for name, breaker in self._breakers.items()}
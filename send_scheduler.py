@@ -0,0 +1,277 @@
+"""
+Throttling-aware scheduler for Teams channel posts.
+Graph throttles channel messages per channel and per tenant, so each post
+takes a token from its channel's bucket and from a global bucket. Channels
+with waiting posts are served round robin, so a busy channel cannot starve
+the others. A Retry-After pauses the channel it was returned for; once a
+second channel is throttled while another is still paused, the limit is
+taken to be the tenant's and every channel pauses. A post that would wait
+longer than the queue allows is refused, so callers can
+retry it later instead of timing out in the queue.
+"""
+
+import asyncio
+import logging
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Queue waits kept for the wait-time percentiles
+WAIT_SAMPLES = 1000
+
+
+class SendQueueFull(Exception):
+    """A post was refused because its channel's queue is too long."""
+
+    def __init__(self, channel: Hashable, retry_after: float):
+        super().__init__(
+            f"Send queue for {channel} is full, retry in {retry_after:.1f}s"
+        )
+        self.channel = channel
+        self.retry_after = retry_after
+
+
+@dataclass(slots=True)
+class _Bucket:
+    rate: float
+    capacity: float
+    tokens: float
+    updated_at: float
+    paused_until: float = 0.0
+
+    def refill(self, now: float):
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    def ready_in(self, now: float) -> float:
+        """Get the seconds until a token can be taken."""
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class ChannelSendScheduler:
+    """Per-channel and global token buckets with round-robin fair queuing."""
+
+    def __init__(
+        self,
+        channel_rate: float = 1.0,
+        channel_burst: float = 5.0,
+        global_rate: float = 20.0,
+        global_burst: float = 40.0,
+        max_channels: int = 1024,
+        max_wait: Optional[float] = None,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            channel_rate (float): Posts per second allowed per channel
+            channel_burst (float): Posts a quiet channel may send at once
+            global_rate (float): Posts per second allowed across channels
+            global_burst (float): Posts that may be sent at once overall
+            max_channels (int): Idle channel buckets kept before pruning
+            max_wait (Optional[float]): Longest expected queue wait a post is
+                accepted for, None accepts every post
+        """
+        self.channel_rate = channel_rate
+        self.channel_burst = channel_burst
+        self.max_channels = max_channels
+        self.max_wait = max_wait
+        self._global = _Bucket(
+            global_rate, global_burst, global_burst, time.monotonic()
+        )
+        self._channels: Dict[Hashable, _Bucket] = {}
+        self._queues: Dict[Hashable, Deque[Tuple[float, asyncio.Future]]] = {}
+        # Channels with waiting posts, in the order they are served
+        self._ring: Deque[Hashable] = deque()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        self._waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self._granted = 0
+        self._refused = 0
+
+    async def acquire(self, channel: Hashable) -> float:
+        """
+        Wait until a post to a channel may be sent.
+
+        Args:
+            channel (Hashable): Channel key, e.g. (team_id, channel_id)
+
+        Returns:
+            float: Seconds spent waiting in the queue
+
+        Raises:
+            SendQueueFull: If the expected wait is longer than max_wait
+        """
+        if self.max_wait is not None:
+            expected = self._expected_wait(channel)
+            if expected > self.max_wait:
+                self._refused += 1
+                raise SendQueueFull(channel, expected - self.max_wait)
+
+        future = asyncio.get_running_loop().create_future()
+        queue = self._queues.get(channel)
+        if queue is None:
+            queue = self._queues[channel] = deque()
+            self._ring.append(channel)
+        queue.append((time.monotonic(), future))
+        self._drain()
+        return await future
+
+    def defer(self, seconds: float, channel: Optional[Hashable] = None):
+        """
+        Send nothing for a while, e.g. for a Retry-After.
+
+        A channel throttled while another channel is still paused pauses all
+        channels, since Graph is then enforcing its tenant-wide limit.
+
+        Args:
+            seconds (float): Seconds to pause
+            channel (Optional[Hashable]): Channel to pause, None pauses all
+        """
+        if seconds <= 0:
+            return
+        now = time.monotonic()
+        buckets = [self._global]
+        if channel is not None:
+            buckets = [self._bucket(channel)]
+            if any(
+                other != channel and bucket.paused_until > now
+                for other, bucket in self._channels.items()
+            ):
+                buckets.append(self._global)
+
+        until = now + seconds
+        for bucket in buckets:
+            if until > bucket.paused_until:
+                target = channel if bucket is not self._global else "all channels"
+                logger.warning(
+                    f"Teams posts to {target} throttled, pausing for {seconds:.1f}s"
+                )
+                bucket.paused_until = until
+                bucket.tokens = 0.0
+        self._drain()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the queue depth and queue wait times."""
+        now = time.monotonic()
+        self._global.refill(now)
+        waits = sorted(self._waits)
+        return {
+            "queued": sum(
+                1
+                for queue in self._queues.values()
+                for _, future in queue
+                if not future.done()
+            ),
+            "channels_waiting": len(self._ring),
+            "global_tokens": round(self._global.tokens, 1),
+            "paused_for": round(max(self._global.paused_until - now, 0.0), 1),
+            "sent": self._granted,
+            "refused": self._refused,
+            "wait_ms": {
+                "p50": round(statistics.median(waits) * 1000, 1) if waits else 0.0,
+                "p95": round(waits[int(len(waits) * 0.95)] * 1000, 1) if waits else 0.0,
+                "max": round(waits[-1] * 1000, 1) if waits else 0.0,
+            },
+        }
+
+    def _expected_wait(self, channel: Hashable) -> float:
+        """Estimate how long a post queued now would wait for its tokens."""
+        now = time.monotonic()
+        waiting = {
+            key: sum(1 for _, future in queue if not future.done())
+            for key, queue in self._queues.items()
+        }
+        expected = 0.0
+        for bucket, ahead in (
+            (self._bucket(channel), waiting.get(channel, 0)),
+            (self._global, sum(waiting.values())),
+        ):
+            bucket.refill(now)
+            paused = max(bucket.paused_until - now, 0.0)
+            tokens = 0.0 if paused else bucket.tokens
+            expected = max(
+                expected, paused + max(ahead + 1 - tokens, 0.0) / bucket.rate
+            )
+        return expected
+
+    def _bucket(self, channel: Hashable) -> _Bucket:
+        bucket = self._channels.get(channel)
+        if bucket is None:
+            now = time.monotonic()
+            if len(self._channels) >= self.max_channels:
+                self._prune(now)
+            bucket = self._channels[channel] = _Bucket(
+                self.channel_rate, self.channel_burst, self.channel_burst, now
+            )
+        return bucket
+
+    def _prune(self, now: float):
+        """Forget channels whose buckets are full again and have no posts."""
+        for channel, bucket in list(self._channels.items()):
+            bucket.refill(now)
+            if (
+                channel not in self._queues
+                and bucket.tokens >= bucket.capacity
+                and bucket.paused_until <= now
+            ):
+                del self._channels[channel]
+
+    def _drain(self):
+        if self._wakeup:
+            self._wakeup.cancel()
+            self._wakeup = None
+
+        now = time.monotonic()
+        self._global.refill(now)
+        delay = None
+        progressed = True
+        while self._ring and progressed:
+            progressed = False
+            for _ in range(len(self._ring)):
+                # Stop without reordering, so the channel next in turn keeps
+                # its place until the global budget refills
+                global_wait = self._global.ready_in(now)
+                if global_wait > 0:
+                    delay = global_wait
+                    progressed = False
+                    break
+
+                channel = self._ring.popleft()
+                queue = self._queues[channel]
+                while queue and queue[0][1].done():
+                    queue.popleft()
+                if not queue:
+                    del self._queues[channel]
+                    continue
+
+                bucket = self._bucket(channel)
+                bucket.refill(now)
+                wait = bucket.ready_in(now)
+                if wait > 0:
+                    delay = wait if delay is None else min(delay, wait)
+                    self._ring.append(channel)
+                    continue
+
+                bucket.tokens -= 1
+                self._global.tokens -= 1
+                enqueued_at, future = queue.popleft()
+                waited = now - enqueued_at
+                self._waits.append(waited)
+                self._granted += 1
+                future.set_result(waited)
+                progressed = True
+                # Serve the other channels before this one again
+                self._ring.append(channel)
+
+        if delay is not None:
+            self._wakeup = asyncio.get_running_loop().call_later(delay, self._drain)
@@ -0,0 +1,140 @@
+"""
+In-memory directory of the Teams the app can see.
+Listing every team is slow on large tenants, so the list is loaded once and
+lookups by ID or name are served from memory. Once the list is older than
+its TTL it is still served while a fresh copy loads in the background.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from cache import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class TeamDirectory:
+    """Teams indexed by ID and name, refreshed in the background."""
+
+    def __init__(
+        self,
+        load: Callable[[], Awaitable[List[Dict[str, Any]]]],
+        ttl: float = 900.0,
+        retry_interval: float = 30.0,
+    ):
+        """
+        Initialize the directory.
+
+        Args:
+            load (Callable): Coroutine function listing all teams
+            ttl (float): Seconds after which the list is refreshed
+            retry_interval (float): Seconds between refreshes after one failed
+        """
+        self._load = load
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self._teams: Optional[List[Dict[str, Any]]] = None
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        # Lowercased display name -> team
+        self._by_name: Dict[str, Dict[str, Any]] = {}
+        self._loaded_at = 0.0
+        self._refresh_at = 0.0
+        self._loads = SingleFlight()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def teams(self) -> List[Dict[str, Any]]:
+        """
+        Get all teams.
+
+        Returns:
+            List[Dict]: Team objects, possibly up to one refresh old
+        """
+        return list(await self._current())
+
+    async def get(self, team_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a team by ID.
+
+        Args:
+            team_id (str): The team ID
+
+        Returns:
+            Optional[Dict]: Team object, or None if the app cannot see it
+        """
+        await self._current()
+        return self._by_id.get(team_id)
+
+    async def find(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a team by display name, ignoring case.
+
+        Args:
+            name (str): Display name
+
+        Returns:
+            Optional[Dict]: Team object, or None if no team has the name
+        """
+        await self._current()
+        return self._by_name.get(name.strip().lower())
+
+    async def refresh(self) -> List[Dict[str, Any]]:
+        """Reload the teams now, sharing a load already in progress."""
+        return await self._loads.do("teams", self._reload)
+
+    def invalidate(self):
+        """Refresh the teams on the next lookup, serving the current list."""
+        self._refresh_at = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the size and age of the directory."""
+        return {
+            "teams": len(self._teams or ()),
+            "age_seconds": (
+                round(time.monotonic() - self._loaded_at, 1)
+                if self._teams is not None
+                else None
+            ),
+            "refreshing": self._loads.in_flight("teams"),
+        }
+
+    async def close(self):
+        """Stop a background refresh."""
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+
+    async def _current(self) -> List[Dict[str, Any]]:
+        if self._teams is None:
+            return await self.refresh()
+
+        now = time.monotonic()
+        if now >= self._refresh_at and not self._loads.in_flight("teams"):
+            # Pushed back so a failing refresh is not retried on every lookup
+            self._refresh_at = now + self.retry_interval
+            self._refresh_task = asyncio.create_task(self._refresh_in_background())
+        return self._teams
+
+    async def _refresh_in_background(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning(
+                f"Failed to refresh teams, serving the cached list: {str(e)}"
+            )
+
+    async def _reload(self) -> List[Dict[str, Any]]:
+        teams = await self._load()
+        by_name: Dict[str, Dict[str, Any]] = {}
+        for team in teams:
+            name = (team.get("displayName") or "").strip().lower()
+            by_name.setdefault(name, team)
+
+        self._teams = teams
+        self._by_id = {team["id"]: team for team in teams}
+        self._by_name = by_name
+        self._loaded_at = time.monotonic()
+        self._refresh_at = self._loaded_at + self.ttl
+        logger.info(f"Loaded {len(teams)} teams into the team directory")
+        return teams
@@ -4,16 +4,25 @@ Testes unitários básicos para a aplicação Teams-Intercom Integration.
 
 from unittest.mock import AsyncMock, Mock, patch
 
+import msgspec
 import pytest
 from fastapi.testclient import TestClient
 
 from config import config
 from graph_client import GraphClient
 from intercom_client import IntercomClient
+from intercom_models import decode_event
 from main import app
 from webhook_handler import WebhookHandler
 
 
+def webhook_event(topic, item):
+    """Evento de webhook decodificado como o journal o entrega."""
+    return decode_event(
+        topic, msgspec.json.encode({"topic": topic, "data": {"item": item}})
+    )
+
+
 @pytest.fixture
 def client():
     """Cliente de teste FastAPI."""
@@ -87,9 +96,10 @@ class TestGraphClient:
     @pytest.mark.asyncio
     async def test_authentication_success(self):
         """Teste de autenticação bem-sucedida."""
+        # O SDK é importado na autenticação, então os mocks ficam nos módulos dele
         with (
-            patch("graph_client.ClientSecretCredential"),
-            patch("graph_client.GraphServiceClient") as mock_graph,
+            patch("azure.identity.aio.ClientSecretCredential"),
+            patch("msgraph.GraphServiceClient") as mock_graph,
         ):
             mock_graph.return_value.me.get = AsyncMock()
 
@@ -103,8 +113,8 @@ class TestGraphClient:
     async def test_authentication_failure(self):
         """Teste de falha na autenticação."""
         with (
-            patch("graph_client.ClientSecretCredential"),
-            patch("graph_client.GraphServiceClient") as mock_graph,
+            patch("azure.identity.aio.ClientSecretCredential"),
+            patch("msgraph.GraphServiceClient") as mock_graph,
         ):
             mock_graph.return_value.me.get = AsyncMock(
                 side_effect=Exception("Auth failed")
@@ -255,13 +265,15 @@ class TestWebhookHandler:
         self, mock_graph_client, mock_intercom_client
     ):
         """Teste de processamento de webhook de conversa criada."""
-        handler = WebhookHandler(mock_graph_client, mock_intercom_client)
-
         with patch.object(
-            handler, "_handle_conversation_created", return_value={"status": "success"}
+            WebhookHandler,
+            "_handle_conversation_created",
+            return_value={"status": "success"},
         ):
+            handler = WebhookHandler(mock_graph_client, mock_intercom_client)
             result = await handler.process_webhook(
-                "conversation.user.created", {"data": {"item": {"id": "conv1"}}}
+                "conversation.user.created",
+                webhook_event("conversation.user.created", {"id": "conv1"}),
             )
 
             assert result["status"] == "success"
@@ -284,22 +296,22 @@ class TestWebhookHandler:
         self, mock_graph_client, mock_intercom_client
     ):
         """Teste de processamento de evento de criação de contato usuário."""
-        handler = WebhookHandler(mock_graph_client, mock_intercom_client)
-
         with patch.object(
-            handler, "_handle_contact_user_created", return_value={"status": "success"}
+            WebhookHandler,
+            "_handle_contact_user_created",
+            return_value={"status": "success"},
         ):
+            handler = WebhookHandler(mock_graph_client, mock_intercom_client)
             result = await handler.process_webhook(
                 "contact.user.created",
-                {
-                    "data": {
-                        "item": {
-                            "id": "contact1",
-                            "name": "John Doe",
-                            "email": "john@example.com",
-                        }
-                    }
-                },
+                webhook_event(
+                    "contact.user.created",
+                    {
+                        "id": "contact1",
+                        "name": "John Doe",
+                        "email": "john@example.com",
+                    },
+                ),
             )
 
             assert result["status"] == "success"
@@ -309,22 +321,22 @@ class TestWebhookHandler:
         self, mock_graph_client, mock_intercom_client
     ):
         """Teste de processamento de evento de criação de lead."""
-        handler = WebhookHandler(mock_graph_client, mock_intercom_client)
-
         with patch.object(
-            handler, "_handle_contact_lead_created", return_value={"status": "success"}
+            WebhookHandler,
+            "_handle_contact_lead_created",
+            return_value={"status": "success"},
         ):
+            handler = WebhookHandler(mock_graph_client, mock_intercom_client)
             result = await handler.process_webhook(
                 "contact.lead.created",
-                {
-                    "data": {
-                        "item": {
-                            "id": "lead1",
-                            "name": "Jane Doe",
-                            "email": "jane@example.com",
-                        }
-                    }
-                },
+                webhook_event(
+                    "contact.lead.created",
+                    {
+                        "id": "lead1",
+                        "name": "Jane Doe",
+                        "email": "jane@example.com",
+                    },
+                ),
             )
 
             assert result["status"] == "success"
@@ -334,22 +346,20 @@ class TestWebhookHandler:
         self, mock_graph_client, mock_intercom_client
     ):
         """Teste de processamento de evento de conversão de lead."""
-        handler = WebhookHandler(mock_graph_client, mock_intercom_client)
-
         with patch.object(
-            handler, "_handle_lead_signed_up", return_value={"status": "success"}
+            WebhookHandler, "_handle_lead_signed_up", return_value={"status": "success"}
         ):
+            handler = WebhookHandler(mock_graph_client, mock_intercom_client)
             result = await handler.process_webhook(
                 "contact.lead.signed_up",
-                {
-                    "data": {
-                        "item": {
-                            "id": "contact1",
-                            "name": "Converted User",
-                            "email": "converted@example.com",
-                        }
-                    }
-                },
+                webhook_event(
+                    "contact.lead.signed_up",
+                    {
+                        "id": "contact1",
+                        "name": "Converted User",
+                        "email": "converted@example.com",
+                    },
+                ),
             )
 
             assert result["status"] == "success"
@@ -359,22 +369,22 @@ class TestWebhookHandler:
         self, mock_graph_client, mock_intercom_client
     ):
         """Teste de processamento de evento de conversão de visitante."""
-        handler = WebhookHandler(mock_graph_client, mock_intercom_client)
-
         with patch.object(
-            handler, "_handle_visitor_signed_up", return_value={"status": "success"}
+            WebhookHandler,
+            "_handle_visitor_signed_up",
+            return_value={"status": "success"},
         ):
+            handler = WebhookHandler(mock_graph_client, mock_intercom_client)
             result = await handler.process_webhook(
                 "visitor.signed_up",
-                {
-                    "data": {
-                        "item": {
-                            "id": "visitor1",
-                            "name": "New User",
-                            "email": "newuser@example.com",
-                        }
-                    }
-                },
+                webhook_event(
+                    "visitor.signed_up",
+                    {
+                        "id": "visitor1",
+                        "name": "New User",
+                        "email": "newuser@example.com",
+                    },
+                ),
             )
 
             assert result["status"] == "success"
@@ -391,9 +401,7 @@ class TestMainApp:
 
     def test_webhook_endpoint_missing_signature(self, client):
         """Teste do endpoint webhook sem assinatura."""
-        with patch("main.webhook_handler") as mock_handler:
-            mock_handler.verify_webhook_signature.return_value = False
-
+        with patch("main.webhook_handler", WebhookHandler(Mock(), Mock())):
             response = client.post("/webhooks/intercom", json={"topic": "test"})
             assert response.status_code == 401
 
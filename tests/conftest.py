@@ -0,0 +1,10 @@
+"""Shared test setup."""
+
+import os
+
+# Required settings for modules that load the global configuration
+os.environ.setdefault("AZURE_CLIENT_ID", "test-client-id")
+os.environ.setdefault("AZURE_CLIENT_SECRET", "test-client-secret")
+os.environ.setdefault("AZURE_TENANT_ID", "test-tenant-id")
+os.environ.setdefault("INTERCOM_ACCESS_TOKEN", "test-token")
+os.environ.setdefault("INTERCOM_WEBHOOK_SECRET", "test-secret")
@@ -0,0 +1,169 @@
+"""Tests for the checkpointed conversation backfill."""
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from backfill import (
+    COMPLETED,
+    FAILED,
+    BackfillJob,
+    parse_concurrency,
+    parse_timestamp,
+)
+from resilience import CircuitOpenError
+
+
+class FakeSearch:
+    """Serves conversations matching an updated_at range query, oldest first."""
+
+    def __init__(self, conversations):
+        self.conversations = conversations
+        self.queries = []
+
+    async def iter_search(self, query, per_page=50, limit=None, sort=None):
+        self.queries.append(query)
+        after, before = (condition["value"] for condition in query["value"])
+        for conversation in sorted(
+            self.conversations, key=lambda item: item["updated_at"]
+        ):
+            if after < conversation["updated_at"] < before:
+                yield conversation
+
+
+def conversations(*updated_at):
+    return [
+        {"id": str(index), "updated_at": value}
+        for index, value in enumerate(updated_at)
+    ]
+
+
+def test_parse_timestamp():
+    """Unix timestamps and ISO 8601 times are accepted, naive times as UTC."""
+    assert parse_timestamp(1714521600) == 1714521600
+    assert parse_timestamp("1714521600") == 1714521600
+    assert parse_timestamp("2024-05-01") == 1714521600
+    assert parse_timestamp("2024-05-01T00:00:00Z") == 1714521600
+
+
+def test_parse_concurrency():
+    """Concurrency must be a whole number within the configured bound."""
+    assert parse_concurrency(8) == 8
+    assert parse_concurrency("8") == 8
+    for value in (0, -1, 10_000, "many", 2.5, True, None):
+        with pytest.raises(ValueError):
+            parse_concurrency(value)
+
+
+def test_invalid_concurrency_is_rejected():
+    """A backfill request with zero concurrency is answered with 400."""
+    response = TestClient(main.app).post(
+        "/backfill",
+        json={"team_id": "team-1", "since": 1, "until": 2, "concurrency": 0},
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_syncs_the_range_with_bounded_concurrency(tmp_path):
+    """Every conversation in the range is synced, a few at a time."""
+    search = FakeSearch(conversations(100, 200, 300, 400, 500, 600))
+    synced = []
+    running = 0
+    peak = 0
+
+    async def sync(conversation):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        synced.append(conversation["id"])
+
+    path = str(tmp_path / "checkpoint.json")
+    job = BackfillJob(search, sync, 200, 500, checkpoint_path=path, concurrency=2)
+    checkpoint = await job.run()
+
+    assert checkpoint.status == COMPLETED
+    assert sorted(synced) == ["1", "2", "3", "4"]
+    assert peak == 2
+    assert job.stats()["processed"] == 4
+    assert job.stats()["range_covered"] == 1.0
+
+    # A completed range is not synced again
+    rerun = BackfillJob(search, sync, 200, 500, checkpoint_path=path)
+    await rerun.load()
+    await rerun.run()
+    assert len(synced) == 4
+
+
+@pytest.mark.asyncio
+async def test_resumes_after_an_interrupted_run(tmp_path):
+    """A new run starts at the checkpoint and skips finished conversations."""
+    search = FakeSearch(conversations(100, 100, 100, 200, 300))
+    synced = []
+    outage = True
+
+    async def sync(conversation):
+        if outage and conversation["updated_at"] == 200:
+            raise CircuitOpenError("graph.messages", 30)
+        synced.append(conversation["id"])
+
+    path = str(tmp_path / "checkpoint.json")
+    job = BackfillJob(search, sync, 0, 1000, checkpoint_path=path, concurrency=1)
+    checkpoint = await job.run()
+
+    assert checkpoint.status == FAILED
+    assert checkpoint.watermark == 100
+    assert synced == ["0", "1", "2"]
+
+    outage = False
+    resumed = BackfillJob(search, sync, 0, 1000, checkpoint_path=path)
+    await resumed.load()
+    checkpoint = await resumed.run()
+
+    assert checkpoint.status == COMPLETED
+    assert synced == ["0", "1", "2", "3", "4"]
+    assert checkpoint.processed == 5
+    assert search.queries[-1]["value"][0]["value"] == 99
+
+
+@pytest.mark.asyncio
+async def test_cancelled_save_does_not_clobber_the_final_one(tmp_path):
+    """A save cancelled mid-write is followed, not overwritten, by the next."""
+    path = tmp_path / "checkpoint.json"
+    job = BackfillJob(FakeSearch([]), None, 0, 1000, checkpoint_path=str(path))
+
+    job.checkpoint.processed = 1
+    periodic = asyncio.create_task(job.save())
+    await asyncio.sleep(0)
+    periodic.cancel()
+    job.checkpoint.processed = 2
+    await job.save()
+    await asyncio.gather(periodic, return_exceptions=True)
+    await asyncio.sleep(0.05)
+
+    assert json.loads(path.read_text())["processed"] == 2
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+@pytest.mark.asyncio
+async def test_failed_conversations_are_recorded_and_skipped():
+    """A conversation that fails to sync does not stop the backfill."""
+    search = FakeSearch(conversations(100, 200, 300))
+
+    async def sync(conversation):
+        if conversation["id"] == "1":
+            raise ValueError("bad conversation")
+
+    job = BackfillJob(search, sync, 0, 1000)
+    checkpoint = await job.run()
+
+    assert checkpoint.status == COMPLETED
+    assert checkpoint.processed == 2
+    assert checkpoint.failed_ids == ["1"]
+    assert checkpoint.watermark == 300
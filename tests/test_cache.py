@@ -0,0 +1,98 @@
+"""Tests for the shared caching primitives."""
+
+import asyncio
+
+import pytest
+
+from cache import SharedJsonFile, SingleFlight, TTLCache
+
+
+def test_ttl_cache_expires_entries():
+    """Entries past their TTL are no longer returned."""
+    cache = TTLCache(max_entries=10, ttl=60)
+    cache.set("live", 1)
+    cache.set("stale", 2, ttl=0)
+
+    assert cache.get("live") == 1
+    assert "stale" not in cache
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_concurrent_calls():
+    """Concurrent callers with the same key share one call."""
+    flights = SingleFlight()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    results = await asyncio.gather(*(flights.do("key", call) for _ in range(5)))
+
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+    assert not flights.in_flight("key")
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_errors_and_allows_retry():
+    """A failed call raises for every waiter and the next call runs again."""
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(
+        flights.do("key", fail), flights.do("key", fail), return_exceptions=True
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    async def succeed():
+        return "ok"
+
+    assert await flights.do("key", succeed) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_single_flight_survives_caller_cancellation():
+    """Cancelling one waiter leaves the shared call running for the others."""
+    flights = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.02)
+        return "value"
+
+    first = asyncio.ensure_future(flights.do("key", call))
+    second = asyncio.ensure_future(flights.do("key", call))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "value"
+
+
+@pytest.mark.asyncio
+async def test_shared_json_file_keeps_concurrent_updates(tmp_path):
+    """Updates from many writers at once are all kept, with no temp files."""
+    path = str(tmp_path / "data" / "shared.json")
+
+    def add(key):
+        # A file object per writer, as each worker process would have
+        SharedJsonFile(path).update(lambda data: {**data, key: True})
+
+    await asyncio.gather(*(asyncio.to_thread(add, str(i)) for i in range(20)))
+
+    assert SharedJsonFile(path).read() == {str(i): True for i in range(20)}
+    assert not list((tmp_path / "data").glob("*.tmp"))
+
+
+def test_shared_json_file_replaces_an_unreadable_file(tmp_path):
+    """A corrupt file is read as empty by updates and rewritten."""
+    path = tmp_path / "shared.json"
+    path.write_text("{not json")
+    shared = SharedJsonFile(str(path))
+
+    shared.update(lambda data: {**data, "a": 1})
+
+    assert shared.read() == {"a": 1}
@@ -0,0 +1,51 @@
+"""Tests for optional feature availability tracking."""
+
+from capabilities import CapabilityCache
+
+
+def test_unknown_features_are_tried():
+    """A feature is probed by its first real call."""
+    assert CapabilityCache().should_try("fin_ai")
+
+
+def test_unavailable_feature_is_short_circuited_until_reprobe():
+    """After a failure calls are skipped until the re-probe is due."""
+    cache = CapabilityCache(reprobe_interval=60)
+    cache.record("fin_ai", False)
+
+    assert not cache.should_try("fin_ai")
+    assert cache.stats()["fin_ai"]["available"] is False
+
+
+def test_reprobe_lets_one_call_through():
+    """A due re-probe allows a single call while it is in flight."""
+    cache = CapabilityCache(reprobe_interval=0)
+    cache.record("fin_ai", False)
+
+    assert cache.should_try("fin_ai")
+    assert not cache.should_try("fin_ai")
+
+    cache.release("fin_ai")
+    assert cache.should_try("fin_ai")
+
+
+def test_interval_doubles_up_to_the_maximum():
+    """Repeated failures double the re-probe interval until the cap."""
+    cache = CapabilityCache(reprobe_interval=10, max_interval=35)
+    intervals = []
+    for _ in range(4):
+        cache.record("fin_ai", False)
+        intervals.append(cache._features["fin_ai"].interval)
+
+    assert intervals == [10, 20, 35, 35]
+
+
+def test_success_restores_availability():
+    """A successful probe marks the feature available again."""
+    cache = CapabilityCache(reprobe_interval=0)
+    cache.record("fin_ai", False)
+    cache.should_try("fin_ai")
+    cache.record("fin_ai", True)
+
+    assert cache.should_try("fin_ai")
+    assert cache.stats()["fin_ai"] == {"available": True, "next_probe_in": None}
@@ -0,0 +1,142 @@
+"""Tests for the per-key coalescing window."""
+
+import asyncio
+
+import pytest
+
+from coalescer import Coalescer
+
+
+class Recorder:
+    """Flush callback that records every batch."""
+
+    def __init__(self):
+        self.batches = []
+
+    async def __call__(self, key, items):
+        self.batches.append((key, list(items)))
+        return len(items)
+
+
+@pytest.mark.asyncio
+async def test_items_within_quiet_period_are_merged():
+    """A burst of items for one key is flushed as one batch."""
+    recorder = Recorder()
+    coalescer = Coalescer(recorder, quiet_period=0.02, max_delay=1.0)
+
+    futures = [coalescer.add("conv-1", index) for index in range(5)]
+    results = await asyncio.gather(*futures)
+
+    assert recorder.batches == [("conv-1", [0, 1, 2, 3, 4])]
+    assert results == [5] * 5
+
+
+@pytest.mark.asyncio
+async def test_keys_are_flushed_separately():
+    """Items for different keys never share a batch."""
+    recorder = Recorder()
+    coalescer = Coalescer(recorder, quiet_period=0.01, max_delay=1.0)
+
+    await asyncio.gather(coalescer.add("conv-1", "a"), coalescer.add("conv-2", "b"))
+
+    assert sorted(recorder.batches) == [("conv-1", ["a"]), ("conv-2", ["b"])]
+
+
+@pytest.mark.asyncio
+async def test_max_delay_bounds_waiting():
+    """A steady stream of items is flushed once the maximum delay is reached."""
+    recorder = Recorder()
+    coalescer = Coalescer(recorder, quiet_period=0.05, max_delay=0.08)
+
+    first = coalescer.add("conv-1", 0)
+    for index in range(1, 10):
+        await asyncio.sleep(0.02)
+        coalescer.add("conv-1", index)
+    await first
+
+    assert len(recorder.batches[0][1]) < 10
+    await coalescer.close()
+    assert sum(len(items) for _, items in recorder.batches) == 10
+
+
+@pytest.mark.asyncio
+async def test_flush_now_sends_pending_batch():
+    """flush_now sends the pending batch without waiting for the timer."""
+    recorder = Recorder()
+    coalescer = Coalescer(recorder, quiet_period=10, max_delay=10)
+
+    future = coalescer.add("conv-1", "a")
+    assert coalescer.pending("conv-1")
+    await coalescer.flush_now("conv-1")
+
+    assert future.result() == 1
+    assert not coalescer.pending("conv-1")
+
+
+@pytest.mark.asyncio
+async def test_flush_failure_is_propagated():
+    """Every item in a failed batch sees the flush error."""
+
+    async def failing_flush(key, items):
+        raise RuntimeError("graph unavailable")
+
+    coalescer = Coalescer(failing_flush, quiet_period=0.01, max_delay=1.0)
+    futures = [coalescer.add("conv-1", index) for index in range(3)]
+
+    results = await asyncio.gather(*futures, return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_flush_now_waits_for_a_flush_in_flight():
+    """A batch already being sent counts as pending until it is done."""
+    order = []
+
+    async def slow_flush(key, items):
+        await asyncio.sleep(0.05)
+        order.append(("replies", list(items)))
+
+    coalescer = Coalescer(slow_flush, quiet_period=0.01, max_delay=1.0)
+    coalescer.add("conv-1", "r1")
+    await asyncio.sleep(0.02)
+
+    assert coalescer.pending("conv-1")
+    await coalescer.flush_now("conv-1")
+    order.append(("closed",))
+
+    assert order == [("replies", ["r1"]), ("closed",)]
+    assert not coalescer.pending("conv-1")
+
+
+@pytest.mark.asyncio
+async def test_batches_of_one_key_are_sent_in_order():
+    """A later batch waits for the key's earlier batch to be sent."""
+    sent = []
+
+    async def flush(key, items):
+        await asyncio.sleep(0.05 if items == ["a"] else 0)
+        sent.append(items)
+
+    coalescer = Coalescer(flush, quiet_period=0.01, max_delay=1.0)
+    coalescer.add("conv-1", "a")
+    await asyncio.sleep(0.02)
+    await coalescer.add("conv-1", "b")
+
+    assert sent == [["a"], ["b"]]
+
+
+@pytest.mark.asyncio
+async def test_flush_now_raises_when_the_flush_failed():
+    """Work waiting on a failed batch fails too, so it is retried after it."""
+
+    async def failing_flush(key, items):
+        raise RuntimeError("graph unavailable")
+
+    coalescer = Coalescer(failing_flush, quiet_period=1.0, max_delay=1.0)
+    completion = coalescer.add("conv-1", "r1")
+
+    with pytest.raises(RuntimeError):
+        await coalescer.flush_now("conv-1")
+    with pytest.raises(RuntimeError):
+        await completion
@@ -0,0 +1,95 @@
+"""Tests for the email to contact ID cache."""
+
+import pytest
+
+from contact_cache import ContactIdentityCache
+
+
+def test_lookup_is_case_insensitive():
+    """Emails are normalized before lookup."""
+    cache = ContactIdentityCache()
+    cache.set("Ada@Example.com ", "contact-1")
+
+    assert cache.get("ada@example.com") == "contact-1"
+
+
+def test_invalid_emails_are_negatively_cached():
+    """Malformed and rejected emails are reported invalid without a contact."""
+    cache = ContactIdentityCache()
+    cache.mark_invalid("ghost@example.com")
+
+    assert cache.is_invalid("not-an-email")
+    assert cache.is_invalid("ghost@example.com")
+    assert cache.get("ghost@example.com") is None
+    assert not cache.is_invalid("ada@example.com")
+
+
+def test_entries_expire():
+    """Entries are dropped after their TTL."""
+    cache = ContactIdentityCache(ttl=0)
+    cache.set("ada@example.com", "contact-1")
+
+    assert cache.get("ada@example.com") is None
+
+
+@pytest.mark.asyncio
+async def test_entries_survive_a_restart(tmp_path):
+    """Saved entries, positive and negative, are loaded by a new cache."""
+    path = str(tmp_path / "data" / "contacts.json")
+    cache = ContactIdentityCache(path=path)
+    cache.set("ada@example.com", "contact-1")
+    cache.mark_invalid("ghost@example.com")
+    await cache.save()
+
+    restored = ContactIdentityCache(path=path)
+    await restored.load()
+
+    assert restored.get("ada@example.com") == "contact-1"
+    assert restored.is_invalid("ghost@example.com")
+
+
+@pytest.mark.asyncio
+async def test_unreadable_file_is_ignored(tmp_path):
+    """A corrupt cache file starts an empty cache instead of failing."""
+    path = tmp_path / "contacts.json"
+    path.write_text("{not json")
+
+    cache = ContactIdentityCache(path=str(path))
+    await cache.load()
+
+    assert cache.get("ada@example.com") is None
+
+
+@pytest.mark.asyncio
+async def test_saves_from_two_workers_are_merged(tmp_path):
+    """A worker saving its contacts keeps the ones another worker saved."""
+    path = str(tmp_path / "contacts.json")
+    first = ContactIdentityCache(path=path)
+    second = ContactIdentityCache(path=path)
+    first.set("ada@example.com", "contact-1")
+    second.set("grace@example.com", "contact-2")
+    await first.save()
+    await second.save()
+
+    restored = ContactIdentityCache(path=path)
+    await restored.load()
+
+    assert restored.get("ada@example.com") == "contact-1"
+    assert restored.get("grace@example.com") == "contact-2"
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+@pytest.mark.asyncio
+async def test_invalidated_entry_is_dropped_from_the_file(tmp_path):
+    """Forgetting an email removes it from the file on the next save."""
+    path = str(tmp_path / "contacts.json")
+    cache = ContactIdentityCache(path=path)
+    cache.set("ada@example.com", "contact-1")
+    await cache.save()
+    cache.invalidate("ada@example.com")
+    await cache.save()
+
+    restored = ContactIdentityCache(path=path)
+    await restored.load()
+
+    assert restored.get("ada@example.com") is None
@@ -0,0 +1,52 @@
+"""Tests for webhook idempotency stores and the TTL cache."""
+
+import time
+
+import pytest
+
+from cache import TTLCache
+from dedupe import InMemoryIdempotencyStore
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """The least recently used entry is evicted when the cache is full."""
+    cache = TTLCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    """Entries are not returned after their TTL."""
+    cache = TTLCache(ttl=10)
+    cache.set("a", 1)
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+
+    assert cache.get("a") is None
+    assert cache.add("a", 2)
+
+
+@pytest.mark.asyncio
+async def test_in_memory_store_detects_duplicates():
+    """A notification ID is only claimed once."""
+    store = InMemoryIdempotencyStore(ttl=60)
+
+    assert await store.claim("notif_1")
+    assert not await store.claim("notif_1")
+
+
+@pytest.mark.asyncio
+async def test_seen_does_not_claim():
+    """Checking for a duplicate leaves the ID unclaimed."""
+    store = InMemoryIdempotencyStore(ttl=60)
+
+    assert not await store.seen("notif_1")
+    assert await store.claim("notif_1")
+    assert await store.seen("notif_1")
@@ -0,0 +1,113 @@
+"""Tests for Microsoft Graph JSON batching."""
+
+import asyncio
+
+import pytest
+
+from graph_batch import GraphBatcher, GraphBatchError
+
+
+class FakeGraph:
+    """Stands in for the $batch endpoint and records every batch."""
+
+    def __init__(self, statuses=None):
+        self.batches = []
+        self.statuses = statuses or {}
+
+    async def __call__(self, payload):
+        self.batches.append(payload["requests"])
+        responses = []
+        for item in payload["requests"]:
+            status = self.statuses.get(item["url"], 200)
+            body = {"id": item["id"], "url": item["url"]}
+            headers = {}
+            if status >= 400:
+                body = {"error": {"message": "nope"}}
+                headers = {"Retry-After": "7"}
+            responses.append(
+                {"id": item["id"], "status": status, "headers": headers, "body": body}
+            )
+        return {"responses": list(reversed(responses))}
+
+
+def make_batcher(graph, window=0.01):
+    async def token():
+        return "token"
+
+    batcher = GraphBatcher(token, window=window)
+    batcher._post_batch = graph
+    return batcher
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_batch():
+    """Requests made within the window go out as one batch."""
+    graph = FakeGraph()
+    batcher = make_batcher(graph)
+
+    results = await asyncio.gather(
+        *(batcher.request("GET", f"/teams/{index}/channels") for index in range(5))
+    )
+
+    assert len(graph.batches) == 1
+    assert [result["url"] for result in results] == [
+        f"/teams/{index}/channels" for index in range(5)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batches_are_split_at_twenty():
+    """Graph's limit of 20 requests per batch is respected."""
+    graph = FakeGraph()
+    batcher = make_batcher(graph)
+
+    await asyncio.gather(*(batcher.request("GET", f"/r/{i}") for i in range(45)))
+
+    assert sorted(len(batch) for batch in graph.batches) == [5, 20, 20]
+
+
+@pytest.mark.asyncio
+async def test_item_errors_are_raised_per_caller():
+    """A failed item rejects only its own caller, with status and Retry-After."""
+    graph = FakeGraph(statuses={"/bad": 429})
+    batcher = make_batcher(graph)
+
+    good, bad = await asyncio.gather(
+        batcher.request("GET", "/good"),
+        batcher.request("GET", "/bad"),
+        return_exceptions=True,
+    )
+
+    assert good["url"] == "/good"
+    assert isinstance(bad, GraphBatchError)
+    assert bad.status == 429
+    assert bad.retry_after == 7.0
+
+
+@pytest.mark.asyncio
+async def test_batch_failure_rejects_every_caller():
+    """A failed $batch call rejects all requests it carried."""
+
+    async def failing(payload):
+        raise GraphBatchError(503, "unavailable")
+
+    batcher = make_batcher(failing)
+    results = await asyncio.gather(
+        batcher.request("GET", "/a"),
+        batcher.request("GET", "/b"),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, GraphBatchError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_close_sends_pending_requests():
+    """Closing the batcher flushes requests still inside the window."""
+    graph = FakeGraph()
+    batcher = make_batcher(graph, window=10.0)
+
+    request = batcher.submit("GET", "/pending")
+    await batcher.close()
+
+    assert (await request.future)["url"] == "/pending"
@@ -0,0 +1,339 @@
+"""Tests for GraphClient team listing, channel resolution and message reads."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from delta_links import DeltaLinkStore
+from graph_batch import GraphBatcher, GraphBatchError
+from graph_client import GraphClient
+
+
+class NotFound(Exception):
+    response_status_code = 404
+
+
+class FakeChannels(GraphClient):
+    """GraphClient with channel listing and creation served from memory."""
+
+    def __init__(self, channels=None):
+        super().__init__()
+        self._authenticated = True
+        self.channels = list(channels or [])
+        self.list_calls = 0
+        self.create_calls = 0
+        self.sent = []
+
+    async def get_team_channels(self, team_id):
+        self.list_calls += 1
+        await asyncio.sleep(0.01)
+        return list(self.channels)
+
+    async def create_channel(self, team_id, channel_name, description=""):
+        self.create_calls += 1
+        channel = {"id": f"new-{self.create_calls}", "displayName": channel_name}
+        self.channels.append(channel)
+        return channel
+
+    async def _post_channel_message(self, team_id, channel_id, body, reply_to=None):
+        raise NotFound("channel gone")
+
+
+@pytest.fixture
+def client():
+    client = FakeChannels(
+        [
+            {"id": "c1", "displayName": "Customer Support"},
+            {"id": "c2", "displayName": "Sales"},
+        ]
+    )
+    client.batcher = object()
+    return client
+
+
+@pytest.mark.asyncio
+async def test_lookups_are_cached_case_insensitively(client):
+    """Repeated lookups, in any case, cost one channel listing."""
+    first = await client.find_or_create_channel("team", "Customer Support")
+    second = await client.find_or_create_channel("team", "customer support")
+    sibling = await client.find_or_create_channel("team", "SALES")
+
+    assert first["id"] == second["id"] == "c1"
+    assert sibling["id"] == "c2"
+    assert client.list_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_create_one_channel(client):
+    """Concurrent lookups for a missing channel share one creation."""
+    results = await asyncio.gather(
+        *(client.find_or_create_channel("team", "Escalations") for _ in range(5))
+    )
+
+    assert {result["id"] for result in results} == {"new-1"}
+    assert client.list_calls == 1
+    assert client.create_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_not_found_invalidates_cached_channel(client):
+    """A 404 when posting drops the cached channel so the next lookup refetches."""
+    channel = await client.find_or_create_channel("team", "Customer Support")
+
+    with pytest.raises(NotFound):
+        await client.send_message("team", channel["id"], "hello")
+
+    await client.find_or_create_channel("team", "Customer Support")
+    assert client.list_calls == 2
+
+
+class Throttled(Exception):
+    response_status_code = 429
+    response_headers = {"Retry-After": "7"}
+
+
+class ThrottledChannel(FakeChannels):
+    async def _post_message(self, team_id, channel_id, message, message_type, reply_to):
+        raise Throttled("too many requests")
+
+
+@pytest.mark.asyncio
+async def test_throttled_post_defers_its_channel():
+    """A 429 pauses the channel's send bucket for the Retry-After."""
+    client = ThrottledChannel()
+
+    with pytest.raises(Throttled):
+        await client._send_message("team", "c1", "hi", "html")
+
+    paused_until = client.send_scheduler._channels[("team", "c1")].paused_until
+    assert paused_until > time.monotonic() + 6
+
+
+@pytest.mark.asyncio
+async def test_throttled_post_does_not_fail_later_posts_in_its_batch():
+    """Posts to one channel sharing a batch succeed or fail on their own."""
+
+    async def token():
+        return "token"
+
+    async def graph(payload):
+        first = payload["requests"][0]["id"]
+        return {
+            "responses": [
+                {"id": item["id"], "status": 429, "body": {}}
+                if item["id"] == first
+                else {"id": item["id"], "status": 201, "body": {"id": item["id"]}}
+                for item in payload["requests"]
+            ]
+        }
+
+    client = GraphClient()
+    client.batcher = GraphBatcher(token)
+    client.batcher._post_batch = graph
+
+    results = await asyncio.gather(
+        *(
+            client._post_channel_message("team", "c1", {"body": {"content": text}})
+            for text in ("one", "two", "three")
+        ),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[0], GraphBatchError) and results[0].status == 429
+    assert [result["id"] for result in results[1:]] == ["2", "3"]
+
+
+class Gone(Exception):
+    response_status_code = 410
+
+
+def message(message_id):
+    return SimpleNamespace(
+        id=message_id, body=None, created_date_time=None, from_property=None
+    )
+
+
+def page(ids, next_link=None, delta_link=None):
+    return SimpleNamespace(
+        value=[message(i) for i in ids],
+        odata_next_link=next_link,
+        odata_delta_link=delta_link,
+    )
+
+
+class FakeMessagesBuilder:
+    """Messages or delta request builder serving pages by URL."""
+
+    def __init__(self, pages, requests, url=None):
+        self.pages = pages
+        self.requests = requests
+        self.url = url
+
+    def with_url(self, url):
+        return FakeMessagesBuilder(self.pages, self.requests, url)
+
+    async def get(self, request_configuration=None):
+        top = (
+            request_configuration.query_parameters.top
+            if request_configuration
+            else None
+        )
+        self.requests.append((self.url, top))
+        response = self.pages[self.url]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def messages_client(tmp_path, pages, delta_pages=None):
+    client = GraphClient()
+    client._authenticated = True
+    client.delta_links = DeltaLinkStore(str(tmp_path / "delta_links.json"))
+    client.requests = []
+    client.delta_requests = []
+    messages = FakeMessagesBuilder(pages, client.requests)
+    messages.delta = FakeMessagesBuilder(delta_pages or {}, client.delta_requests)
+    channel = SimpleNamespace(messages=messages)
+    team = SimpleNamespace(channels=SimpleNamespace(by_channel_id=lambda _: channel))
+    client.client = SimpleNamespace(teams=SimpleNamespace(by_team_id=lambda _: team))
+    return client
+
+
+@pytest.mark.asyncio
+async def test_messages_are_read_only_up_to_the_limit(tmp_path):
+    """$top is the limit and no page past the limit is requested."""
+    client = messages_client(
+        tmp_path,
+        {
+            None: page(["m1", "m2"], next_link="page-2"),
+            "page-2": page(["m3", "m4"], next_link="page-3"),
+            "page-3": page(["m5"]),
+        },
+    )
+
+    messages = await client.get_channel_messages("team", "c1", limit=3)
+
+    assert [m["id"] for m in messages] == ["m1", "m2", "m3"]
+    assert client.requests == [(None, 3), ("page-2", None)]
+
+
+@pytest.mark.asyncio
+async def test_delta_sync_returns_only_new_messages(tmp_path):
+    """The second sync resumes from the delta link, also after a restart."""
+    delta_pages = {
+        None: page(["m1", "m2"], next_link="next-1"),
+        "next-1": page(["m3"], delta_link="delta-1"),
+        "delta-1": page(["m4"], delta_link="delta-2"),
+    }
+    client = messages_client(tmp_path, {}, delta_pages)
+
+    first, more = await client.sync_channel_messages("team", "c1")
+    assert [m["id"] for m in first] == ["m1", "m2", "m3"]
+    assert not more
+
+    restarted = messages_client(tmp_path, {}, delta_pages)
+    second, _ = await restarted.sync_channel_messages("team", "c1")
+
+    assert [m["id"] for m in second] == ["m4"]
+    assert restarted.delta_requests == [("delta-1", None)]
+    assert await restarted.delta_links.get("team/c1") == "delta-2"
+
+
+@pytest.mark.asyncio
+async def test_delta_sync_stops_early_and_resumes(tmp_path):
+    """A sync stopped at max_messages continues from the next page."""
+    client = messages_client(
+        tmp_path,
+        {},
+        {
+            None: page(["m1", "m2"], next_link="next-1"),
+            "next-1": page(["m3"], delta_link="delta-1"),
+        },
+    )
+
+    first, more = await client.sync_channel_messages("team", "c1", max_messages=2)
+    second, more_after = await client.sync_channel_messages("team", "c1")
+
+    assert [m["id"] for m in first] == ["m1", "m2"] and more
+    assert [m["id"] for m in second] == ["m3"] and not more_after
+
+
+@pytest.mark.asyncio
+async def test_expired_delta_link_resyncs(tmp_path):
+    """A delta link Graph no longer accepts is replaced by a full sync."""
+    client = messages_client(
+        tmp_path,
+        {},
+        {"stale": Gone("resync required"), None: page(["m1"], delta_link="d")},
+    )
+    await client.delta_links.set("team/c1", "stale")
+
+    messages, _ = await client.sync_channel_messages("team", "c1")
+
+    assert [m["id"] for m in messages] == ["m1"]
+    assert await client.delta_links.get("team/c1") == "d"
+
+
+def group(team_id, name):
+    return SimpleNamespace(
+        id=team_id, display_name=name, description=None, created_date_time=None
+    )
+
+
+class FakeGroupsBuilder(FakeMessagesBuilder):
+    async def get(self, request_configuration=None):
+        query = (
+            request_configuration.query_parameters if request_configuration else None
+        )
+        self.requests.append((self.url, query))
+        return self.pages[self.url]
+
+
+@pytest.mark.asyncio
+async def test_teams_are_filtered_paged_and_cached(monkeypatch):
+    """Only Teams-enabled groups are listed, across pages, and then kept."""
+    monkeypatch.setenv("USE_DEVICE_CODE_AUTH", "false")
+    client = GraphClient()
+    client._authenticated = True
+    requests = []
+    groups = FakeGroupsBuilder(
+        {
+            None: SimpleNamespace(
+                value=[group("t1", "Support")], odata_next_link="page-2"
+            ),
+            "page-2": SimpleNamespace(
+                value=[group("t2", "Sales")], odata_next_link=None
+            ),
+        },
+        requests,
+    )
+    client.client = SimpleNamespace(groups=groups)
+
+    teams = await client.get_teams()
+
+    assert [team["id"] for team in teams] == ["t1", "t2"]
+    query = requests[0][1]
+    assert query.filter == "resourceProvisioningOptions/Any(x:x eq 'Team')"
+    assert query.select == ["id", "displayName", "description", "createdDateTime"]
+    assert requests[1] == ("page-2", None)
+
+    assert (await client.find_team("sales"))["id"] == "t2"
+    assert (await client.get_team("t1"))["displayName"] == "Support"
+    assert len(requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_delta_links_are_shared_between_workers(tmp_path):
+    """Links saved by one worker are read and kept by another."""
+    path = str(tmp_path / "delta_links.json")
+    first, second = DeltaLinkStore(path), DeltaLinkStore(path)
+    assert await second.get("team/c1") is None
+
+    await first.set("team/c1", "delta-1")
+    await second.set("team/c2", "delta-2")
+
+    assert await second.get("team/c1") == "delta-1"
+    assert await first.get("team/c2") == "delta-2"
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,30 @@
+"""Tests for the health endpoints."""
+
+from fastapi.testclient import TestClient
+
+import main
+
+
+def test_liveness_needs_no_initialization():
+    """Liveness answers before the application has started up."""
+    response = TestClient(main.app).get("/health/live")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "alive"}
+
+
+def test_readiness_waits_for_the_ingest_path():
+    """Readiness fails until webhooks can be journaled."""
+    response = TestClient(main.app).get("/health/ready")
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "starting"
+
+
+def test_health_reports_degraded_services():
+    """The detailed check answers with a timestamp and service states."""
+    response = TestClient(main.app).get("/health")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "degraded"
+    assert response.json()["timestamp"]
@@ -0,0 +1,238 @@
+"""Tests for the webhook ingest journal."""
+
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+
+import main
+from config import config
+from ingest_journal import IngestJournal
+from resilience import CircuitOpenError
+
+
+@pytest_asyncio.fixture
+async def journal(tmp_path):
+    """Open a journal in a temporary directory."""
+    journal = IngestJournal(str(tmp_path / "journal.db"), max_attempts=2)
+    await journal.open()
+    yield journal
+    await journal.close()
+
+
+@pytest.mark.asyncio
+async def test_append_group_commits_in_order(journal):
+    """Concurrent appends are committed together and keep arrival order."""
+    entry_ids = await asyncio.gather(
+        *(
+            journal.append("conversation.user.replied", b'{"n": %d}' % i)
+            for i in range(50)
+        )
+    )
+
+    assert entry_ids == sorted(entry_ids)
+    entries = await journal.claim(100)
+    assert [entry.payload for entry in entries] == [b'{"n": %d}' % i for i in range(50)]
+
+
+@pytest.mark.asyncio
+async def test_claimed_entries_are_leased(journal):
+    """Claimed entries are not handed out twice until acked or failed."""
+    await journal.append("conversation.user.created", b"{}")
+
+    first = await journal.claim(10)
+    second = await journal.claim(10)
+
+    assert len(first) == 1
+    assert second == []
+
+
+@pytest.mark.asyncio
+async def test_ack_removes_entry(journal):
+    """Acked entries leave the journal."""
+    await journal.append("conversation.user.created", b"{}")
+    [entry] = await journal.claim(10)
+
+    await journal.ack(entry.id)
+
+    assert await journal.stats() == {"pending": 0, "dead": 0}
+
+
+@pytest.mark.asyncio
+async def test_failed_entry_becomes_dead_after_max_attempts(journal):
+    """Entries that keep failing are retained as dead entries."""
+    await journal.append("conversation.user.created", b"{}")
+    [entry] = await journal.claim(10)
+
+    await journal.fail(entry, "boom")
+    assert await journal.stats() == {"pending": 1, "dead": 0}
+
+    entry.attempts += 1
+    await journal.fail(entry, "boom")
+    assert await journal.stats() == {"pending": 0, "dead": 1}
+
+
+@pytest.mark.asyncio
+async def test_deferred_entry_keeps_its_attempts(journal):
+    """Retries after backpressure do not count towards max_attempts."""
+    await journal.append("conversation.user.created", b"{}")
+
+    for _ in range(3):
+        [entry] = await journal.claim(10)
+        await journal.fail(entry, "queue full", delay=0)
+
+    [entry] = await journal.claim(10)
+    assert entry.attempts == 0
+    assert await journal.stats() == {"pending": 1, "dead": 0}
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_defers_without_using_attempts(journal, monkeypatch):
+    """Events failing fast on an open circuit outlast the outage."""
+    monkeypatch.setattr(main, "ingest_journal", journal)
+    monkeypatch.setattr(config, "circuit_reset_seconds", 0)
+    await journal.append("conversation.user.created", b"{}")
+
+    for _ in range(journal.max_attempts + 1):
+        [entry] = await journal.claim(10)
+        await main.record_journal_failure(entry, CircuitOpenError("graph", 0.0))
+
+    [entry] = await journal.claim(10)
+    assert entry.attempts == 0
+
+
+@pytest.mark.asyncio
+async def test_entries_survive_reopen(tmp_path):
+    """Unprocessed entries are still available after a restart."""
+    path = str(tmp_path / "journal.db")
+    journal = IngestJournal(path)
+    await journal.open()
+    await journal.append("conversation.admin.closed", b'{"id": "1"}')
+    await journal.claim(10)
+    await journal.close()
+
+    reopened = IngestJournal(path)
+    await reopened.open()
+    entries = await reopened.claim(10)
+    await reopened.close()
+
+    assert [entry.topic for entry in entries] == ["conversation.admin.closed"]
+
+
+@pytest.mark.asyncio
+async def test_consume_waits_while_paused(journal):
+    """No entries are claimed while the pause check returns True."""
+    await journal.append("conversation.user.replied", b"{}")
+    paused = True
+    seen = []
+
+    async def dispatch(entry):
+        seen.append(entry.id)
+        await journal.ack(entry.id)
+
+    consumer = asyncio.ensure_future(
+        journal.consume(dispatch, poll_interval=0.01, paused=lambda: paused)
+    )
+    await asyncio.sleep(0.05)
+    assert seen == []
+
+    paused = False
+    await asyncio.sleep(0.05)
+    consumer.cancel()
+    await asyncio.gather(consumer, return_exceptions=True)
+    assert len(seen) == 1
+
+
+@pytest.mark.asyncio
+async def test_leases_are_renewed_while_processing_outlasts_them(tmp_path):
+    """Entries queued or running longer than the lease are not claimed again."""
+    path = str(tmp_path / "journal.db")
+    journal = IngestJournal(path, lease_seconds=0.15)
+    other = IngestJournal(path, lease_seconds=0.15)
+    other.owner = "other-worker"
+    await journal.open()
+    await other.open()
+    await journal.append("conversation.user.replied", b"{}")
+    processed = []
+
+    async def dispatch(entry):
+        # Slower than the lease, like a post waiting on a throttled channel
+        await asyncio.sleep(0.5)
+        assert journal.holds(entry)
+        processed.append(entry.id)
+        await journal.ack(entry.id)
+
+    consumer = asyncio.ensure_future(journal.consume(dispatch, poll_interval=0.01))
+    await asyncio.sleep(0.3)
+    stolen = await other.claim(10)
+    await asyncio.sleep(0.3)
+    consumer.cancel()
+    await asyncio.gather(consumer, return_exceptions=True)
+    await other.close()
+    await journal.close()
+
+    assert stolen == []
+    assert len(processed) == 1
+
+
+@pytest_asyncio.fixture
+async def workers(tmp_path):
+    """Two journals on one file, as two worker processes would open it."""
+    path = str(tmp_path / "journal.db")
+    first, second = IngestJournal(path), IngestJournal(path)
+    second.owner = "other-worker"
+    await first.open()
+    await second.open()
+    yield first, second
+    await second.close()
+    await first.close()
+
+
+@pytest.mark.asyncio
+async def test_one_key_is_never_held_by_two_processes(workers):
+    """Later events for a key leased elsewhere wait until it is settled."""
+    first, second = workers
+    await first.append("conversation.user.replied", b"1", "conversation:1")
+    claimed = await first.claim(10)
+    await second.append("conversation.admin.closed", b"2", "conversation:1")
+    await second.append("contact.user.created", b"3", "contact:7")
+
+    assert [entry.payload for entry in await second.claim(10)] == [b"3"]
+
+    await first.ack(claimed[0].id)
+    assert [entry.payload for entry in await second.claim(10)] == [b"2"]
+
+
+@pytest.mark.asyncio
+async def test_failed_entry_is_not_overtaken(workers, monkeypatch):
+    """Events after a failed one wait for its retry, in every process."""
+    first, second = workers
+    for payload in (b"replied", b"closed"):
+        await first.append("conversation.user.replied", payload, "conversation:1")
+    replied, closed = await first.claim(10)
+
+    await first.fail(replied, "graph unavailable")
+
+    assert not first.holds(closed)
+    assert await second.claim(10) == []
+
+    # Once the backoff has passed both go to one process, failed entry first
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 600)
+    retried = await second.claim(10)
+    assert [entry.payload for entry in retried] == [b"replied", b"closed"]
+
+
+@pytest.mark.asyncio
+async def test_redelivered_notification_is_not_journaled_twice(journal):
+    """A notification ID still in the journal is rejected in the same commit."""
+    first, redelivered, other = await asyncio.gather(
+        journal.append("conversation.user.replied", b"{}", "c:1", "notif_1"),
+        journal.append("conversation.user.replied", b"{}", "c:1", "notif_1"),
+        journal.append("conversation.user.replied", b"{}", "c:1", "notif_2"),
+    )
+
+    assert first is not None and other is not None
+    assert redelivered is None
+    assert await journal.stats() == {"pending": 2, "dead": 0}
@@ -0,0 +1,267 @@
+"""Tests for the pooled Intercom client."""
+
+import asyncio
+
+import msgspec
+import pytest
+
+from config import config
+from intercom_client import IntercomAPIError, IntercomClient, next_cursor
+
+
+@pytest.mark.asyncio
+async def test_open_reuses_the_pooled_session():
+    """Opening an open client keeps its session and connection pool."""
+    client = await IntercomClient().open()
+    session = client.session
+    try:
+        assert (await client.open()).session is session
+        assert session.connector.limit > 0
+        assert session.timeout.total is not None
+    finally:
+        await client.close()
+
+    assert client.session is None
+    assert session.closed
+
+
+@pytest.mark.asyncio
+async def test_requests_need_an_open_client():
+    """Requests on a closed client fail instead of opening ad-hoc sessions."""
+    with pytest.raises(Exception, match="not initialized"):
+        await IntercomClient()._make_request("GET", "/conversations")
+
+
+class FakeResponses(IntercomClient):
+    """IntercomClient whose HTTP layer replays scripted responses."""
+
+    def __init__(self, *responses):
+        super().__init__()
+        self.responses = list(responses)
+        self.requests = []
+
+    async def _request(
+        self, method, endpoint, data=None, timeout=None, headers=None, raw=False
+    ):
+        self.requests.append(headers or {})
+        status, response_headers, body = self.responses.pop(0)
+        if raw and body is not None:
+            body = msgspec.json.encode(body)
+        return status, response_headers, body
+
+
+@pytest.mark.asyncio
+async def test_not_modified_is_served_from_cache():
+    """A 304 revalidation returns the cached body."""
+    body = {"id": "1", "updated_at": 100}
+    client = FakeResponses(
+        (200, {"ETag": '"v1"'}, body),
+        (304, {}, None),
+    )
+
+    assert await client.get_conversation("1") == body
+    assert await client.get_conversation("1") == body
+    assert client.requests[1]["If-None-Match"] == '"v1"'
+    assert "If-Modified-Since" in client.requests[1]
+
+
+@pytest.mark.asyncio
+async def test_webhook_not_newer_than_cache_skips_the_network():
+    """An update time no newer than the cached copy needs no request."""
+    client = FakeResponses(
+        (200, {}, {"id": "1", "updated_at": 100}),
+        (200, {}, {"id": "1", "updated_at": 200}),
+    )
+
+    await client.get_conversation("1")
+    assert (await client.get_conversation("1", updated_at=100))["updated_at"] == 100
+    assert len(client.requests) == 1
+
+    assert (await client.get_conversation("1", updated_at=150))["updated_at"] == 200
+    assert len(client.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_conversation_model_decodes_parts_on_access():
+    """The typed conversation shares the cache and decodes parts lazily."""
+    parts = [{"id": "p1", "body": "first"}, {"id": "p2", "body": "second"}]
+    body = {
+        "id": "1",
+        "updated_at": 100,
+        "source": {"author": {"name": "Ada"}},
+        "conversation_parts": {"conversation_parts": parts, "total_count": 2},
+        "statistics": {"count_reopens": 0},
+    }
+    client = FakeResponses((200, {}, body))
+
+    conversation = await client.get_conversation_model("1")
+    assert conversation.source.author.name == "Ada"
+    assert [part.body for part in conversation.parts()] == ["first", "second"]
+
+    assert await client.get_conversation("1", updated_at=100) == body
+    assert [part.id for part in await client.get_conversation_parts("1", 100)] == [
+        "p1",
+        "p2",
+    ]
+    assert len(client.requests) == 1
+
+
+class FakeResponse:
+    def __init__(self, status, headers=None, body=None):
+        self.status = status
+        self.headers = headers or {}
+        self.body = body or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self):
+        return self.body
+
+
+class FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_request_is_retried_after_delay():
+    """A 429 defers the scheduler for Retry-After and retries the request."""
+    client = IntercomClient()
+    client.session = FakeSession(
+        FakeResponse(429, {"Retry-After": "0.01"}),
+        FakeResponse(200, {"X-RateLimit-Remaining": "42"}, {"ok": True}),
+    )
+
+    assert await client._make_request("GET", "/conversations") == {"ok": True}
+    assert client.scheduler.remaining == 42
+
+
+@pytest.mark.asyncio
+async def test_exhausted_rate_limit_retries_are_not_retried_again(monkeypatch):
+    """Once _send gives up on 429s the error is raised, not retried again."""
+    monkeypatch.setattr(config, "intercom_rate_limit_max_retries", 1)
+    client = IntercomClient()
+    client.session = FakeSession(
+        *(FakeResponse(429, {"Retry-After": "0.01"}) for _ in range(6))
+    )
+
+    with pytest.raises(IntercomAPIError) as error:
+        await client._make_request("GET", "/conversations")
+
+    assert error.value.status == 429
+    assert client.session.calls == 2
+    assert not client.resilience.is_open("intercom.conversations")
+
+
+@pytest.mark.asyncio
+async def test_errors_carry_the_http_status():
+    """API errors are raised as IntercomAPIError with their status."""
+    client = IntercomClient()
+    client.session = FakeSession(
+        FakeResponse(404, body={"errors": [{"message": "Not Found"}]})
+    )
+
+    with pytest.raises(IntercomAPIError) as error:
+        await client._make_request("GET", "/conversations/1")
+
+    assert error.value.status == 404
+    assert str(error.value) == "Intercom API error: Not Found"
+
+
+class FakePages(IntercomClient):
+    """IntercomClient serving conversation pages from memory."""
+
+    def __init__(self, pages):
+        super().__init__()
+        self.pages = pages
+        self.fetched = []
+
+    async def get_conversations_page(self, per_page=50, starting_after=None):
+        self.fetched.append(starting_after)
+        index = int(starting_after or 0)
+        cursor = str(index + 1) if index + 1 < len(self.pages) else None
+        return self.pages[index], cursor
+
+
+@pytest.mark.asyncio
+async def test_iter_conversations_follows_cursors_with_prefetch():
+    """Pages are followed to the end and the next page is fetched early."""
+    client = FakePages([[{"id": 1}, {"id": 2}], [{"id": 3}], [{"id": 4}]])
+
+    iterator = client.iter_conversations()
+    assert (await iterator.__anext__())["id"] == 1
+    await asyncio.sleep(0)
+    assert client.fetched == [None, "1"]
+
+    rest = [conversation["id"] async for conversation in iterator]
+    assert rest == [2, 3, 4]
+    assert client.fetched == [None, "1", "2"]
+
+
+@pytest.mark.asyncio
+async def test_iter_conversations_stops_at_limit():
+    """No pages beyond the limit are requested."""
+    client = FakePages([[{"id": 1}, {"id": 2}], [{"id": 3}], [{"id": 4}]])
+
+    ids = [
+        conversation["id"] async for conversation in client.iter_conversations(limit=2)
+    ]
+
+    assert ids == [1, 2]
+    assert client.fetched == [None]
+
+
+def test_next_cursor_reads_both_page_formats():
+    """The next cursor is read from an object or from a next-page URL."""
+    assert next_cursor({"pages": {"next": {"starting_after": "abc"}}}) == "abc"
+    assert (
+        next_cursor({"pages": {"next": "https://x/?per_page=5&starting_after=d"}})
+        == "d"
+    )
+    assert next_cursor({"pages": {}}) is None
+
+
+@pytest.mark.asyncio
+async def test_fin_ai_is_skipped_after_workspace_lacks_access():
+    """A 404 from the suggest endpoint stops further FIN AI requests."""
+    client = IntercomClient()
+    client.session = FakeSession(
+        FakeResponse(404, body={"errors": [{"message": "Not Found"}]})
+    )
+
+    assert await client.trigger_fin_ai_response("1", "help") is None
+    assert await client.trigger_fin_ai_response("1", "help") is None
+    assert client.session.calls == 1
+    assert client.capabilities.stats()["fin_ai"]["available"] is False
+
+
+@pytest.mark.asyncio
+async def test_cancelled_fin_ai_probe_is_released():
+    """Cancelling a FIN AI re-probe lets a later call probe again."""
+    started = asyncio.Event()
+
+    class HangingClient(IntercomClient):
+        async def _make_request(self, method, endpoint, data=None, **kwargs):
+            started.set()
+            await asyncio.sleep(3600)
+
+    client = HangingClient()
+    client.capabilities.reprobe_interval = 0
+    client.capabilities.record("fin_ai", False)
+
+    probe = asyncio.create_task(client.trigger_fin_ai_response("1", "hello"))
+    await started.wait()
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    assert client.capabilities.should_try("fin_ai")
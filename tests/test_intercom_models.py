@@ -0,0 +1,124 @@
+"""Tests for typed Intercom webhook decoding."""
+
+import json
+
+import msgspec
+import pytest
+
+from intercom_models import (
+    ContactEvent,
+    ConversationEvent,
+    decode_contact,
+    decode_conversation,
+    decode_envelope,
+    decode_event,
+)
+from webhook_handler import ordering_key
+
+
+def _payload(topic, item):
+    return json.dumps(
+        {
+            "type": "notification_event",
+            "id": "notif_1",
+            "topic": topic,
+            "delivery_attempts": 2,
+            "app_id": "abc",
+            "data": {"type": "notification_event_data", "item": item},
+        }
+    ).encode("utf-8")
+
+
+def test_decode_envelope_reads_notification_fields():
+    """The envelope exposes topic, notification ID and delivery attempts."""
+    envelope = decode_envelope(_payload("conversation.user.created", {}))
+
+    assert envelope.topic == "conversation.user.created"
+    assert envelope.id == "notif_1"
+    assert envelope.delivery_attempts == 2
+
+
+def test_envelope_has_the_same_ordering_key_as_the_event():
+    """The ingest route journals events under the key the workers use."""
+    payload = _payload(
+        "conversation.admin.closed", {"type": "conversation", "id": "123"}
+    )
+
+    key = ordering_key(decode_envelope(payload))
+
+    assert key == ordering_key(decode_event("conversation.admin.closed", payload))
+    assert key == "conversation:123"
+
+
+def test_decode_conversation_event_ignores_unknown_fields():
+    """Conversation webhooks decode into a trimmed typed event."""
+    item = {
+        "type": "conversation",
+        "id": "123",
+        "updated_at": 1700000000,
+        "assignee": {"type": "admin", "id": "9", "name": "Ada"},
+        "statistics": {"time_to_admin_reply": 95},
+    }
+
+    event = decode_event(
+        "conversation.admin.assigned", _payload("conversation.admin.assigned", item)
+    )
+
+    assert isinstance(event, ConversationEvent)
+    assert event.data.item.id == "123"
+    assert event.data.item.assignee.name == "Ada"
+    assert not hasattr(event.data.item, "statistics")
+
+
+def test_decode_contact_event():
+    """Contact and visitor webhooks share the contact schema."""
+    item = {"type": "contact", "id": "c1", "name": None, "email": "a@example.com"}
+
+    event = decode_event("visitor.signed_up", _payload("visitor.signed_up", item))
+
+    assert isinstance(event, ContactEvent)
+    assert event.data.item.name is None
+    assert event.data.item.email == "a@example.com"
+
+
+def test_decode_event_rejects_unknown_family():
+    """Topics without a schema cannot be decoded."""
+    with pytest.raises(ValueError):
+        decode_event("ticket.created", _payload("ticket.created", {}))
+
+
+def test_decode_event_rejects_invalid_json():
+    """Malformed bodies raise a decode error."""
+    with pytest.raises(msgspec.DecodeError):
+        decode_event("conversation.user.created", b"{not json")
+
+
+def test_conversation_parts_stay_raw_until_accessed():
+    """A decoded conversation keeps its parts as raw JSON until parts()."""
+    payload = json.dumps(
+        {
+            "type": "conversation",
+            "id": "1",
+            "updated_at": 100,
+            "assignee": {"type": "admin", "id": "7"},
+            "conversation_parts": {
+                "conversation_parts": [{"id": "p1", "part_type": "comment"}]
+            },
+        }
+    ).encode("utf-8")
+
+    conversation = decode_conversation(payload)
+
+    assert isinstance(conversation.conversation_parts, msgspec.Raw)
+    assert conversation.assignee.id == "7"
+    assert [part.id for part in conversation.parts()] == ["p1"]
+    assert decode_conversation(b'{"id": "2", "conversation_parts": null}').parts() == []
+
+
+def test_decode_contact():
+    """Contacts keep their identity fields."""
+    contact = decode_contact(
+        b'{"type": "contact", "id": "c1", "role": "user", "email": "a@b.c"}'
+    )
+
+    assert (contact.id, contact.role, contact.email) == ("c1", "user", "a@b.c")
@@ -0,0 +1,87 @@
+"""Tests for the priority-aware rate-limit scheduler."""
+
+import asyncio
+import time
+
+import pytest
+
+from rate_limiter import RateLimitScheduler, request_priority, retry_delay
+
+
+@pytest.mark.asyncio
+async def test_tokens_are_granted_within_budget():
+    """Requests within the burst capacity do not wait."""
+    scheduler = RateLimitScheduler(rate=1, capacity=5, bulk_reserve=0)
+
+    await asyncio.wait_for(
+        asyncio.gather(*(scheduler.acquire() for _ in range(5))), 0.1
+    )
+
+    assert scheduler.stats()["tokens"] < 1
+
+
+@pytest.mark.asyncio
+async def test_interactive_requests_use_the_reserve():
+    """Bulk requests stop at the reserve while interactive ones proceed."""
+    scheduler = RateLimitScheduler(rate=0.001, capacity=10, bulk_reserve=0.5)
+
+    for _ in range(5):
+        await scheduler.acquire(priority=0)
+    bulk = asyncio.ensure_future(scheduler.acquire(priority=0))
+    await asyncio.wait_for(scheduler.acquire(priority=100), 0.1)
+
+    await asyncio.sleep(0)
+    assert not bulk.done()
+    bulk.cancel()
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_served_by_priority():
+    """When tokens return, higher priorities are served first."""
+    scheduler = RateLimitScheduler(rate=100, capacity=1, bulk_reserve=0)
+    await scheduler.acquire()
+    order = []
+
+    async def acquire(name, priority):
+        await scheduler.acquire(priority)
+        order.append(name)
+
+    await asyncio.gather(acquire("bulk", 1), acquire("webhook", 100))
+
+    assert order == ["webhook", "bulk"]
+
+
+@pytest.mark.asyncio
+async def test_priority_defaults_to_context():
+    """Without an explicit priority the task's request_priority is used."""
+    scheduler = RateLimitScheduler(rate=100, capacity=1, bulk_reserve=0)
+    await scheduler.acquire()
+    order = []
+
+    async def acquire(name, priority):
+        request_priority.set(priority)
+        await scheduler.acquire()
+        order.append(name)
+
+    await asyncio.gather(acquire("bulk", 0), acquire("webhook", 50))
+
+    assert order == ["webhook", "bulk"]
+
+
+@pytest.mark.asyncio
+async def test_exhausted_budget_pauses_until_reset():
+    """A reported remaining budget of zero pauses until the window resets."""
+    scheduler = RateLimitScheduler(rate=1000, capacity=100, bulk_reserve=0)
+    scheduler.update(limit=100, remaining=0, reset_at=time.time() + 0.05)
+
+    started = time.monotonic()
+    await scheduler.acquire()
+
+    assert time.monotonic() - started >= 0.04
+
+
+def test_retry_delay_prefers_retry_after():
+    """Retry-After wins, then X-RateLimit-Reset, then the default."""
+    assert retry_delay({"Retry-After": "3"}) == 3.0
+    assert 9 < retry_delay({"X-RateLimit-Reset": str(time.time() + 10)}) <= 10
+    assert retry_delay({}, default=2.0) == 2.0
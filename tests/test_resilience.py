@@ -0,0 +1,138 @@
+"""Tests for retries and circuit breakers."""
+
+import asyncio
+
+import pytest
+
+from resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    Resilience,
+    backoff_delay,
+    is_rejected,
+    is_transient,
+)
+
+
+class HTTPError(Exception):
+    def __init__(self, status, retry_after=None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class Flaky:
+    """Operation that fails a number of times before succeeding."""
+
+    def __init__(self, failures, error=None):
+        self.failures = failures
+        self.error = error or ConnectionError("reset")
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return "ok"
+
+
+def fast_policy(**kwargs):
+    return Resilience(backoff_base=0.001, backoff_max=0.002, **kwargs)
+
+
+def test_error_classification():
+    """Outages are transient, bad requests are not, and only refusals are rejected."""
+    assert is_transient(ConnectionError())
+    assert is_transient(asyncio.TimeoutError())
+    assert is_transient(HTTPError(503))
+    assert not is_transient(HTTPError(404))
+    assert is_rejected(HTTPError(429))
+    assert not is_rejected(HTTPError(500))
+
+
+def test_backoff_is_capped():
+    """Delays grow exponentially but never exceed the cap."""
+    assert all(0 <= backoff_delay(10, 0.1, 2.0) <= 2.0 for _ in range(100))
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried():
+    """A call that recovers within the attempt budget succeeds."""
+    operation = Flaky(2)
+
+    assert await fast_policy(max_attempts=3).call("api", operation) == "ok"
+    assert operation.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_unsafe_failures_are_not_retried():
+    """Failures that are not retry-safe are raised after one attempt."""
+    operation = Flaky(1, HTTPError(500))
+
+    with pytest.raises(HTTPError):
+        await fast_policy().call("api", operation, retry_safe=is_rejected)
+    assert operation.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_and_fails_fast():
+    """After the threshold the circuit opens and calls are rejected."""
+    policy = fast_policy(max_attempts=1, failure_threshold=2, reset_timeout=60)
+    operation = Flaky(10)
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await policy.call("api", operation)
+
+    with pytest.raises(CircuitOpenError):
+        await policy.call("api", operation)
+    assert operation.calls == 2
+    assert policy.is_open("api")
+    assert policy.open_circuits() == ["api"]
+
+
+@pytest.mark.asyncio
+async def test_client_errors_do_not_open_the_circuit():
+    """A 4xx means the endpoint is up, so it never trips the breaker."""
+    policy = fast_policy(max_attempts=1, failure_threshold=1)
+
+    with pytest.raises(HTTPError):
+        await policy.call("api", Flaky(1, HTTPError(400)))
+
+    assert policy.breaker("api").state == CLOSED
+
+
+def test_half_open_allows_one_probe():
+    """After the reset timeout one probe runs, and its result decides the state."""
+    breaker = CircuitBreaker("api", failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == HALF_OPEN
+
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_failure()
+    breaker.reset_timeout = 60
+    assert breaker.state == OPEN
+
+    breaker.reset_timeout = 0
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_throttling_does_not_open_the_circuit():
+    """A 429 means the endpoint is up but busy, so it never trips the breaker."""
+    policy = fast_policy(max_attempts=2, failure_threshold=1)
+    operation = Flaky(10, HTTPError(429))
+
+    with pytest.raises(HTTPError):
+        await policy.call("graph.messages", operation, retry_safe=is_rejected)
+
+    assert operation.calls == 2
+    assert not policy.is_open("graph.messages")
@@ -0,0 +1,87 @@
+"""Tests for the Teams channel send scheduler."""
+
+import asyncio
+import time
+
+import pytest
+
+from send_scheduler import ChannelSendScheduler, SendQueueFull
+
+
+@pytest.mark.asyncio
+async def test_channel_burst_then_paced():
+    """A channel sends its burst at once, then at the channel rate."""
+    scheduler = ChannelSendScheduler(channel_rate=20, channel_burst=2)
+    start = time.monotonic()
+
+    waits = await asyncio.gather(*(scheduler.acquire("a") for _ in range(4)))
+
+    assert waits[0] < 0.01 and waits[1] < 0.01
+    assert time.monotonic() - start >= 0.09
+    assert scheduler.stats()["sent"] == 4
+
+
+@pytest.mark.asyncio
+async def test_busy_channel_does_not_starve_others():
+    """Channels with queued posts take turns for the global budget."""
+    scheduler = ChannelSendScheduler(
+        channel_rate=1000, channel_burst=1000, global_rate=100, global_burst=1
+    )
+    order = []
+
+    async def post(channel, index):
+        await scheduler.acquire(channel)
+        order.append((channel, index))
+
+    noisy = [asyncio.create_task(post("noisy", i)) for i in range(10)]
+    await asyncio.sleep(0)
+    quiet = asyncio.create_task(post("quiet", 0))
+    await asyncio.gather(*noisy, quiet)
+
+    assert order.index(("quiet", 0)) <= 2
+
+
+@pytest.mark.asyncio
+async def test_retry_after_pauses_only_its_channel():
+    """A throttled channel waits out Retry-After while others keep sending."""
+    scheduler = ChannelSendScheduler(channel_rate=100, channel_burst=5)
+    scheduler.defer(0.2, "throttled")
+
+    throttled = asyncio.create_task(scheduler.acquire("throttled"))
+    assert await asyncio.wait_for(scheduler.acquire("other"), 0.05) < 0.01
+    assert not throttled.done()
+
+    assert await throttled >= 0.15
+    assert scheduler.stats()["wait_ms"]["max"] >= 150
+
+
+@pytest.mark.asyncio
+async def test_burst_on_one_channel_is_refused_beyond_max_wait():
+    """Posts past the queue bound fail fast instead of waiting out a timeout."""
+    scheduler = ChannelSendScheduler(channel_rate=20, channel_burst=2, max_wait=0.2)
+
+    results = await asyncio.gather(
+        *(scheduler.acquire("support") for _ in range(20)), return_exceptions=True
+    )
+
+    waits = [result for result in results if isinstance(result, float)]
+    refused = [result for result in results if isinstance(result, SendQueueFull)]
+    assert len(waits) + len(refused) == 20
+    assert 4 <= len(waits) <= 7
+    assert max(waits) <= 0.25
+    assert all(error.retry_after > 0 for error in refused)
+    assert scheduler.stats()["refused"] == len(refused)
+
+
+@pytest.mark.asyncio
+async def test_throttling_on_two_channels_pauses_all():
+    """A second throttled channel is taken as the tenant-wide limit."""
+    scheduler = ChannelSendScheduler(channel_rate=100, channel_burst=5)
+    scheduler.defer(0.2, "a")
+    assert await asyncio.wait_for(scheduler.acquire("c"), 0.05) < 0.01
+
+    scheduler.defer(0.2, "b")
+
+    assert scheduler.stats()["paused_for"] > 0.1
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(scheduler.acquire("c"), 0.05)
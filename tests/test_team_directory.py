@@ -0,0 +1,76 @@
+"""Tests for the in-memory team directory."""
+
+import asyncio
+
+import pytest
+
+from team_directory import TeamDirectory
+
+
+class Loader:
+    """Team listing that counts loads and can fail on demand."""
+
+    def __init__(self, *lists):
+        self.lists = list(lists)
+        self.calls = 0
+        self.fail = False
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("graph unavailable")
+        return self.lists[min(self.calls, len(self.lists)) - 1]
+
+
+SUPPORT = {"id": "t1", "displayName": "Customer Support"}
+SALES = {"id": "t2", "displayName": "Sales"}
+
+
+@pytest.mark.asyncio
+async def test_lookups_share_one_load():
+    """Concurrent lookups by ID and name cost a single listing."""
+    loader = Loader([SUPPORT, SALES])
+    directory = TeamDirectory(loader)
+
+    by_id, by_name, teams = await asyncio.gather(
+        directory.get("t2"), directory.find("customer support"), directory.teams()
+    )
+
+    assert by_id == SALES
+    assert by_name == SUPPORT
+    assert len(teams) == 2
+    assert await directory.get("missing") is None
+    assert loader.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_directory_is_served_while_refreshing():
+    """An expired list is returned at once and replaced in the background."""
+    loader = Loader([SUPPORT], [SUPPORT, SALES])
+    directory = TeamDirectory(loader, ttl=0)
+    await directory.teams()
+
+    stale = await directory.teams()
+    assert stale == [SUPPORT]
+
+    await asyncio.sleep(0.05)
+    assert await directory.find("SALES") == SALES
+    assert loader.calls == 2
+    await directory.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_the_cached_list():
+    """A refresh failure keeps the old list and is retried after an interval."""
+    loader = Loader([SUPPORT])
+    directory = TeamDirectory(loader, ttl=0, retry_interval=60)
+    await directory.teams()
+    loader.fail = True
+
+    await directory.teams()
+    await asyncio.sleep(0.05)
+    assert await directory.get("t1") == SUPPORT
+    await asyncio.sleep(0.05)
+
+    assert loader.calls == 2
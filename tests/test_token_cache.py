@@ -0,0 +1,128 @@
+"""Tests for the Graph token cache shared between workers."""
+
+import asyncio
+import time
+
+import pytest
+from azure.core.credentials import AccessToken
+
+from token_cache import (
+    FileTokenStore,
+    RedisTokenStore,
+    SharedTokenCredential,
+    token_cache_key,
+)
+
+
+class CountingCredential:
+    """Credential stub that issues numbered tokens."""
+
+    def __init__(self, lifetime=3600, delay=0.01):
+        self.lifetime = lifetime
+        self.delay = delay
+        self.calls = 0
+
+    async def get_token(self, *scopes, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return AccessToken(f"token-{self.calls}", int(time.time()) + self.lifetime)
+
+    async def close(self):
+        pass
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio for the token store."""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, nx=False, ex=None, px=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    async def eval(self, script, numkeys, key, owner):
+        if self.values.get(key) == owner:
+            del self.values[key]
+
+
+SCOPE = "https://graph.microsoft.com/.default"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["file", "redis"])
+async def test_workers_share_one_token(tmp_path, backend):
+    """Concurrent workers on a cold cache make a single token request."""
+    credential = CountingCredential()
+    if backend == "file":
+        store = FileTokenStore(str(tmp_path / "tokens.json"))
+    else:
+        store = RedisTokenStore(FakeRedis())
+    workers = [SharedTokenCredential(credential, store, "tenant:app") for _ in range(4)]
+
+    tokens = await asyncio.gather(
+        *(worker.get_token(SCOPE) for worker in workers for _ in range(5))
+    )
+
+    assert credential.calls == 1
+    assert {token.token for token in tokens} == {"token-1"}
+
+
+@pytest.mark.asyncio
+async def test_token_survives_a_restart(tmp_path):
+    """A new process reuses the token saved by the previous one."""
+    path = str(tmp_path / "tokens.json")
+    credential = CountingCredential()
+    await SharedTokenCredential(credential, FileTokenStore(path), "t:a").get_token(
+        SCOPE
+    )
+
+    restarted = SharedTokenCredential(credential, FileTokenStore(path), "t:a")
+    assert (await restarted.get_token(SCOPE)).token == "token-1"
+    assert credential.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_token_is_refreshed_before_expiry(tmp_path):
+    """A token inside the refresh margin is replaced while still valid."""
+    credential = CountingCredential(lifetime=100)
+    shared = SharedTokenCredential(
+        credential, FileTokenStore(str(tmp_path / "t.json")), "t:a", refresh_margin=300
+    )
+
+    assert (await shared.get_token(SCOPE)).token == "token-1"
+    assert (await shared.get_token(SCOPE)).token == "token-2"
+
+
+@pytest.mark.asyncio
+async def test_current_token_is_used_while_another_worker_refreshes():
+    """Workers that lose the refresh lock keep using the unexpired token."""
+    redis = FakeRedis()
+    store = RedisTokenStore(redis)
+    credential = CountingCredential(lifetime=100)
+    worker = SharedTokenCredential(credential, store, "t:a", refresh_margin=300)
+    first = await worker.get_token(SCOPE)
+
+    async with store.refresh_lock(token_cache_key("t:a", (SCOPE,))) as refresher:
+        assert refresher
+        assert (await worker.get_token(SCOPE)).token == first.token
+    assert credential.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_claims_challenges_bypass_the_cache(tmp_path):
+    """Requests with claims always reach Azure AD."""
+    credential = CountingCredential()
+    shared = SharedTokenCredential(
+        credential, FileTokenStore(str(tmp_path / "t.json")), "t:a"
+    )
+
+    await shared.get_token(SCOPE)
+    await shared.get_token(SCOPE, claims='{"access_token": {}}')
+
+    assert credential.calls == 2
@@ -0,0 +1,110 @@
+"""Tests for the webhook topic dispatch registry."""
+
+import asyncio
+
+import pytest
+
+from topic_registry import TopicRegistry
+
+
+async def _handler(data):
+    return {"status": "success", "data": data}
+
+
+def test_exact_topic_wins_over_wildcard():
+    """Exact registrations take precedence over wildcard families."""
+    registry = TopicRegistry()
+    family = registry.register("contact.*", _handler)
+    exact = registry.register("contact.lead.created", _handler)
+
+    assert registry.resolve("contact.lead.created") is exact
+    assert registry.resolve("contact.user.created") is family
+
+
+def test_longest_wildcard_family_wins():
+    """More specific wildcard families take precedence."""
+    registry = TopicRegistry()
+    registry.register("contact.*", _handler)
+    lead = registry.register("contact.lead.*", _handler)
+
+    assert registry.resolve("contact.lead.signed_up") is lead
+
+
+def test_unregistered_topic_is_not_contained():
+    """Topics without a matching route are rejected."""
+    registry = TopicRegistry()
+    registry.register("conversation.user.created", _handler)
+
+    assert "conversation.user.created" in registry
+    assert "conversation.admin.snoozed" not in registry
+
+
+def test_invalid_pattern_is_rejected():
+    """Only trailing wildcard families are supported."""
+    registry = TopicRegistry()
+
+    with pytest.raises(ValueError):
+        registry.register("contact.*.created", _handler)
+
+
+@pytest.mark.asyncio
+async def test_dispatch_enforces_concurrency_limit():
+    """A route never runs more handlers at once than its limit."""
+    running = 0
+    peak = 0
+
+    async def slow_handler(data):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {}
+
+    registry = TopicRegistry()
+    route = registry.register("conversation.admin.closed", slow_handler, concurrency=2)
+
+    await asyncio.gather(*(route.dispatch({}) for _ in range(6)))
+
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_dispatch_enforces_timeout():
+    """Handlers exceeding the route timeout are cancelled."""
+
+    async def hanging_handler(data):
+        await asyncio.sleep(1)
+
+    registry = TopicRegistry()
+    route = registry.register(
+        "conversation.admin.closed", hanging_handler, timeout=0.01
+    )
+
+    with pytest.raises(asyncio.TimeoutError):
+        await route.dispatch({})
+
+
+@pytest.mark.asyncio
+async def test_deferred_work_shares_the_route_limits():
+    """Work run for a route counts against its concurrency limit and timeout."""
+    release = asyncio.Event()
+
+    async def handler(data):
+        await release.wait()
+        return {}
+
+    registry = TopicRegistry()
+    route = registry.register(
+        "conversation.user.replied", handler, concurrency=1, timeout=0.05
+    )
+    dispatch = asyncio.ensure_future(route.dispatch({}))
+    await asyncio.sleep(0)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(route.run(lambda: asyncio.sleep(0)), 0.02)
+    release.set()
+    await dispatch
+
+    with pytest.raises(asyncio.TimeoutError):
+        await route.run(lambda: asyncio.sleep(1))
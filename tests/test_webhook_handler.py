@@ -0,0 +1,219 @@
+"""Tests for the Intercom webhook handler."""
+
+import asyncio
+import hashlib
+import hmac
+import json
+
+import pytest
+
+from config import config
+from intercom_models import Author, Conversation, ConversationSource, decode_event
+from resilience import CircuitOpenError
+from webhook_handler import WebhookHandler, embedded_reply_bodies
+
+BODY = b'{"topic": "conversation.user.created", "id": "notif_1"}'
+
+
+@pytest.fixture
+def handler():
+    """Webhook handler with a known secret and no clients."""
+    handler = WebhookHandler(None, None)
+    assert handler.webhook_secret == "test-secret"
+    return handler
+
+
+def _sign(digest, body=BODY):
+    return hmac.new(b"test-secret", body, digest).hexdigest()
+
+
+def test_verify_sha1_signature(handler):
+    """X-Hub-Signature style sha1= signatures are accepted."""
+    assert handler.verify_webhook_signature(BODY, "sha1=" + _sign(hashlib.sha1))
+
+
+def test_verify_sha256_signature(handler):
+    """sha256= signatures are accepted."""
+    assert handler.verify_webhook_signature(BODY, "sha256=" + _sign(hashlib.sha256))
+
+
+def test_verify_bare_digest_infers_algorithm(handler):
+    """Bare hex digests are matched by their length."""
+    assert handler.verify_webhook_signature(BODY, _sign(hashlib.sha1))
+    assert handler.verify_webhook_signature(BODY, _sign(hashlib.sha256))
+
+
+def test_reject_invalid_signature(handler):
+    """Signatures for a different body are rejected."""
+    signature = "sha1=" + _sign(hashlib.sha1, b"{}")
+
+    assert not handler.verify_webhook_signature(BODY, signature)
+    assert not handler.verify_webhook_signature(BODY, "md5=abc")
+    assert not handler.verify_webhook_signature(BODY, "")
+
+
+def test_streaming_check_matches_whole_body(handler):
+    """Feeding the body in chunks gives the same result as hashing it at once."""
+    check = handler.start_signature_check("sha256=" + _sign(hashlib.sha256))
+    for start in range(0, len(BODY), 7):
+        check.update(BODY[start : start + 7])
+
+    assert check.is_valid()
+
+
+def test_signature_header_preference(handler):
+    """X-Hub-Signature-256 is preferred over X-Hub-Signature."""
+    headers = {"X-Hub-Signature": "sha1=a", "X-Hub-Signature-256": "sha256=b"}
+
+    assert handler.signature_from_headers(headers) == "sha256=b"
+    assert handler.signature_from_headers({"X-Hub-Signature": "sha1=a"}) == "sha1=a"
+
+
+def _event(topic, item):
+    payload = json.dumps({"topic": topic, "data": {"item": item}}).encode("utf-8")
+    return decode_event(topic, payload)
+
+
+def _reply(part_id, body, total_count=None):
+    parts = {"conversation_parts": [{"id": part_id, "body": body}]}
+    if total_count is not None:
+        parts["total_count"] = total_count
+    return _event(
+        "conversation.user.replied",
+        {"type": "conversation", "id": "1", "conversation_parts": parts},
+    )
+
+
+def test_embedded_reply_bodies_are_used_in_order():
+    """Reply webhooks that carry their messages need no fetch."""
+    events = [_reply("p1", "first"), _reply("p2", "second"), _reply("p2", "second")]
+
+    assert embedded_reply_bodies(events) == ["first", "second"]
+
+
+def test_missing_or_truncated_replies_need_a_fetch():
+    """Replies without a body or with a truncated part list fall back to a fetch."""
+    assert embedded_reply_bodies([_reply("p1", "")]) is None
+    assert embedded_reply_bodies([_reply("p1", "text", total_count=3)]) is None
+
+
+class RecordingIntercom:
+    """Intercom client stub that records conversation fetches."""
+
+    def __init__(self):
+        self.fetched = []
+
+    async def get_conversation_model(self, conversation_id, updated_at=None):
+        self.fetched.append(conversation_id)
+        return Conversation(source=ConversationSource(author=Author(name="Fetched")))
+
+
+@pytest.mark.asyncio
+async def test_created_conversation_uses_payload_source():
+    """A new conversation with an embedded source is handled without a fetch."""
+    intercom = RecordingIntercom()
+    handler = WebhookHandler(None, intercom)
+    source = {"body": "<p>Hi</p>", "author": {"name": "Ada", "email": "a@b.c"}}
+
+    result = await handler._handle_conversation_created(
+        _event("conversation.user.created", {"id": "1", "source": source})
+    )
+    await handler._handle_conversation_created(
+        _event("conversation.user.created", {"id": "2"})
+    )
+
+    assert result["status"] == "success"
+    assert intercom.fetched == ["2"]
+
+
+class RecordingGraph:
+    """Graph client stub that records posts and thread replies."""
+
+    def __init__(self):
+        self.posts = []
+
+    async def find_or_create_channel(self, team_id, name, description=""):
+        return {"id": "channel-1"}
+
+    async def send_message(self, team_id, channel_id, message, message_type):
+        self.posts.append(("message", message))
+        return {"id": "message-1"}
+
+    async def reply_to_message(
+        self, team_id, channel_id, message_id, message, message_type
+    ):
+        self.posts.append(("reply", message_id, message))
+        return {"id": "reply-1"}
+
+
+@pytest.mark.asyncio
+async def test_created_conversation_posts_the_source_body_either_way(monkeypatch):
+    """Embedded and fetched conversations post the same first message."""
+    monkeypatch.setattr(config, "default_team_id", "team-1")
+    source = {"body": "<p>Hi</p>", "author": {"name": "Ada", "email": "a@b.c"}}
+
+    class FetchedSource:
+        async def get_conversation_model(self, conversation_id, updated_at=None):
+            author = Author(name="Ada", email="a@b.c")
+            return Conversation(
+                source=ConversationSource(body="<p>Hi</p>", author=author)
+            )
+
+    graph = RecordingGraph()
+    handler = WebhookHandler(graph, FetchedSource())
+    await handler._handle_conversation_created(
+        _event("conversation.user.created", {"id": "1", "source": source})
+    )
+    await handler._handle_conversation_created(
+        _event("conversation.user.created", {"id": "1"})
+    )
+
+    assert ["<p>Hi</p>" in message for _, message in graph.posts] == [True, True]
+
+
+class SlowFin:
+    """Intercom client stub whose FIN AI suggestion arrives late."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+
+    async def trigger_fin_ai_response(self, conversation_id, query):
+        await self.release.wait()
+        return {"suggested_reply": "Try resetting your password"}
+
+
+@pytest.mark.asyncio
+async def test_reply_is_posted_before_fin_suggestion(monkeypatch):
+    """The customer message is posted at once and FIN AI replies in its thread."""
+    monkeypatch.setattr(config, "default_team_id", "team-1")
+    graph = RecordingGraph()
+    fin = SlowFin()
+    handler = WebhookHandler(graph, fin)
+
+    result = await handler._send_conversation_replies("1", [_reply("p1", "help")])
+
+    assert result["fin_ai_pending"]
+    assert [post[0] for post in graph.posts] == ["message"]
+
+    fin.release.set()
+    await handler.close()
+
+    assert graph.posts[1][:2] == ("reply", "message-1")
+    assert "Try resetting your password" in graph.posts[1][2]
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_reaches_the_journal_unwrapped():
+    """An open circuit is raised as is, so the journal can defer the event."""
+
+    class Outage:
+        async def get_conversation_model(self, conversation_id, updated_at=None):
+            raise CircuitOpenError("intercom", 30.0)
+
+    handler = WebhookHandler(RecordingGraph(), Outage())
+
+    with pytest.raises(CircuitOpenError):
+        await handler.process_webhook(
+            "conversation.user.created",
+            _event("conversation.user.created", {"id": "1"}),
+        )
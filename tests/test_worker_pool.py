@@ -0,0 +1,61 @@
+"""Tests for the sharded webhook worker pool."""
+
+import asyncio
+import random
+
+import pytest
+
+from worker_pool import ShardedWorkerPool
+
+
+@pytest.mark.asyncio
+async def test_items_with_same_key_are_processed_in_order():
+    """Events for one conversation keep their submission order."""
+    processed = {}
+
+    async def handler(key, sequence):
+        await asyncio.sleep(random.random() / 1000)
+        processed.setdefault(key, []).append(sequence)
+
+    pool = ShardedWorkerPool(handler, num_workers=4, queue_size=5)
+    pool.start()
+    for sequence in range(20):
+        for key in ("conversation:1", "conversation:2", "conversation:3"):
+            await pool.submit(key, key, sequence)
+    await asyncio.gather(*(queue.join() for queue in pool._queues))
+    await pool.stop()
+
+    assert processed == {
+        key: list(range(20))
+        for key in ("conversation:1", "conversation:2", "conversation:3")
+    }
+
+
+@pytest.mark.asyncio
+async def test_shard_mapping_is_stable():
+    """The same key always maps to the same worker."""
+    pool = ShardedWorkerPool(None, num_workers=8)
+
+    assert pool.shard_for("conversation:123") == pool.shard_for("conversation:123")
+    assert 0 <= pool.shard_for("contact:abc") < 8
+
+
+@pytest.mark.asyncio
+async def test_stats_report_failures_and_queue_depth():
+    """Handler failures are counted and do not stop the worker."""
+
+    async def handler(should_fail):
+        if should_fail:
+            raise RuntimeError("boom")
+
+    pool = ShardedWorkerPool(handler, num_workers=1)
+    pool.start()
+    await pool.submit("conversation:1", True)
+    await pool.submit("conversation:1", False)
+    await pool._queues[0].join()
+    stats = pool.stats()
+    await pool.stop()
+
+    assert stats["queue_depth"] == 0
+    assert stats["per_worker"][0]["processed"] == 1
+    assert stats["per_worker"][0]["failed"] == 1
@@ -0,0 +1,299 @@
+"""
+Graph access token cache shared by all workers.
+Tokens are kept in a file on the data volume or in Redis, so workers and
+restarts reuse one token instead of each asking Azure AD. A token is
+refreshed shortly before it expires by whichever worker takes the refresh
+lock first; the others keep using the current token or wait for the new one.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import sys
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from azure.core.credentials import AccessToken
+
+from cache import SharedJsonFile, SingleFlight, file_lock
+
+logger = logging.getLogger(__name__)
+
+
+def _store_errors() -> tuple:
+    """Get the failures of the shared store, as opposed to token failures."""
+    errors = (OSError, ValueError)
+    # Redis errors can only occur once the optional redis package is loaded
+    redis_exceptions = sys.modules.get("redis.exceptions")
+    if redis_exceptions is None:
+        return errors
+    return errors + (redis_exceptions.RedisError,)
+
+
+# Delete the Redis lock only if this worker still holds it
+_RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def token_cache_key(identity: str, scopes: Tuple[str, ...]) -> str:
+    """Get the cache key for an app's token with the given scopes."""
+    value = f"{identity}|{' '.join(sorted(scopes))}"
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:32]
+
+
+class FileTokenStore:
+    """Token store in a JSON file, locked with flock between processes."""
+
+    def __init__(self, path: str):
+        """
+        Initialize the store.
+
+        Args:
+            path (str): JSON file on a volume shared by the workers
+        """
+        self.path = path
+        self._file = SharedJsonFile(path)
+        # Held while refreshing; separate from the lock guarding file writes,
+        # which the refresher takes to store the new token
+        self.lock_path = f"{path}.refresh.lock"
+
+    async def get(self, key: str) -> Optional[AccessToken]:
+        """Get the stored token for a key."""
+        entries = await asyncio.to_thread(self._file.read)
+        entry = entries.get(key)
+        return AccessToken(entry[0], int(entry[1])) if entry else None
+
+    async def set(self, key: str, token: AccessToken):
+        """Store a token, dropping tokens that have expired."""
+
+        def change(entries: Dict[str, Any]) -> Dict[str, Any]:
+            now = time.time()
+            entries = {k: v for k, v in entries.items() if v[1] > now}
+            entries[key] = (token.token, token.expires_on)
+            return entries
+
+        await asyncio.to_thread(self._file.update, change)
+
+    @asynccontextmanager
+    async def refresh_lock(self, key: str) -> AsyncIterator[bool]:
+        """
+        Try to become the worker that refreshes the token.
+
+        Yields:
+            bool: True if the lock was taken, False if another worker holds it
+        """
+        with file_lock(self.lock_path, blocking=False) as taken:
+            yield taken
+
+
+class RedisTokenStore:
+    """Token store shared through Redis, locked with SET NX."""
+
+    def __init__(self, client, prefix: str = "graph:token:", lock_ttl: float = 30.0):
+        """
+        Initialize the store.
+
+        Args:
+            client: redis.asyncio client
+            prefix (str): Key prefix for tokens and their refresh locks
+            lock_ttl (float): Seconds after which a lock held by a crashed
+                worker expires
+        """
+        self.client = client
+        self.prefix = prefix
+        self.lock_ttl = lock_ttl
+
+    async def get(self, key: str) -> Optional[AccessToken]:
+        """Get the stored token for a key."""
+        value = await self.client.get(f"{self.prefix}{key}")
+        if not value:
+            return None
+        token, expires_on = json.loads(value)
+        return AccessToken(token, int(expires_on))
+
+    async def set(self, key: str, token: AccessToken):
+        """Store a token until it expires."""
+        ttl = int(token.expires_on - time.time())
+        if ttl > 0:
+            await self.client.set(
+                f"{self.prefix}{key}",
+                json.dumps((token.token, token.expires_on)),
+                ex=ttl,
+            )
+
+    @asynccontextmanager
+    async def refresh_lock(self, key: str) -> AsyncIterator[bool]:
+        """
+        Try to become the worker that refreshes the token.
+
+        Yields:
+            bool: True if the lock was taken, False if another worker holds it
+        """
+        lock_key = f"{self.prefix}{key}:lock"
+        owner = uuid.uuid4().hex
+        acquired = await self.client.set(
+            lock_key, owner, nx=True, px=int(self.lock_ttl * 1000)
+        )
+        if not acquired:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            try:
+                await self.client.eval(_RELEASE_LOCK, 1, lock_key, owner)
+            except Exception as e:
+                logger.warning(f"Failed to release token refresh lock: {str(e)}")
+
+
+def create_token_store(redis_client=None, path: Optional[str] = None):
+    """
+    Create the shared token store: Redis when configured, else a file.
+
+    Args:
+        redis_client: redis.asyncio client, or None
+        path (Optional[str]): Token file, None or empty disables the file store
+
+    Returns:
+        Optional[store]: Token store, or None when sharing is disabled
+    """
+    if redis_client is not None:
+        return RedisTokenStore(redis_client)
+    if path:
+        return FileTokenStore(path)
+    return None
+
+
+class SharedTokenCredential:
+    """Async credential wrapper that shares tokens through a token store."""
+
+    def __init__(
+        self,
+        credential,
+        store,
+        identity: str,
+        refresh_margin: float = 300.0,
+        wait_timeout: float = 30.0,
+    ):
+        """
+        Initialize the wrapper.
+
+        Args:
+            credential: azure.identity.aio credential that acquires tokens
+            store: FileTokenStore or RedisTokenStore
+            identity (str): Tenant and client ID of the app, so apps sharing
+                a store never share tokens
+            refresh_margin (float): Seconds before expiry at which a token
+                is refreshed
+            wait_timeout (float): Longest wait for another worker's refresh
+                before acquiring a token directly
+        """
+        self.credential = credential
+        self.store = store
+        self.identity = identity
+        self.refresh_margin = refresh_margin
+        self.wait_timeout = wait_timeout
+        self._tokens: Dict[Tuple[str, ...], AccessToken] = {}
+        self._refreshes = SingleFlight()
+
+    async def get_token(self, *scopes: str, claims: Optional[str] = None, **kwargs):
+        """
+        Get a token for the scopes, from the shared cache when it is fresh.
+
+        Requests with claims, e.g. after a continuous access evaluation
+        challenge, always go to Azure AD.
+
+        Returns:
+            AccessToken: Bearer token and its expiry as a Unix timestamp
+        """
+        if claims:
+            return await self.credential.get_token(*scopes, claims=claims, **kwargs)
+
+        token = self._tokens.get(scopes)
+        if token and not self._needs_refresh(token):
+            return token
+
+        # Coroutines of one worker share a single lookup
+        return await self._refreshes.do(scopes, lambda: self._load(scopes, kwargs))
+
+    async def close(self):
+        """Close the wrapped credential."""
+        await self.credential.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def _needs_refresh(self, token: AccessToken) -> bool:
+        return token.expires_on - time.time() <= self.refresh_margin
+
+    async def _load(self, scopes: Tuple[str, ...], kwargs) -> AccessToken:
+        key = token_cache_key(self.identity, scopes)
+        deadline = time.monotonic() + self.wait_timeout
+        current = self._tokens.get(scopes)
+
+        while True:
+            try:
+                stored = await self.store.get(key)
+                if stored and not self._needs_refresh(stored):
+                    self._tokens[scopes] = stored
+                    return stored
+                current = self._newest(current, stored)
+
+                async with self.store.refresh_lock(key) as refresher:
+                    if refresher:
+                        return await self._refresh(key, scopes, kwargs)
+
+            except _store_errors() as e:
+                logger.warning(
+                    f"Shared token cache unavailable, acquiring directly: {str(e)}"
+                )
+                break
+
+            # Another worker is refreshing; the current token is still usable
+            if current and current.expires_on > time.time():
+                return current
+            if time.monotonic() >= deadline:
+                logger.warning(
+                    "Timed out waiting for a token refresh by another worker"
+                )
+                break
+            await asyncio.sleep(0.1)
+
+        token = await self.credential.get_token(*scopes, **kwargs)
+        self._tokens[scopes] = token
+        return token
+
+    async def _refresh(self, key: str, scopes: Tuple[str, ...], kwargs) -> AccessToken:
+        """Acquire a new token while holding the refresh lock."""
+        # Another worker may have refreshed before the lock was taken
+        stored = await self.store.get(key)
+        if stored and not self._needs_refresh(stored):
+            self._tokens[scopes] = stored
+            return stored
+
+        token = await self.credential.get_token(*scopes, **kwargs)
+        self._tokens[scopes] = token
+        try:
+            await self.store.set(key, token)
+        except _store_errors() as e:
+            logger.warning(f"Failed to share the refreshed token: {str(e)}")
+        logger.info("Refreshed shared Graph access token")
+        return token
+
+    @staticmethod
+    def _newest(
+        first: Optional[AccessToken], second: Optional[AccessToken]
+    ) -> Optional[AccessToken]:
+        if first is None or (second and second.expires_on > first.expires_on):
+            return second
+        return first
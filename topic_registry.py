@@ -0,0 +1,126 @@
+"""
+Topic dispatch registry for webhook events.
+Maps exact topics and wildcard families such as ``contact.*`` to handlers,
+each with its own concurrency limit, timeout and priority.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+TopicHandler = Callable[[Any], Awaitable[Dict[str, Any]]]
+
+# Upper bound on memoized topic lookups, including unregistered topics
+_MAX_RESOLVED = 1024
+
+
+@dataclass(slots=True)
+class TopicRoute:
+    """A registered handler and its execution limits."""
+
+    pattern: str
+    handler: TopicHandler
+    concurrency: int = 10
+    timeout: float = 30.0
+    priority: int = 0
+    semaphore: asyncio.Semaphore = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def dispatch(self, event: Any) -> Dict[str, Any]:
+        """
+        Run the handler within the route's concurrency limit and timeout.
+
+        Args:
+            event (Any): Decoded webhook event
+
+        Returns:
+            Dict: Handler result
+        """
+        return await self.run(lambda: self.handler(event))
+
+    async def run(self, operation: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run other work for the route, e.g. a deferred send, within its limits.
+
+        Args:
+            operation (Callable): Coroutine function to run
+
+        Returns:
+            Any: Result of the operation
+        """
+        async with self.semaphore:
+            return await asyncio.wait_for(operation(), self.timeout)
+
+
+class TopicRegistry:
+    """Resolves webhook topics to routes with dictionary lookups."""
+
+    def __init__(self):
+        self._routes: Dict[str, TopicRoute] = {}
+        self._resolved: Dict[str, Optional[TopicRoute]] = {}
+
+    def register(
+        self,
+        pattern: str,
+        handler: TopicHandler,
+        concurrency: int = 10,
+        timeout: float = 30.0,
+        priority: int = 0,
+    ) -> TopicRoute:
+        """
+        Register a handler for a topic or wildcard family.
+
+        Args:
+            pattern (str): Exact topic, or a prefix ending in ``.*``, or ``*``
+            handler (Callable): Coroutine function taking the decoded event
+            concurrency (int): Maximum concurrent executions of the handler
+            timeout (float): Seconds before a handler execution is cancelled
+            priority (int): Relative importance, higher is more important
+
+        Returns:
+            TopicRoute: The registered route
+        """
+        if "*" in pattern and pattern != "*" and not pattern.endswith(".*"):
+            raise ValueError(f"Unsupported topic pattern: {pattern}")
+
+        route = TopicRoute(pattern, handler, concurrency, timeout, priority)
+        self._routes[pattern] = route
+        self._resolved.clear()
+        return route
+
+    def resolve(self, topic: str) -> Optional[TopicRoute]:
+        """
+        Find the route for a topic.
+
+        Exact registrations win over wildcard families, and longer families
+        win over shorter ones. Results are memoized per topic.
+
+        Args:
+            topic (str): Webhook topic
+
+        Returns:
+            Optional[TopicRoute]: Matching route, or None if unregistered
+        """
+        try:
+            return self._resolved[topic]
+        except KeyError:
+            pass
+
+        route = self._routes.get(topic)
+        if route is None:
+            segments = topic.split(".")
+            for size in range(len(segments) - 1, 0, -1):
+                route = self._routes.get(".".join(segments[:size]) + ".*")
+                if route is not None:
+                    break
+            else:
+                route = self._routes.get("*")
+
+        if len(self._resolved) < _MAX_RESOLVED:
+            self._resolved[topic] = route
+        return route
+
+    def __contains__(self, topic: str) -> bool:
+        return self.resolve(topic) is not None
@@ -3,18 +3,125 @@ Webhook handler for Intercom events and Teams integration.
 Processes incoming webhooks and triggers appropriate actions.
 """
 
+import asyncio
 import hashlib
 import hmac
 import logging
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, List, Mapping, Optional, Union
 
 from fastapi import HTTPException
 
+from coalescer import Coalescer
 from config import config
+from intercom_models import (
+    ContactEvent,
+    ConversationEvent,
+    WebhookEnvelope,
+    WebhookEvent,
+)
+from rate_limiter import request_priority
+from resilience import CircuitOpenError
+from send_scheduler import SendQueueFull
+from topic_registry import TopicRegistry
 
 logger = logging.getLogger(__name__)
 
+# Signature headers in order of preference
+SIGNATURE_HEADERS = ("X-Hub-Signature-256", "X-Hub-Signature")
+SIGNATURE_DIGESTS = {"sha1": hashlib.sha1, "sha256": hashlib.sha256}
+
+# topic: (handler method, concurrency limit, timeout in seconds, priority)
+TOPIC_ROUTES = {
+    "conversation.user.created": ("_handle_conversation_created", 10, 30.0, 100),
+    "conversation.user.replied": ("_handle_conversation_reply", 10, 30.0, 100),
+    "conversation.admin.replied": ("_handle_admin_reply", 20, 10.0, 50),
+    "conversation.admin.assigned": ("_handle_conversation_assigned", 5, 30.0, 50),
+    "conversation.admin.closed": ("_handle_conversation_closed", 5, 30.0, 50),
+    "contact.user.created": ("_handle_contact_user_created", 2, 30.0, 10),
+    "contact.lead.created": ("_handle_contact_lead_created", 2, 30.0, 10),
+    "contact.lead.signed_up": ("_handle_lead_signed_up", 2, 30.0, 10),
+    "visitor.signed_up": ("_handle_visitor_signed_up", 2, 30.0, 10),
+}
+
+
+def ordering_key(event: Union[WebhookEvent, WebhookEnvelope]) -> str:
+    """
+    Get the key that events must be processed in order for.
+
+    Conversation events are keyed by conversation ID and contact events by
+    contact ID, so all events about one object share a key.
+
+    Args:
+        event (Union[WebhookEvent, WebhookEnvelope]): Decoded webhook event,
+            or just its envelope
+
+    Returns:
+        str: Ordering key
+    """
+    item = event.data.item
+    if item.id:
+        return f"{item.type or 'item'}:{item.id}"
+    return event.id or event.topic
+
+
+def embedded_reply_bodies(events: List[ConversationEvent]) -> Optional[List[str]]:
+    """
+    Collect the new message bodies carried by reply webhooks.
+
+    Args:
+        events (List[ConversationEvent]): Reply events in arrival order
+
+    Returns:
+        Optional[List[str]]: Bodies in arrival order, or None if any event is
+            missing its message or has a truncated part list
+    """
+    bodies = []
+    seen = set()
+    for event in events:
+        part_list = event.data.item.conversation_parts
+        if part_list is None:
+            return None
+
+        parts = [part for part in part_list.conversation_parts if part.body]
+        truncated = part_list.total_count is not None and part_list.total_count > len(
+            part_list.conversation_parts
+        )
+        if not parts or truncated:
+            return None
+
+        for part in parts:
+            if part.id and part.id in seen:
+                continue
+            seen.add(part.id)
+            bodies.append(part.body)
+    return bodies
+
+
+class SignatureCheck:
+    """Incremental HMAC verification of a webhook body."""
+
+    __slots__ = ("_mac", "_expected")
+
+    def __init__(self, mac: "hmac.HMAC", expected: str):
+        """
+        Initialize the check.
+
+        Args:
+            mac (hmac.HMAC): Keyed HMAC state owned by this check
+            expected (str): Hex digest sent by Intercom
+        """
+        self._mac = mac
+        self._expected = expected
+
+    def update(self, chunk: bytes):
+        """Feed the next chunk of the body."""
+        self._mac.update(chunk)
+
+    def is_valid(self) -> bool:
+        """Compare the digest of everything fed so far with the expected one."""
+        return hmac.compare_digest(self._mac.hexdigest(), self._expected)
+
 
 class WebhookHandler:
     """Handles Intercom webhooks and processes events."""
@@ -31,35 +138,115 @@ class WebhookHandler:
         self.intercom_client = intercom_client
         self.webhook_secret = config.intercom.webhook_secret
 
-    def verify_webhook_signature(self, payload: bytes, signature: str) -> bool:
+        # FIN AI suggestions being added to already posted messages
+        self._enrichments: set = set()
+
+        self.reply_coalescer = None
+        if config.reply_coalesce_quiet_ms > 0:
+            self.reply_coalescer = Coalescer(
+                self._flush_conversation_replies,
+                quiet_period=config.reply_coalesce_quiet_ms / 1000,
+                max_delay=config.reply_coalesce_max_delay_ms / 1000,
+            )
+
+        self.registry = TopicRegistry()
+        for topic, (method, concurrency, timeout, priority) in TOPIC_ROUTES.items():
+            self.registry.register(
+                topic, getattr(self, method), concurrency, timeout, priority
+            )
+
+    @property
+    def webhook_secret(self) -> str:
+        """Secret Intercom signs webhook bodies with."""
+        return self._webhook_secret
+
+    @webhook_secret.setter
+    def webhook_secret(self, secret: str):
+        self._webhook_secret = secret
+        # Keyed HMAC states are built once per secret and copied per request
+        self._hmac_templates = {}
+        if secret:
+            key = secret.encode("utf-8")
+            self._hmac_templates = {
+                name: hmac.new(key, digestmod=digest)
+                for name, digest in SIGNATURE_DIGESTS.items()
+            }
+
+    async def close(self):
+        """Flush coalesced replies and wait for pending FIN AI suggestions."""
+        if self.reply_coalescer:
+            await self.reply_coalescer.close()
+        if self._enrichments:
+            await asyncio.gather(*self._enrichments, return_exceptions=True)
+
+    @staticmethod
+    def signature_from_headers(headers: Mapping[str, str]) -> str:
         """
-        Verify Intercom webhook signature.
+        Get the webhook signature from request headers.
+
+        Args:
+            headers (Mapping): Request headers
+
+        Returns:
+            str: Signature header value, empty if absent
+        """
+        for name in SIGNATURE_HEADERS:
+            value = headers.get(name)
+            if value:
+                return value
+        return ""
+
+    def start_signature_check(self, signature: str) -> Optional["SignatureCheck"]:
+        """
+        Start an incremental signature check for a webhook body.
+
+        Accepts ``sha1=<hex>``, ``sha256=<hex>`` or a bare hex digest, whose
+        algorithm is inferred from its length.
 
         Args:
-            payload (bytes): Raw webhook payload
             signature (str): Webhook signature from headers
 
         Returns:
-            bool: True if signature is valid
+            Optional[SignatureCheck]: Check to feed body chunks into, or None
+                when no webhook secret is configured
         """
         if not self.webhook_secret:
             logger.warning(
                 "Webhook secret not configured, skipping signature verification"
             )
-            return True
+            return None
 
-        try:
-            # Remove 'sha1=' prefix if present (Intercom uses SHA-1)
-            if signature.startswith("sha1="):
-                signature = signature[5:]
+        algorithm, _, digest = signature.strip().partition("=")
+        if not digest:
+            digest = algorithm
+            algorithm = "sha256" if len(digest) == 64 else "sha1"
+
+        template = self._hmac_templates.get(algorithm.lower())
+        if template is None:
+            logger.error(f"Unsupported webhook signature algorithm: {algorithm}")
+            # An empty expected digest never matches
+            return SignatureCheck(self._hmac_templates["sha1"].copy(), "")
 
-            # Calculate expected signature using SHA-1 (as per Intercom documentation)
-            expected_signature = hmac.new(
-                self.webhook_secret.encode("utf-8"), payload, hashlib.sha1
-            ).hexdigest()
+        return SignatureCheck(template.copy(), digest.lower())
 
-            # Compare signatures
-            is_valid = hmac.compare_digest(expected_signature, signature)
+    def verify_webhook_signature(self, payload: bytes, signature: str) -> bool:
+        """
+        Verify Intercom webhook signature.
+
+        Args:
+            payload (bytes): Raw webhook payload
+            signature (str): Webhook signature from headers
+
+        Returns:
+            bool: True if signature is valid
+        """
+        try:
+            check = self.start_signature_check(signature)
+            if check is None:
+                return True
+
+            check.update(payload)
+            is_valid = check.is_valid()
 
             if not is_valid:
                 logger.error("Invalid webhook signature")
@@ -71,14 +258,14 @@ class WebhookHandler:
             return False
 
     async def process_webhook(
-        self, event_type: str, data: Dict[str, Any]
+        self, event_type: str, event: WebhookEvent
     ) -> Dict[str, Any]:
         """
         Process incoming webhook event.
 
         Args:
             event_type (str): Type of webhook event
-            data (Dict): Event data
+            event (WebhookEvent): Decoded webhook event
 
         Returns:
             Dict: Processing result
@@ -86,29 +273,32 @@ class WebhookHandler:
         try:
             logger.info(f"Processing webhook event: {event_type}")
 
-            # Route to appropriate handler based on event type
-            if event_type == "conversation.user.created":
-                return await self._handle_conversation_created(data)
-            elif event_type == "conversation.user.replied":
-                return await self._handle_conversation_reply(data)
-            elif event_type == "conversation.admin.replied":
-                return await self._handle_admin_reply(data)
-            elif event_type == "conversation.admin.assigned":
-                return await self._handle_conversation_assigned(data)
-            elif event_type == "conversation.admin.closed":
-                return await self._handle_conversation_closed(data)
-            elif event_type == "contact.user.created":
-                return await self._handle_contact_user_created(data)
-            elif event_type == "contact.lead.created":
-                return await self._handle_contact_lead_created(data)
-            elif event_type == "contact.lead.signed_up":
-                return await self._handle_lead_signed_up(data)
-            elif event_type == "visitor.signed_up":
-                return await self._handle_visitor_signed_up(data)
-            else:
+            route = self.registry.resolve(event_type)
+            if route is None:
                 logger.info(f"Unhandled event type: {event_type}")
                 return {"status": "ignored", "event_type": event_type}
 
+            # Outbound API calls made for this event are scheduled ahead of
+            # bulk traffic
+            priority = request_priority.set(route.priority)
+            try:
+                # Replies still in the coalescing window are sent before any
+                # later event for the same conversation
+                if (
+                    self.reply_coalescer
+                    and event_type != "conversation.user.replied"
+                    and isinstance(event, ConversationEvent)
+                    and self.reply_coalescer.pending(event.data.item.id)
+                ):
+                    await self.reply_coalescer.flush_now(event.data.item.id)
+
+                return await route.dispatch(event)
+            finally:
+                request_priority.reset(priority)
+
+        except (SendQueueFull, CircuitOpenError):
+            # Backpressure or an outage, retried by the caller later
+            raise
         except Exception as e:
             logger.error(f"Error processing webhook {event_type}: {str(e)}")
             raise HTTPException(
@@ -116,41 +306,46 @@ class WebhookHandler:
             )
 
     async def _handle_conversation_created(
-        self, data: Dict[str, Any]
+        self, event: ConversationEvent
     ) -> Dict[str, Any]:
         """
         Handle new conversation created event.
 
         Args:
-            data (Dict): Event data
+            event (ConversationEvent): Decoded webhook event
 
         Returns:
             Dict: Processing result
         """
         try:
-            conversation = data.get("data", {}).get("item", {})
-            conversation_id = conversation.get("id")
+            conversation = event.data.item
+            conversation_id = conversation.id
 
             if not conversation_id:
                 logger.error("No conversation ID in webhook data")
                 return {"status": "error", "message": "Missing conversation ID"}
 
-            # Get conversation details
-            async with self.intercom_client as client:
-                conversation_details = await client.get_conversation(conversation_id)
+            # Build the notification from the webhook payload, and only fetch
+            # the conversation when the payload lacks the author or message
+            source = conversation.source
+            author = source.author if source else None
+            if author and (author.name or author.email) and source.body:
+                user_name = author.name or "Unknown User"
+                user_email = author.email or "No email"
+                first_message = source.body
+            else:
+                details = await self.intercom_client.get_conversation_model(
+                    conversation_id, conversation.updated_at
+                )
 
-            # Extract relevant information
-            user = conversation_details.get("source", {}).get("author", {})
-            user_name = user.get("name", "Unknown User")
-            user_email = user.get("email", "No email")
+                # Extract relevant information
+                source = details.source
+                user = source.author if source else None
+                user_name = (user and user.name) or "Unknown User"
+                user_email = (user and user.email) or "No email"
 
-            # Get the first message
-            parts = conversation_details.get("conversation_parts", {}).get(
-                "conversation_parts", []
-            )
-            first_message = "No message content"
-            if parts and len(parts) > 0:
-                first_message = parts[0].get("body", "No message content")
+                # The first message is the source, as in the webhook payload
+                first_message = (source and source.body) or "No message content"
 
             # Create Teams message
             teams_message = f"""
@@ -192,96 +387,218 @@ class WebhookHandler:
             logger.error(f"Error handling conversation created: {str(e)}")
             raise
 
-    async def _handle_conversation_reply(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    async def _handle_conversation_reply(
+        self, event: ConversationEvent
+    ) -> Dict[str, Any]:
         """
         Handle user reply in conversation.
 
+        Replies are held in a per-conversation coalescing window so that a
+        burst of messages produces at most one Intercom fetch and one Teams post.
+
         Args:
-            data (Dict): Event data
+            event (ConversationEvent): Decoded webhook event
 
         Returns:
-            Dict: Processing result
+            Dict: Processing result, with a "completion" future when the
+                reply was coalesced
         """
         try:
-            conversation = data.get("data", {}).get("item", {})
-            conversation_id = conversation.get("id")
+            conversation_id = event.data.item.id
 
             if not conversation_id:
                 return {"status": "error", "message": "Missing conversation ID"}
 
-            # Get latest conversation part
-            async with self.intercom_client as client:
-                parts = await client.get_conversation_parts(conversation_id)
+            if self.reply_coalescer is None:
+                return await self._send_conversation_replies(conversation_id, [event])
+
+            completion = self.reply_coalescer.add(conversation_id, event)
+            return {
+                "status": "coalesced",
+                "action": "user_reply_notification",
+                "conversation_id": conversation_id,
+                "completion": completion,
+            }
+
+        except Exception as e:
+            logger.error(f"Error handling conversation reply: {str(e)}")
+            raise
+
+    async def _flush_conversation_replies(
+        self, conversation_id: str, events: List[ConversationEvent]
+    ) -> Dict[str, Any]:
+        """Send coalesced replies within the reply route's limits."""
+        route = self.registry.resolve("conversation.user.replied")
+        return await route.run(
+            lambda: self._send_conversation_replies(conversation_id, events)
+        )
+
+    async def _send_conversation_replies(
+        self, conversation_id: str, events: List[ConversationEvent]
+    ) -> Dict[str, Any]:
+        """
+        Send one Teams notification for one or more user replies.
+
+        Args:
+            conversation_id (str): The conversation ID
+            events (List[ConversationEvent]): Reply events in arrival order
+
+        Returns:
+            Dict: Processing result
+        """
+        try:
+            client = self.intercom_client
+
+            # Reply webhooks usually carry the new messages themselves
+            message_bodies = embedded_reply_bodies(events)
+            if message_bodies is None:
+                # Parts announced by the webhooks identify which messages are new
+                new_part_ids = set()
+                for event in events:
+                    part_list = event.data.item.conversation_parts
+                    if part_list:
+                        new_part_ids.update(
+                            part.id for part in part_list.conversation_parts if part.id
+                        )
+
+                updated_at = max(
+                    (event.data.item.updated_at or 0 for event in events), default=0
+                )
+                parts = await client.get_conversation_parts(
+                    conversation_id, updated_at or None
+                )
 
                 if not parts:
                     return {"status": "error", "message": "No conversation parts found"}
 
-                latest_part = parts[-1]  # Get the most recent part
-                message_body = latest_part.get("body", "")
-                latest_part.get("author", {})
+                new_parts = [part for part in parts if part.id in new_part_ids]
+                if not new_parts:
+                    new_parts = parts[-len(events) :]
+                message_bodies = [part.body or "" for part in new_parts]
 
-                # Try to trigger FIN AI response
-                fin_response = await client.trigger_fin_ai_response(
-                    conversation_id, message_body
-                )
+            if len(message_bodies) == 1:
+                heading = "**Customer Message:**"
+            else:
+                heading = f"**Customer Messages ({len(message_bodies)}):**"
+            messages = "\n\n".join(message_bodies)
 
             # Create Teams notification
             teams_message = f"""
 💬 **Customer Reply - Conversation {conversation_id}**
 
-**Customer Message:**
-{message_body}
+{heading}
+{messages}
 
 **Time:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-"""
-
-            # Add FIN AI suggestion if available
-            if fin_response:
-                suggested_reply = fin_response.get("suggested_reply", "")
-                if suggested_reply:
-                    teams_message += f"""
-
-🤖 **FIN AI Suggested Response:**
-{suggested_reply}
 """
 
             intercom_url = f"https://app.intercom.com/a/apps/{conversation_id}"
             teams_message += f"\n[View in Intercom]({intercom_url})"
 
-            # Send to Teams
+            # Send to Teams right away; the FIN AI suggestion is requested
+            # concurrently and added as a thread reply when it arrives
+            fin_pending = False
             if config.default_team_id:
-                channel = await self.graph_client.find_or_create_channel(
-                    config.default_team_id, config.default_channel_name
-                )
-
-                await self.graph_client.send_message(
-                    config.default_team_id, channel["id"], teams_message, "html"
+                fin_request = asyncio.ensure_future(
+                    client.trigger_fin_ai_response(conversation_id, messages)
                 )
+                try:
+                    channel = await self.graph_client.find_or_create_channel(
+                        config.default_team_id, config.default_channel_name
+                    )
+
+                    sent = await self.graph_client.send_message(
+                        config.default_team_id, channel["id"], teams_message, "html"
+                    )
+                except BaseException:
+                    fin_request.cancel()
+                    raise
+
+                fin_pending = bool(sent.get("id"))
+                if fin_pending:
+                    self._start_enrichment(
+                        self._reply_with_fin_suggestion(
+                            fin_request,
+                            config.default_team_id,
+                            channel["id"],
+                            sent["id"],
+                            conversation_id,
+                        )
+                    )
+                else:
+                    fin_request.cancel()
 
             return {
                 "status": "success",
                 "action": "user_reply_notification",
                 "conversation_id": conversation_id,
-                "fin_ai_used": fin_response is not None,
+                "replies": len(events),
+                "fin_ai_pending": fin_pending,
             }
 
         except Exception as e:
-            logger.error(f"Error handling conversation reply: {str(e)}")
+            logger.error(
+                f"Error sending replies for conversation {conversation_id}: {str(e)}"
+            )
             raise
 
-    async def _handle_admin_reply(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def _start_enrichment(self, coroutine):
+        task = asyncio.ensure_future(coroutine)
+        self._enrichments.add(task)
+        task.add_done_callback(self._enrichments.discard)
+
+    async def _reply_with_fin_suggestion(
+        self,
+        fin_request: "asyncio.Future[Optional[Dict[str, Any]]]",
+        team_id: str,
+        channel_id: str,
+        message_id: str,
+        conversation_id: str,
+    ):
+        """
+        Add the FIN AI suggestion as a reply to a posted customer message.
+
+        Args:
+            fin_request (asyncio.Future): Pending FIN AI request
+            team_id (str): The team ID
+            channel_id (str): The channel ID
+            message_id (str): ID of the posted Teams message
+            conversation_id (str): The conversation ID
+        """
+        try:
+            fin_response = await fin_request
+            suggested_reply = (fin_response or {}).get("suggested_reply", "")
+            if not suggested_reply:
+                return
+
+            await self.graph_client.reply_to_message(
+                team_id,
+                channel_id,
+                message_id,
+                f"🤖 **FIN AI Suggested Response:**\n{suggested_reply}",
+                "html",
+            )
+            logger.info(f"Added FIN AI suggestion for conversation {conversation_id}")
+
+        except Exception as e:
+            logger.warning(
+                f"Could not add FIN AI suggestion for conversation "
+                f"{conversation_id}: {str(e)}"
+            )
+
+    async def _handle_admin_reply(self, event: ConversationEvent) -> Dict[str, Any]:
         """
         Handle admin reply in conversation.
 
         Args:
-            data (Dict): Event data
+            event (ConversationEvent): Decoded webhook event
 
         Returns:
             Dict: Processing result
         """
         try:
-            conversation = data.get("data", {}).get("item", {})
-            conversation_id = conversation.get("id")
+            conversation = event.data.item
+            conversation_id = conversation.id
 
             # For admin replies, we might want to sync back to Teams or just log
             logger.info(f"Admin replied to conversation {conversation_id}")
@@ -297,23 +614,23 @@ class WebhookHandler:
             raise
 
     async def _handle_conversation_assigned(
-        self, data: Dict[str, Any]
+        self, event: ConversationEvent
     ) -> Dict[str, Any]:
         """
         Handle conversation assignment event.
 
         Args:
-            data (Dict): Event data
+            event (ConversationEvent): Decoded webhook event
 
         Returns:
             Dict: Processing result
         """
         try:
-            conversation = data.get("data", {}).get("item", {})
-            conversation_id = conversation.get("id")
+            conversation = event.data.item
+            conversation_id = conversation.id
 
-            assignee = conversation.get("assignee", {})
-            assignee_name = assignee.get("name", "Unknown")
+            assignee = conversation.assignee
+            assignee_name = assignee.name if assignee and assignee.name else "Unknown"
 
             # Notify Teams about assignment
             teams_message = f"""
@@ -346,19 +663,21 @@ class WebhookHandler:
             logger.error(f"Error handling conversation assignment: {str(e)}")
             raise
 
-    async def _handle_conversation_closed(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    async def _handle_conversation_closed(
+        self, event: ConversationEvent
+    ) -> Dict[str, Any]:
         """
         Handle conversation closed event.
 
         Args:
-            data (Dict): Event data
+            event (ConversationEvent): Decoded webhook event
 
         Returns:
             Dict: Processing result
         """
         try:
-            conversation = data.get("data", {}).get("item", {})
-            conversation_id = conversation.get("id")
+            conversation = event.data.item
+            conversation_id = conversation.id
 
             # Notify Teams about closure
             teams_message = f"""
@@ -389,23 +708,21 @@ class WebhookHandler:
             logger.error(f"Error handling conversation closure: {str(e)}")
             raise
 
-    async def _handle_contact_user_created(
-        self, data: Dict[str, Any]
-    ) -> Dict[str, Any]:
+    async def _handle_contact_user_created(self, event: ContactEvent) -> Dict[str, Any]:
         """
         Handle new user contact created event.
 
         Args:
-            data (Dict): Event data
+            event (ContactEvent): Decoded webhook event
 
         Returns:
             Dict: Processing result
         """
         try:
-            contact = data.get("data", {}).get("item", {})
-            contact_id = contact.get("id")
-            contact_name = contact.get("name", "Unknown User")
-            contact_email = contact.get("email", "No email")
+            contact = event.data.item
+            contact_id = contact.id
+            contact_name = contact.name or "Unknown User"
+            contact_email = contact.email or "No email"
 
             # Create Teams notification
             teams_message = f"""
@@ -445,23 +762,21 @@ class WebhookHandler:
             logger.error(f"Error handling contact user created: {str(e)}")
             raise
 
-    async def _handle_contact_lead_created(
-        self, data: Dict[str, Any]
-    ) -> Dict[str, Any]:
+    async def _handle_contact_lead_created(self, event: ContactEvent) -> Dict[str, Any]:
         """
         Handle new lead contact created event.
 
         Args:
-            data (Dict): Event data
+            event (ContactEvent): Decoded webhook event
 
         Returns:
             Dict: Processing result
         """
         try:
-            contact = data.get("data", {}).get("item", {})
-            contact_id = contact.get("id")
-            contact_name = contact.get("name", "Unknown Lead")
-            contact_email = contact.get("email", "No email")
+            contact = event.data.item
+            contact_id = contact.id
+            contact_name = contact.name or "Unknown Lead"
+            contact_email = contact.email or "No email"
 
             # Create Teams notification
             teams_message = f"""
@@ -501,21 +816,21 @@ class WebhookHandler:
             logger.error(f"Error handling contact lead created: {str(e)}")
             raise
 
-    async def _handle_lead_signed_up(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    async def _handle_lead_signed_up(self, event: ContactEvent) -> Dict[str, Any]:
         """
         Handle lead signed up (converted to user) event.
 
         Args:
-            data (Dict): Event data
+            event (ContactEvent): Decoded webhook event
 
         Returns:
             Dict: Processing result
         """
         try:
-            contact = data.get("data", {}).get("item", {})
-            contact_id = contact.get("id")
-            contact_name = contact.get("name", "Unknown User")
-            contact_email = contact.get("email", "No email")
+            contact = event.data.item
+            contact_id = contact.id
+            contact_name = contact.name or "Unknown User"
+            contact_email = contact.email or "No email"
 
             # Create Teams notification
             teams_message = f"""
@@ -557,21 +872,21 @@ This lead has successfully signed up and become a user!
             logger.error(f"Error handling lead signed up: {str(e)}")
             raise
 
-    async def _handle_visitor_signed_up(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    async def _handle_visitor_signed_up(self, event: ContactEvent) -> Dict[str, Any]:
         """
         Handle visitor signed up (converted to user) event.
 
         Args:
-            data (Dict): Event data
+            event (ContactEvent): Decoded webhook event
 
         Returns:
             Dict: Processing result
         """
         try:
-            contact = data.get("data", {}).get("item", {})
-            contact_id = contact.get("id")
-            contact_name = contact.get("name", "Unknown User")
-            contact_email = contact.get("email", "No email")
+            contact = event.data.item
+            contact_id = contact.id
+            contact_name = contact.name or "Unknown User"
+            contact_email = contact.email or "No email"
 
             # Create Teams notification
             teams_message = f"""
@@ -0,0 +1,152 @@
+"""
+Sharded asyncio worker pool for webhook processing.
+Work items with the same key always land on the same worker, so they are
+processed strictly in submission order while different keys run in parallel.
+"""
+
+import asyncio
+import logging
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class WorkerStats:
+    """Counters for a single shard worker."""
+
+    processed: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+    busy_since: Optional[float] = None
+
+    def utilisation(self) -> float:
+        """Fraction of wall time spent processing since the worker started."""
+        now = time.monotonic()
+        busy = self.busy_seconds
+        if self.busy_since is not None:
+            busy += now - self.busy_since
+        elapsed = now - self.started_at
+        return busy / elapsed if elapsed > 0 else 0.0
+
+
+class ShardedWorkerPool:
+    """Fixed pool of async workers, each draining its own bounded queue."""
+
+    def __init__(
+        self,
+        handler: Callable[..., Awaitable[Any]],
+        num_workers: int = 8,
+        queue_size: int = 100,
+    ):
+        """
+        Initialize the worker pool.
+
+        Args:
+            handler (Callable): Coroutine function called with submitted args
+            num_workers (int): Number of shards and workers
+            queue_size (int): Maximum queued items per worker
+        """
+        self.handler = handler
+        self.num_workers = num_workers
+        self.queue_size = queue_size
+        self._queues: List[asyncio.Queue] = []
+        self._workers: List[asyncio.Task] = []
+        self._stats: List[WorkerStats] = []
+
+    def start(self):
+        """Start the shard workers."""
+        self._queues = [asyncio.Queue(self.queue_size) for _ in range(self.num_workers)]
+        self._stats = [WorkerStats() for _ in range(self.num_workers)]
+        self._workers = [
+            asyncio.create_task(self._run_worker(index), name=f"webhook-worker-{index}")
+            for index in range(self.num_workers)
+        ]
+        logger.info(f"Started {self.num_workers} webhook workers")
+
+    async def stop(self):
+        """Stop all workers, abandoning items still queued."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        logger.info("Webhook workers stopped")
+
+    def shard_for(self, key: str) -> int:
+        """
+        Map a key to a worker index.
+
+        Uses a stable hash so the mapping does not change between processes.
+
+        Args:
+            key (str): Ordering key such as a conversation ID
+
+        Returns:
+            int: Worker index
+        """
+        return zlib.crc32(key.encode("utf-8")) % self.num_workers
+
+    async def submit(self, key: str, *args: Any):
+        """
+        Queue a work item on the shard owning the key.
+
+        Waits while the shard queue is full, which applies backpressure
+        to the caller.
+
+        Args:
+            key (str): Ordering key
+            *args: Arguments passed to the handler
+        """
+        await self._queues[self.shard_for(key)].put(args)
+
+    async def _run_worker(self, index: int):
+        queue = self._queues[index]
+        stats = self._stats[index]
+
+        while True:
+            args = await queue.get()
+            stats.busy_since = time.monotonic()
+            try:
+                await self.handler(*args)
+                stats.processed += 1
+            except Exception as e:
+                stats.failed += 1
+                logger.error(f"Webhook worker {index} handler failed: {str(e)}")
+            finally:
+                stats.busy_seconds += time.monotonic() - stats.busy_since
+                stats.busy_since = None
+                queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get queue depth and utilisation for every worker.
+
+        Returns:
+            Dict: Pool-wide totals and per-worker details
+        """
+        workers = [
+            {
+                "worker": index,
+                "queue_depth": queue.qsize(),
+                "processed": stats.processed,
+                "failed": stats.failed,
+                "utilisation": round(stats.utilisation(), 4),
+            }
+            for index, (queue, stats) in enumerate(zip(self._queues, self._stats))
+        ]
+        utilisation = (
+            sum(worker["utilisation"] for worker in workers) / len(workers)
+            if workers
+            else 0.0
+        )
+        return {
+            "workers": self.num_workers,
+            "queue_size": self.queue_size,
+            "queue_depth": sum(worker["queue_depth"] for worker in workers),
+            "utilisation": round(utilisation, 4),
+            "per_worker": workers,
+        }